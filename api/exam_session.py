@@ -0,0 +1,71 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional, Union
+
+SectionKind = Literal[
+    "transcript", "announcement", "interview", "advert", "match_titles", "comprehension", "writing"
+]
+
+
+class CreateExamSessionRequest(BaseModel):
+    sections: Optional[List[SectionKind]] = Field(
+        default=None, description="Sections to include, in order. All sections if omitted."
+    )
+
+
+class ExamSectionStub(BaseModel):
+    kind: SectionKind
+    title: str
+    loaded: bool
+    # Known once the section has been loaded
+    question_count: Optional[int] = None
+    href: str
+
+
+class ExamSessionResponse(BaseModel):
+    session_id: str
+    sections: List[ExamSectionStub]
+
+
+class ExamSectionResponse(BaseModel):
+    session_id: str
+    kind: SectionKind
+    # The section as returned by its exam endpoint, without correct answers and explanations
+    content: Dict[str, Any]
+
+
+class GradeSectionRequest(BaseModel):
+    # Question id -> answer: an option/advert/title id, or true/false for listening questions.
+    # Listening questions are identified by their position ("0", "1", ...).
+    answers: Dict[str, Union[bool, str]]
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{"answers": {"0": True, "1": False, "2": True}}]
+        }
+    }
+
+
+class QuestionResult(BaseModel):
+    question_id: str
+    answered: bool
+    correct: bool
+
+
+class GradeSectionResponse(BaseModel):
+    session_id: str
+    kind: SectionKind
+    score: int
+    total: int
+    results: List[QuestionResult]
+
+
+class QuestionExplanation(BaseModel):
+    question_id: str
+    correct_answer: Union[bool, str]
+    explanation: str
+
+
+class ExamSectionExplanationsResponse(BaseModel):
+    session_id: str
+    kind: SectionKind
+    explanations: List[QuestionExplanation]
@@ -0,0 +1,51 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Literal, Optional
+
+JobKind = Literal[
+    "interview_audio",
+    "conversation_audio",
+    "transcript",
+    "announcement",
+    "interview",
+    "advert",
+    "match_titles",
+    "comprehension",
+    "writing",
+]
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class CreateJobRequest(BaseModel):
+    kind: JobKind
+    # interview_audio: {"segments": [...]} as for /listening-exam/interview/audio;
+    # conversation_audio: {"exam": {...}} or {"kind": "transcript"|"announcement", "exam_id": "..."};
+    # exam kinds take no parameters.
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "kind": "interview_audio",
+                    "params": {
+                        "segments": [
+                            {"speaker": "interviewer", "text": "Hallo, willkommen.", "speaker_gender": "female"},
+                            {"speaker": "interviewee", "text": "Danke.", "speaker_gender": "male"},
+                        ]
+                    },
+                }
+            ]
+        }
+    }
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: JobKind
+    status: JobStatus
+    created_at: float
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    # Set once the job has succeeded
+    result_href: Optional[str] = None
@@ -2,7 +2,7 @@ from pydantic import BaseModel
 from workflows.generate_transcript import Conversation
 from workflows.generate_announcements import Announcement
 from workflows.generate_interview import Interview
-from typing import Optional
+from typing import List, Optional
 
 
 class ListeningExamRequest(BaseModel):
@@ -11,13 +11,29 @@ class ListeningExamRequest(BaseModel):
 
 class ListeningExamResponse(BaseModel):
     conversation: Conversation
+    exam_id: Optional[str] = None
+    # Ids of the speakers' clips (served at /audio/{id}.mp3), in order, when audio is pre-rendered (AUDIO_PRERENDER)
+    audio_ids: Optional[List[str]] = None
 
 class ListeningExamAnnouncementResponse(BaseModel):
     announcement: Announcement
+    exam_id: Optional[str] = None
+    # Ids of the speakers' clips (served at /audio/{id}.mp3), in order, when audio is pre-rendered (AUDIO_PRERENDER)
+    audio_ids: Optional[List[str]] = None
 
 
 class InterviewResponse(BaseModel):
     interview: Interview
+    exam_id: Optional[str] = None
+    # Ids of the conversation segments' clips (served at /audio/{id}.mp3), in order, when audio is pre-rendered (AUDIO_PRERENDER)
+    audio_ids: Optional[List[str]] = None
+
+
+class ListeningExamTranslationResponse(BaseModel):
+    exam_id: str
+    kind: str
+    # One per speaker for transcripts and announcements, one for the whole interview conversation
+    translations: List[str]
 
 
 class AudioGenerationRequest(BaseModel):
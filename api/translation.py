@@ -1,4 +1,6 @@
+from functools import lru_cache
 from fastapi import APIRouter, Depends, HTTPException
+from utils.token_budget import InputTooLargeError
 from services.sentence_translation_service import (
     SentenceTranslationService,
     SentenceTranslationRequest,
@@ -8,7 +10,8 @@ from services.sentence_translation_service import (
 router = APIRouter()
 
 
-# Dependency injection for the service
+# Dependency injection for the service (one shared instance per process)
+@lru_cache(maxsize=None)
 def get_sentence_translation_service():
     return SentenceTranslationService()
 
@@ -27,6 +30,8 @@ async def translate_english_to_german(
     try:
         translation = await service.translate_en_to_de(request.text)
         return SentenceTranslationResponse(translation=translation)
+    except InputTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         # Log the exception details here if needed
         raise HTTPException(status_code=500, detail=str(e))
@@ -46,6 +51,8 @@ async def translate_german_to_english(
     try:
         translation = await service.translate_de_to_en(request.text)
         return SentenceTranslationResponse(translation=translation)
+    except InputTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         # Log the exception details here if needed
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+Offline bulk exam generation.
+
+Drives the exam workflows directly (no HTTP server) to pre-generate exams,
+e.g. overnight, into a JSONL or SQLite store:
+
+    python bulk_generate.py --out exams.sqlite --count 500 --concurrency 32
+    python bulk_generate.py --out exams.jsonl --kinds reading_advert writing_exam --count 100
+
+Every job has a stable id (`<kind>-<index>`), so re-running the same command
+skips the jobs already stored and only generates what is missing. Calls go
+through the shared scheduler, so provider concurrency and token-per-minute
+limits are respected and 429s pause the provider for the advertised
+Retry-After; `--concurrency` only bounds how many jobs are in progress.
+With `--item-bank` the generated items are also added to an item bank file
+that the server loads through ITEM_BANK_PATH.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+from services.item_bank import ItemBank
+from services.listening_exam_service import DEFAULT_TOPICS
+from utils.scheduler import Priority, rate_limit_retry_after, request_context
+from workflows.generate_announcements import generate_listening_exam_announcement
+from workflows.generate_interview import generate_interview_transcript
+from workflows.generate_transcript import generate_listening_exam_transcript
+from workflows.reading_advert_workflow import ReadingAdvertExamWorkflow
+from workflows.reading_comprehension_workflow import ReadingComprehensionWorkflow
+from workflows.reading_match_titles_workflow import TOPIC_LIST, ReadingMatchTitleWorkflow
+from workflows.writing_exam_workflow import WritingExamWorkflow
+
+load_dotenv()
+
+KINDS = [
+    "reading_advert",
+    "reading_comprehension",
+    "reading_match_title",
+    "writing_exam",
+    "listening_transcript",
+    "listening_announcement",
+    "listening_interview",
+]
+
+# Generated exams are checked against the section sizes the services serve
+EXPECTED_ITEMS: Dict[str, Tuple[str, int]] = {
+    "reading_advert": ("questions", 10),
+    "reading_comprehension": ("questions", 5),
+    "writing_exam": ("tasks", 4),
+    "listening_transcript": ("speakers", 5),
+    "listening_announcement": ("speakers", 5),
+    "listening_interview": ("exam_questions", 10),
+}
+
+
+def validate(kind: str, exam: BaseModel) -> None:
+    """Raises ValueError if a generated exam doesn't have the expected number of items."""
+    if kind not in EXPECTED_ITEMS:
+        return
+    field_name, expected = EXPECTED_ITEMS[kind]
+    found = len(getattr(exam, field_name))
+    if found != expected:
+        raise ValueError(f"{kind}: expected {expected} {field_name}, got {found}")
+
+
+def build_generators(lean: bool) -> Dict[str, Callable[[int], Awaitable[BaseModel]]]:
+    """Generator per exam kind; the job index picks the topic where the workflow takes one."""
+    advert = ReadingAdvertExamWorkflow()
+    comprehension = ReadingComprehensionWorkflow()
+    match_titles = ReadingMatchTitleWorkflow()
+    writing = WritingExamWorkflow()
+    return {
+        "reading_advert": lambda index: advert.generate_exam(),
+        "reading_comprehension": lambda index: comprehension.generate_exam(),
+        "reading_match_title": lambda index: match_titles.generate_match_title(TOPIC_LIST[index % len(TOPIC_LIST)]),
+        "writing_exam": lambda index: writing.generate_writing_exam(),
+        "listening_transcript": lambda index: generate_listening_exam_transcript(
+            DEFAULT_TOPICS[index % len(DEFAULT_TOPICS)], lean=lean
+        ),
+        "listening_announcement": lambda index: generate_listening_exam_announcement(lean=lean),
+        "listening_interview": lambda index: generate_interview_transcript(lean=lean),
+    }
+
+
+def bank_items(kind: str, index: int, exam: BaseModel) -> List[Tuple[str, str, BaseModel]]:
+    """(bank kind, topic, item) entries for an exam, following the services' item bank conventions."""
+    if kind == "reading_advert":
+        return [("reading_advert", question.topic, question) for question in exam.questions]
+    if kind == "reading_comprehension":
+        return [("reading_comprehension", exam.topic, exam)]
+    if kind == "reading_match_title":
+        return [("reading_match_title", TOPIC_LIST[index % len(TOPIC_LIST)], exam)]
+    if kind == "listening_announcement":
+        return [("listening_announcement", speaker.name, speaker) for speaker in exam.speakers]
+    return []
+
+
+class JsonlResultStore:
+    """Appends one JSON record per generated exam."""
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def done_ids(self) -> Set[str]:
+        if not os.path.exists(self._path):
+            return set()
+        with open(self._path, encoding="utf-8") as f:
+            return {json.loads(line)["id"] for line in f if line.strip()}
+
+    def put(self, job_id: str, kind: str, exam: BaseModel) -> None:
+        record = {"id": job_id, "kind": kind, "created_at": time.time(), "exam": exam.model_dump(mode="json")}
+        with open(self._path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteResultStore:
+    """Stores generated exams in an `exams` table keyed by job id."""
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS exams (id TEXT PRIMARY KEY, kind TEXT NOT NULL, created_at REAL NOT NULL, exam TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def done_ids(self) -> Set[str]:
+        return {row[0] for row in self._db.execute("SELECT id FROM exams")}
+
+    def put(self, job_id: str, kind: str, exam: BaseModel) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO exams (id, kind, created_at, exam) VALUES (?, ?, ?, ?)",
+            (job_id, kind, time.time(), exam.model_dump_json()),
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def open_store(path: str):
+    if path.endswith((".sqlite", ".sqlite3", ".db")):
+        return SqliteResultStore(path)
+    return JsonlResultStore(path)
+
+
+async def run(args: argparse.Namespace) -> int:
+    generators = build_generators(args.lean)
+    store = open_store(args.out)
+    bank = ItemBank(path=args.item_bank) if args.item_bank else None
+
+    done = store.done_ids()
+    jobs: List[Tuple[str, str, int]] = [
+        (f"{kind}-{index:06d}", kind, index)
+        for kind in args.kinds
+        for index in range(args.count)
+        if f"{kind}-{index:06d}" not in done
+    ]
+    total = len(jobs)
+    print(f"[bulk] {total} jobs to run, {args.count * len(args.kinds) - total} already stored in {args.out}")
+
+    queue: "asyncio.Queue[Tuple[str, str, int]]" = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    attempts: Dict[str, int] = {}
+    rate_limited: Dict[str, int] = {}
+    counts = {"generated": 0, "failed": 0}
+    started = time.monotonic()
+
+    async def process(job_id: str, kind: str, index: int) -> None:
+        try:
+            exam = await generators[kind](index)
+            validate(kind, exam)
+        except Exception as e:
+            retry_after = rate_limit_retry_after(e)
+            if retry_after is not None:
+                rate_limited[job_id] = rate_limited.get(job_id, 0) + 1
+                if rate_limited[job_id] <= args.max_rate_limited:
+                    # Still rate limited after the scheduler's retries: wait and requeue without using an attempt
+                    await asyncio.sleep(retry_after)
+                    queue.put_nowait((job_id, kind, index))
+                    return
+                counts["failed"] += 1
+                print(f"[bulk] {job_id} failed, rate limited {rate_limited[job_id]} times: {e}")
+                return
+            attempts[job_id] = attempts.get(job_id, 0) + 1
+            if attempts[job_id] < args.max_attempts:
+                queue.put_nowait((job_id, kind, index))
+            else:
+                counts["failed"] += 1
+                print(f"[bulk] {job_id} failed after {attempts[job_id]} attempts: {e}")
+            return
+
+        store.put(job_id, kind, exam)
+        if bank is not None:
+            for bank_kind, topic, item in bank_items(kind, index, exam):
+                bank.add(bank_kind, topic, item)
+        counts["generated"] += 1
+        if counts["generated"] % args.progress_every == 0 or counts["generated"] == total:
+            per_minute = counts["generated"] / max(time.monotonic() - started, 1e-6) * 60
+            print(f"[bulk] {counts['generated']}/{total} generated, {counts['failed']} failed ({per_minute:.1f}/min)")
+
+    async def worker() -> None:
+        # Workers run until every job is done, so requeued jobs keep the full concurrency
+        while True:
+            job = await queue.get()
+            try:
+                await process(*job)
+            finally:
+                # Requeued jobs are put back before this, so join() waits for them too
+                queue.task_done()
+
+    # Offline generation runs in the background lane without an endpoint bulkhead,
+    # so it is limited only by the provider gates
+    with request_context(Priority.BACKGROUND):
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(args.concurrency, total) or 1)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    store.close()
+
+    print(f"[bulk] Done: {counts['generated']} generated, {counts['failed']} failed in {time.monotonic() - started:.0f}s")
+    return 1 if counts["failed"] else 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pre-generate exams into a JSONL or SQLite store.")
+    parser.add_argument("--out", required=True, help="Output file; .sqlite/.sqlite3/.db for SQLite, anything else for JSONL.")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS, help="Exam kinds to generate (default: all).")
+    parser.add_argument("--count", type=int, default=100, help="Exams per kind (default: 100).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Jobs in progress at once (default: 32).")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per job before it is reported as failed (default: 3).")
+    parser.add_argument(
+        "--max-rate-limited", type=int, default=10,
+        help="Times a job may be requeued after rate limiting before it is reported as failed (default: 10).",
+    )
+    parser.add_argument("--lean", action="store_true", help="Generate listening exams without English translations.")
+    parser.add_argument("--item-bank", help="Also add the generated items to this item bank file (see ITEM_BANK_PATH).")
+    parser.add_argument("--progress-every", type=int, default=10, help="Print progress every N exams (default: 10).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(run(parse_args())))
@@ -1,6 +1,10 @@
-from fastapi import FastAPI, Body, Query, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, Body, Query, HTTPException, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
 import os
+import json
+import asyncio
+import functools
+from contextlib import asynccontextmanager
 from services.translation_service import TranslationService
 from services.listening_exam_service import ListeningExamService
 from services.listening_exam_announcement_service import (
@@ -13,6 +17,14 @@ from services.sentence_translation_service import (
     SentenceTranslationResponse,
 )
 from services.audio_listening_interview_exam_service import AudioListeningInterviewExamService
+from services.audio_service import audio_service
+from services.audio_prerender_service import AudioPrerenderService
+from services.conversation_audio_service import ConversationAudioService
+from services.listening_translation_service import ListeningTranslationService
+from services.item_bank import item_bank
+from services.exam_session_service import ExamSessionService, SECTION_TITLES, SectionNotReadyError
+from services.prefetch_service import PrefetchService, CLIENT_ID_HEADER
+from services.job_service import JobService, JobNotReadyError
 from workflows.generate_transcript import Conversation
 from workflows.generate_announcements import Announcement
 from workflows.generate_interview import Interview, ConversationSegment
@@ -24,15 +36,55 @@ from services.writing_exam_service import WritingExamService, WritingExam
 from services.writing_review_service import WritingReviewService
 from workflows.writing_review_workflow import UserLetterRequest, WrittenExamEvaluation
 from api.translations import TranslateRequest, TranslateResponse
+from api.jobs import CreateJobRequest, JobResponse
+from utils.llm_clients import aclose_http_clients
+from utils.metrics import metrics
+from utils.scheduler import scheduler, Priority, SchedulingContextMiddleware
+from utils.model_router import model_router
+from utils.circuit_breaker import breaker_states
+from utils.token_budget import InputTooLargeError, token_budgets
+from utils.exam_store import exam_store
+from utils.exam_cache import seeded_exam_response
+from utils.audio_cache import audio_cache
+from utils.file_response import ImmutableFileResponse
+from workflows.prompt_assets import prompt_assets
 from api.listening_exam import (
     ListeningExamResponse,
     AudioGenerationRequest,
     ListeningExamAnnouncementResponse,
     InterviewResponse,
+    ListeningExamTranslationResponse,
 )
-from typing import List
+from api.exam_session import (
+    SectionKind,
+    CreateExamSessionRequest,
+    ExamSectionStub,
+    ExamSessionResponse,
+    ExamSectionResponse,
+    GradeSectionRequest,
+    GradeSectionResponse,
+    QuestionResult,
+    QuestionExplanation,
+    ExamSectionExplanationsResponse,
+)
+from pydantic import TypeAdapter
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the tokenizer and measure the registered prompt prefixes before the first request
+    await asyncio.to_thread(prompt_assets.report)
+    job_service.start()
+    yield
+    # Jobs still running are queued again on the next start
+    await job_service.stop()
+    # Release pooled provider connections, including the TTS clients'
+    await audio_service.aclose()
+    await aclose_http_clients()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Translation API",
     description="API for translating words in context",
     version="1.0.0",
@@ -50,6 +102,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Assign outbound LLM/TTS calls a priority lane and bulkhead based on the request path
+app.add_middleware(
+    SchedulingContextMiddleware,
+    routes={
+        "/translate": (Priority.INTERACTIVE, "translate"),
+        "/writing-exam/review": (Priority.INTERACTIVE, "writing-review"),
+        "/writing-exam": (Priority.GENERATION, "writing-exam"),
+        "/reading-exam": (Priority.GENERATION, "reading-exam"),
+        "/listening-exam/audio": (Priority.GENERATION, "listening-audio"),
+        "/listening-exam/conversation/audio": (Priority.GENERATION, "listening-audio"),
+        "/listening-exam/interview/audio": (Priority.GENERATION, "interview-audio"),
+        "/listening-exam/translation": (Priority.INTERACTIVE, "listening-translation"),
+        "/listening-exam": (Priority.GENERATION, "listening-exam"),
+        "/exam-sessions": (Priority.GENERATION, "exam-session"),
+    },
+)
+
 # Create translation service instance
 translation_service = TranslationService()
 
@@ -68,20 +137,186 @@ sentence_translation_service = SentenceTranslationService()
 # Create audio listening interview exam service instance
 audio_listening_interview_exam_service = AudioListeningInterviewExamService()
 
-# Create reading exam service instance
-# No longer needed here as instantiated within endpoints
-# reading_exam_service = ReadingExamService()
-# reading_match_titles_service = ReadingMatchTitlesService()
+# Create conversation audio service instance; all speakers of a transcript or announcement in one response
+conversation_audio_service = ConversationAudioService(audio_service)
+
+# Create audio pre-render service instance; synthesizes generated listening exams' audio ahead of playback
+audio_prerender_service = AudioPrerenderService(audio_service, audio_listening_interview_exam_service)
+
+# Create on-demand listening exam translation service instance
+listening_translation_service = ListeningTranslationService()
+
+# Create reading exam service instances
+# Shared across requests so their LLM clients and HTTP connection pools are reused
+reading_exam_service = ReadingExamService()
+reading_match_titles_service = ReadingMatchTitlesService()
 
 # Add instance for the new service
 reading_comprehension_service = ReadingComprehensionService()
 
+# Create writing exam service instances
+writing_exam_service = WritingExamService()
+writing_review_service = WritingReviewService()
+
+
+async def _transcript_response(topic: Optional[str] = None, lean: bool = False) -> ListeningExamResponse:
+    conversation: Conversation = await listening_exam_service.generate_transcript(topic=topic, lean=lean)
+    return ListeningExamResponse(
+        conversation=conversation,
+        exam_id=exam_store.put("transcript", conversation),
+        audio_ids=audio_prerender_service.speakers("transcript", conversation.speakers),
+    )
+
+
+async def _announcement_response(lean: bool = False) -> ListeningExamAnnouncementResponse:
+    announcement: Announcement = await listening_exam_announcement_service.generate_announcement(lean=lean)
+    return ListeningExamAnnouncementResponse(
+        announcement=announcement,
+        exam_id=exam_store.put("announcement", announcement),
+        audio_ids=audio_prerender_service.speakers("announcement", announcement.speakers),
+    )
+
+
+async def _interview_response(lean: bool = False) -> InterviewResponse:
+    interview: Interview = await interview_service.generate_interview(lean=lean)
+    return InterviewResponse(
+        interview=interview,
+        exam_id=exam_store.put("interview", interview),
+        audio_ids=audio_prerender_service.interview(interview),
+    )
+
+
+def _restore_exam(kind: str, field: str, model):
+    """
+    Puts a listening exam served from the seeded exam cache back into the exam
+    store, so its exam_id works for follow-up requests after a restart or eviction.
+    """
+    def restore(body: bytes) -> None:
+        response = json.loads(body)
+        if exam_store.get(kind, response["exam_id"]) is None:
+            exam_store.replace(kind, response["exam_id"], model.model_validate(response[field]))
+    return restore
+
+
+# Section responses as the exam endpoints return them with default parameters
+SECTION_GENERATORS = {
+    "transcript": _transcript_response,
+    "announcement": _announcement_response,
+    "interview": _interview_response,
+    "advert": reading_exam_service.get_advert_section,
+    "match_titles": reading_match_titles_service.get_match_title,
+    "comprehension": reading_comprehension_service.get_comprehension_section,
+    "writing": writing_exam_service.get_writing_exam,
+}
+
+# Create exam session service instance; sections are generated like their standalone endpoints,
+# listening sections in lean mode since translations can be fetched by exam_id
+exam_session_service = ExamSessionService({
+    **SECTION_GENERATORS,
+    "transcript": functools.partial(_transcript_response, lean=True),
+    "announcement": functools.partial(_announcement_response, lean=True),
+    "interview": functools.partial(_interview_response, lean=True),
+})
+
+# Create prefetch service instance; speculatively generates a client's likely next section
+prefetch_service = PrefetchService(SECTION_GENERATORS)
+
+
+# Create job service instance; runs long generation and audio rendering requests in the background
+job_service = JobService()
+
+_LISTENING_EXAM = TypeAdapter(Union[Conversation, Announcement])
+_SEGMENTS = TypeAdapter(List[ConversationSegment])
+
+
+def _interview_audio_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    segments = _SEGMENTS.validate_python(params.get("segments"))
+    return {"segments": [segment.model_dump() for segment in segments]}
+
+
+async def _interview_audio_job(params: Dict[str, Any]) -> Tuple[bytes, str]:
+    segments = _SEGMENTS.validate_python(params["segments"])
+    # A partial interview would be shared with identical submissions, so any failed segment fails the job
+    chunks = await audio_listening_interview_exam_service.generate_concatenated_streaming_audio(segments, skip_failed=False)
+    audio = b"".join(chunks)
+    if not audio:
+        raise RuntimeError("No interview audio was generated.")
+    return audio, "audio/mpeg"
+
+
+def _conversation_audio_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolves an exam_id to its exam, so both forms of the same exam are identical submissions."""
+    if "exam" in params:
+        exam = _LISTENING_EXAM.validate_python(params["exam"])
+    else:
+        kind, exam_id = params.get("kind"), params.get("exam_id")
+        if kind not in ("transcript", "announcement"):
+            raise ValueError("Either 'exam' or 'kind' ('transcript' or 'announcement') and 'exam_id' is required.")
+        exam = exam_store.get(kind, exam_id)
+        if exam is None:
+            raise ValueError(f"No {kind} exam with id '{exam_id}'.")
+    return {"exam": exam.model_dump(), "bundle": bool(params.get("bundle", False))}
+
+
+async def _conversation_audio_job(params: Dict[str, Any]) -> Tuple[bytes, str]:
+    speakers = _LISTENING_EXAM.validate_python(params["exam"]).speakers
+    if params["bundle"]:
+        return await conversation_audio_service.bundle(speakers)
+    return b"".join([chunk async for chunk in conversation_audio_service.stream(speakers)]), "audio/mpeg"
+
+
+def _exam_job(create):
+    async def _run(params: Dict[str, Any]) -> Tuple[bytes, str]:
+        return (await create()).model_dump_json().encode(), "application/json"
+    return _run
+
+
+# Audio depends only on its input, so identical submissions share a finished job's result;
+# each generation job produces a new exam and is only shared while it's queued or running
+job_service.register("interview_audio", _interview_audio_job, parse=_interview_audio_params, reuse_results=True)
+job_service.register("conversation_audio", _conversation_audio_job, parse=_conversation_audio_params, reuse_results=True)
+for _kind, _create in SECTION_GENERATORS.items():
+    job_service.register(_kind, _exam_job(_create), parse=lambda params: {})
+
+
+def _prefetched(request: Request, kind: str, seed: Optional[int], create, reservable: bool = True):
+    """
+    Serves unseeded requests through the prefetch service, so they can take a
+    section reserved for the client and start prefetching the next one.
+    Seeded requests always get their own generation.
+    """
+    if seed is not None:
+        return create
+    client_id = request.headers.get(CLIENT_ID_HEADER)
+    return lambda: prefetch_service.fetch(client_id, kind, create, reservable=reservable)
+
 
 @app.get("/")
 async def root():
     return {"greeting": "Hello, World!", "message": "Welcome to FastAPI!"}
 
 
+@app.get(
+    "/metrics",
+    summary="Service metrics",
+    description="Returns in-process counters and latency summaries, including scheduler queue wait times, provider state, per-workflow model latency, circuit breaker states, static prompt prefix sizes, per-workflow output token budgets, item bank stock, prefetch reservations, audio cache usage, audio pre-rendering and background jobs.",
+)
+async def get_metrics():
+    return {
+        **metrics.snapshot(),
+        "scheduler": scheduler.state(),
+        "routing": model_router.state(),
+        "breakers": breaker_states(),
+        "prompts": prompt_assets.report(),
+        "token_budgets": token_budgets.state(),
+        "item_bank": item_bank.state(),
+        "prefetch": prefetch_service.state(),
+        "audio_cache": audio_cache.state(),
+        "audio_prerender": audio_prerender_service.state(),
+        "jobs": job_service.state(),
+    }
+
+
 @app.post(
     "/translate",
     response_model=TranslateResponse,
@@ -107,13 +342,25 @@ async def translate(
     ),
 ):
     # Use the translation service to translate the word with context
-    translation = translation_service.translate(
+    translation = await translation_service.translate(
         word=request.word, context=request.context, word_index=request.wordIndex
     )
 
     return TranslateResponse(word=request.word, translation=translation)
 
 
+SEED_DESCRIPTION = (
+    "Makes the exam reproducible: the same seed (with the same other parameters) always returns the same exam. "
+    "Seeded responses carry an ETag and may be cached indefinitely by clients and CDNs."
+)
+SEED_QUERY = Query(default=None, ge=0, description=SEED_DESCRIPTION)
+
+LEAN_DESCRIPTION = (
+    "Skip generating the English translations, which makes generation considerably faster. "
+    "Translations can be fetched later from /listening-exam/translation/{kind}/{exam_id}."
+)
+
+
 @app.get(
     "/listening-exam/transcript",
     response_model=ListeningExamResponse,
@@ -122,6 +369,8 @@ async def translate(
     response_description="Returns a conversation object containing the generated listening exam content",
 )
 async def generate_transcript(
+    request: Request,
+    response: Response,
     topic: str = Query(
         default=None,
         description="The topic for the listening exam conversation. If not provided, a topic will be automatically selected.",
@@ -129,14 +378,40 @@ async def generate_transcript(
         min_length=5,
         max_length=200,
     ),
+    lean: bool = Query(default=False, description=LEAN_DESCRIPTION),
+    seed: Optional[int] = SEED_QUERY,
 ):
     """
     Generate a listening exam transcript for telc B1.
     Returns a conversation with context, dialogue, questions, and answers.
     If no topic is provided, uses round-robin selection from predefined topics.
     """
-    conversation: Conversation = listening_exam_service.generate_transcript(topic=topic)
-    return ListeningExamResponse(conversation=conversation)
+    create = _prefetched(
+        request, "transcript", seed, lambda: _transcript_response(topic=topic, lean=lean), reservable=topic is None and not lean
+    )
+    restore = _restore_exam("transcript", "conversation", Conversation)
+    return await seeded_exam_response(request, response, "transcript", seed, create, on_hit=restore, topic=topic, lean=lean)
+
+
+async def _primed(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Waits for the first chunk of an audio stream before the response starts,
+    so provider errors still produce an error response.
+    """
+    try:
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = b""
+
+    async def body():
+        try:
+            yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    return body()
 
 
 @app.post(
@@ -151,33 +426,100 @@ async def generate_audio(request: AudioGenerationRequest):
     Generate audio for the given text.
     Returns the audio file as a streaming response.
     """
+    clip_id = audio_service.clip_id(request.text, request.gender, request.speaker_index)
+    headers = {
+        "Content-Disposition": f"attachment; filename={clip_id}.mp3",
+        # Where the clip can be fetched again (with Range support) once it is cached
+        "Content-Location": f"/audio/{clip_id}.mp3",
+    }
     try:
-        # Generate the audio file
-        audio_file = listening_exam_service.audio_service.generate_audio(
-            text=request.text,
-            gender=request.gender,
-            speaker_index=request.speaker_index,
-        )
-
-        # Open the file in binary mode
-        def iterfile():
-            with open(audio_file, mode="rb") as file_like:
-                yield from file_like
-
-            # Delete the file after sending
-            os.unlink(audio_file)
-
-        return StreamingResponse(
-            iterfile(),
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": f"attachment; filename={os.path.basename(audio_file)}"
-            },
-        )
+        # Cached clips are served without taking an ElevenLabs slot
+        audio_bytes = await audio_service.cached_audio(request.text, request.gender, request.speaker_index)
+        if audio_bytes is not None:
+            return StreamingResponse(iter([audio_bytes]), media_type="audio/mpeg", headers=headers)
+
+        body = await _primed(audio_service.stream(request.text, request.gender, request.speaker_index))
+        return StreamingResponse(body, media_type="audio/mpeg", headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _conversation_audio(speakers: List, bundle: bool) -> Response:
+    if bundle:
+        content, media_type = await conversation_audio_service.bundle(speakers)
+        return Response(content=content, media_type=media_type)
+    return StreamingResponse(await _primed(conversation_audio_service.stream(speakers)), media_type="audio/mpeg")
+
+
+CONVERSATION_AUDIO_BUNDLE = Query(
+    False,
+    description="Return a multipart/form-data bundle with one clip per speaker (`speaker-<index>`) instead of one stream.",
+)
+
+
+@app.post(
+    "/listening-exam/conversation/audio",
+    response_class=StreamingResponse,
+    summary="Generate audio for all speakers of a transcript or announcement",
+    description="Synthesizes every speaker of the given conversation or announcement concurrently, with the voice /listening-exam/audio assigns to each position. Returns one MP3 stream with a pause between speakers, or with `bundle=true` one clip per speaker.",
+    response_description="Returns the audio as a streaming response or a multipart bundle",
+)
+async def generate_conversation_audio(
+    exam: Union[Conversation, Announcement],
+    bundle: bool = CONVERSATION_AUDIO_BUNDLE,
+):
+    try:
+        return await _conversation_audio(exam.speakers, bundle)
+    except Exception as e:
+        print(f"Error generating conversation audio: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate conversation audio: {e}")
+
+
+@app.get(
+    "/listening-exam/conversation/audio/{kind}/{exam_id}",
+    response_class=StreamingResponse,
+    summary="Generate audio for all speakers of a generated transcript or announcement",
+    description="Like POST /listening-exam/conversation/audio, for a transcript or announcement previously returned with this exam_id.",
+    response_description="Returns the audio as a streaming response or a multipart bundle",
+)
+async def get_conversation_audio(
+    kind: Literal["transcript", "announcement"],
+    exam_id: str,
+    bundle: bool = CONVERSATION_AUDIO_BUNDLE,
+):
+    exam = exam_store.get(kind, exam_id)
+    if exam is None:
+        raise HTTPException(status_code=404, detail=f"No {kind} exam with id '{exam_id}'.")
+    try:
+        return await _conversation_audio(exam.speakers, bundle)
+    except Exception as e:
+        print(f"Error generating conversation audio for {kind} exam {exam_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate conversation audio: {e}")
+
+
+@app.api_route(
+    "/audio/{clip_id}.mp3",
+    methods=["GET", "HEAD"],
+    response_class=Response,
+    summary="Get a cached audio clip",
+    description="Serves a synthesized clip by id (the audio_ids of listening exams, or the filename of /listening-exam/audio responses) from the audio cache. Supports Range requests, ETag/If-None-Match and long-lived caching; clips never change. An id whose clip was synthesized by the fallback provider redirects to that clip's own URL. Returns 404 if the clip is not (or no longer) cached.",
+    response_description="Returns the clip, or the requested byte range of it",
+)
+async def get_audio_clip(clip_id: str, request: Request):
+    stored_id = audio_cache.resolve(clip_id)
+    if stored_id is not None and stored_id != clip_id:
+        # The id may later be served by its own provider's clip, whose bytes differ,
+        # so only the target's URL is cacheable
+        return RedirectResponse(f"/audio/{stored_id}.mp3", status_code=307, headers={"Cache-Control": "no-cache"})
+    path = audio_cache.locate(clip_id)
+    try:
+        if path is None:
+            raise FileNotFoundError(clip_id)
+        return ImmutableFileResponse(request, path, etag=clip_id, media_type="audio/mpeg")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No cached audio clip '{clip_id}'.")
+
+
 @app.get(
     "/listening-exam/announcement",
     response_model=ListeningExamAnnouncementResponse,
@@ -185,16 +527,20 @@ async def generate_audio(request: AudioGenerationRequest):
     description="Generates a telc B1 level listening exam announcement using a round-robin selection from predefined announcement topics.",
     response_description="Returns a conversation object containing the generated announcement content",
 )
-async def generate_announcement():
+async def generate_announcement(
+    request: Request,
+    response: Response,
+    lean: bool = Query(default=False, description=LEAN_DESCRIPTION),
+    seed: Optional[int] = SEED_QUERY,
+):
     """
     Generate a listening exam announcement for telc B1.
     Returns a conversation with context, announcement, questions, and answers.
     Uses round-robin selection from predefined announcement types.
     """
-    announcement: Announcement = (
-        listening_exam_announcement_service.generate_announcement()
-    )
-    return ListeningExamAnnouncementResponse(announcement=announcement)
+    create = _prefetched(request, "announcement", seed, lambda: _announcement_response(lean=lean), reservable=not lean)
+    restore = _restore_exam("announcement", "announcement", Announcement)
+    return await seeded_exam_response(request, response, "announcement", seed, create, on_hit=restore, lean=lean)
 
 
 # New endpoint for generating interview transcripts
@@ -205,15 +551,21 @@ async def generate_announcement():
     description="Generates a telc B1 level listening exam interview focused on the interviewee's life, career, and experiences, along with 10 True/False questions.",
     response_description="Returns an interview object containing the dialogue, interviewee details, and exam questions.",
 )
-async def generate_interview():
+async def generate_interview(
+    request: Request,
+    response: Response,
+    lean: bool = Query(default=False, description=LEAN_DESCRIPTION),
+    seed: Optional[int] = SEED_QUERY,
+):
     """
     Generate a listening exam interview for telc B1.
     Returns an interview with dialogue, questions, and answers focused on the interviewee.
     The topic is implicitly derived from the interviewee's profile and experiences.
     """
+    create = _prefetched(request, "interview", seed, lambda: _interview_response(lean=lean), reservable=not lean)
     try:
-        interview_data: Interview = interview_service.generate_interview()
-        return InterviewResponse(interview=interview_data)
+        restore = _restore_exam("interview", "interview", Interview)
+        return await seeded_exam_response(request, response, "interview", seed, create, on_hit=restore, lean=lean)
     except Exception as e:
         # Log the exception for debugging
         print(f"Error generating interview: {e}")
@@ -221,6 +573,26 @@ async def generate_interview():
         raise HTTPException(status_code=500, detail=f"Failed to generate interview: {e}")
 
 
+@app.get(
+    "/listening-exam/translation/{kind}/{exam_id}",
+    response_model=ListeningExamTranslationResponse,
+    summary="Get the English translation of a listening exam",
+    description="Returns the English translations for a previously generated listening exam, generating and caching them on first request. Returns one translation per speaker for transcripts and announcements, and one for the whole interview conversation.",
+)
+async def get_listening_exam_translation(
+    kind: Literal["transcript", "announcement", "interview"],
+    exam_id: str,
+):
+    try:
+        translations = await listening_translation_service.get_translations(kind, exam_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        print(f"Error translating {kind} exam {exam_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Translation failed: {e}")
+    return ListeningExamTranslationResponse(exam_id=exam_id, kind=kind, translations=translations)
+
+
 # New endpoint for streaming interview audio using OpenAI TTS
 @app.post(
     "/listening-exam/interview/audio",
@@ -229,16 +601,24 @@ async def generate_interview():
     description="Generates streaming audio for a list of interview segments (text, speaker gender) using OpenAI TTS and returns the concatenated audio stream.",
     response_description="Returns the concatenated audio as a streaming response.",
 )
-async def generate_interview_audio(segments: List[ConversationSegment]):
+async def generate_interview_audio(
+    segments: List[ConversationSegment],
+    progressive: bool = Query(
+        False,
+        description="Stream each segment as soon as it and the segments before it are ready, instead of after the whole interview.",
+    ),
+):
     """
     Generate concatenated streaming audio for a list of interview segments using OpenAI.
     Accepts a list of ConversationSegment objects in the request body.
     Returns the concatenated audio stream.
     """
     try:
-        audio_iterator = audio_listening_interview_exam_service.generate_concatenated_streaming_audio(
-            segments=segments
-        )
+        if progressive:
+            audio_iterator = audio_listening_interview_exam_service.generate_progressive_streaming_audio(segments)
+            return StreamingResponse(audio_iterator, media_type="audio/mpeg")
+
+        audio_iterator = await audio_listening_interview_exam_service.generate_concatenated_streaming_audio(segments)
         return StreamingResponse(audio_iterator, media_type="audio/mpeg")
     except Exception as e:
         print(f"Error in OpenAI audio streaming endpoint: {e}") # Log error
@@ -252,13 +632,17 @@ async def generate_interview_audio(segments: List[ConversationSegment]):
     description="Generates a reading exam advert for telc B1. Returns a list of questions and adverts.",
     response_description="Returns a list of questions and adverts.",
 )
-async def generate_reading_exam_advert():
+async def generate_reading_exam_advert(
+    request: Request,
+    response: Response,
+    seed: Optional[int] = SEED_QUERY,
+):
     """
     Generate a reading exam advert for telc B1.
     """
-    reading_exam_service = ReadingExamService()
-    exam_result: ReadingAdvertExamResult = await reading_exam_service.get_advert_section()
-    return exam_result
+    return await seeded_exam_response(
+        request, response, "advert", seed, _prefetched(request, "advert", seed, reading_exam_service.get_advert_section)
+    )
 
 
 @app.get(
@@ -268,10 +652,14 @@ async def generate_reading_exam_advert():
     description="Generates a Telc B2 Leseverstehen Teil 1 exam matching titles to a text. Returns the paragraph, two title options, and the correct answer reference.",
     response_description="Returns the text, title options, and question info.",
 )
-async def generate_reading_exam_match_titles():
-    reading_match_titles_service = ReadingMatchTitlesService()
-    exam_result: ReadingMatchTitleResult = await reading_match_titles_service.get_match_title()
-    return exam_result
+async def generate_reading_exam_match_titles(
+    request: Request,
+    response: Response,
+    seed: Optional[int] = SEED_QUERY,
+):
+    return await seeded_exam_response(
+        request, response, "match_titles", seed, _prefetched(request, "match_titles", seed, reading_match_titles_service.get_match_title)
+    )
 
 
 @app.get(
@@ -281,13 +669,19 @@ async def generate_reading_exam_match_titles():
     description="Generates a Telc B1 Leseverstehen Teil 1 exam component with a 5-paragraph text and 5 multiple-choice questions.",
     response_description="Returns the text, topic, and questions with shuffled options.",
 )
-async def generate_reading_exam_comprehension():
+async def generate_reading_exam_comprehension(
+    request: Request,
+    response: Response,
+    seed: Optional[int] = SEED_QUERY,
+):
     """
     Generate a reading comprehension section for telc B1.
     Returns the topic, full text, and 5 questions with shuffled answer options.
     """
-    exam_result: ReadingComprehensionResult = await reading_comprehension_service.get_comprehension_section()
-    return exam_result
+    return await seeded_exam_response(
+        request, response, "comprehension", seed,
+        _prefetched(request, "comprehension", seed, reading_comprehension_service.get_comprehension_section),
+    )
 
 
 @app.get(
@@ -297,14 +691,18 @@ async def generate_reading_exam_comprehension():
     description="Generates a Telc B1 letter writing exam in German, returning the letter stimulus and four task points.",
     response_description="Returns the letter and task points.",
 )
-async def generate_writing_exam():
+async def generate_writing_exam(
+    request: Request,
+    response: Response,
+    seed: Optional[int] = SEED_QUERY,
+):
     """
     Generate a letter writing exam for telc B1.
     Returns a WritingExam object containing the letter and four tasks.
     """
-    writing_exam_service = WritingExamService()
-    exam: WritingExam = await writing_exam_service.get_writing_exam()
-    return exam
+    return await seeded_exam_response(
+        request, response, "writing", seed, _prefetched(request, "writing", seed, writing_exam_service.get_writing_exam)
+    )
 
 
 # Insert writing review evaluation endpoint
@@ -320,9 +718,10 @@ async def evaluate_written_exam(request: UserLetterRequest):
     Evaluates the user's response to the writing exam question and returns corrections.
     """
     try:
-        writing_review_service = WritingReviewService()
         evaluation: WrittenExamEvaluation = await writing_review_service.evaluate_written_exam(request)
         return evaluation
+    except InputTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         print(f"Error in /writing-exam/review: {e}")
         raise HTTPException(status_code=500, detail=f"Writing review failed: {e}")
@@ -341,6 +740,8 @@ async def translate_english_to_german(request: SentenceTranslationRequest):
     try:
         translation = await sentence_translation_service.translate_en_to_de(request.text)
         return SentenceTranslationResponse(translation=translation)
+    except InputTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         # Log the exception details here if needed
         print(f"Error in /translate/en-to-de: {e}")
@@ -358,7 +759,170 @@ async def translate_german_to_english(request: SentenceTranslationRequest):
     try:
         translation = await sentence_translation_service.translate_de_to_en(request.text)
         return SentenceTranslationResponse(translation=translation)
+    except InputTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         # Log the exception details here if needed
         print(f"Error in /translate/de-to-en: {e}")
         raise HTTPException(status_code=500, detail=f"Translation failed: {e}")
+
+
+def _exam_session_response(session_id: str) -> ExamSessionResponse:
+    session = exam_session_service.get(session_id)
+    return ExamSessionResponse(
+        session_id=session.id,
+        sections=[
+            ExamSectionStub(
+                kind=kind,
+                title=SECTION_TITLES[kind],
+                loaded=kind in session.results,
+                question_count=exam_session_service.question_count(session, kind),
+                href=f"/exam-sessions/{session.id}/sections/{kind}",
+            )
+            for kind in session.kinds
+        ],
+    )
+
+
+@app.post(
+    "/exam-sessions",
+    response_model=ExamSessionResponse,
+    summary="Start an exam session",
+    description="Creates an exam session holding a full exam server-side and returns a stub per section. Nothing is generated until a section is requested.",
+)
+async def create_exam_session(request: CreateExamSessionRequest = Body(default=CreateExamSessionRequest())):
+    session = exam_session_service.create(request.sections)
+    return _exam_session_response(session.id)
+
+
+@app.get(
+    "/exam-sessions/{session_id}",
+    response_model=ExamSessionResponse,
+    summary="Get an exam session",
+    description="Returns the section stubs of an exam session and which sections have been loaded.",
+)
+async def get_exam_session(session_id: str):
+    try:
+        return _exam_session_response(session_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@app.get(
+    "/exam-sessions/{session_id}/sections/{kind}",
+    response_model=ExamSectionResponse,
+    summary="Load an exam section",
+    description="Returns a section of the session without correct answers or explanations, generating it on first request. Later requests return the same section.",
+)
+async def get_exam_session_section(session_id: str, kind: SectionKind):
+    try:
+        content = await exam_session_service.load_section(session_id, kind)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return ExamSectionResponse(session_id=session_id, kind=kind, content=content)
+
+
+@app.post(
+    "/exam-sessions/{session_id}/sections/{kind}/grade",
+    response_model=GradeSectionResponse,
+    summary="Grade an exam section",
+    description="Grades the submitted answers for a loaded section against its answer key, which stays on the server. Unanswered questions count as wrong. Only the first submission is graded; later ones return its result.",
+)
+async def grade_exam_session_section(session_id: str, kind: SectionKind, request: GradeSectionRequest):
+    try:
+        results = exam_session_service.grade(session_id, kind, request.answers)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except SectionNotReadyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return GradeSectionResponse(
+        session_id=session_id,
+        kind=kind,
+        score=sum(1 for _, _, correct in results if correct),
+        total=len(results),
+        results=[
+            QuestionResult(question_id=question_id, answered=answered, correct=correct)
+            for question_id, answered, correct in results
+        ],
+    )
+
+
+@app.get(
+    "/exam-sessions/{session_id}/sections/{kind}/explanations",
+    response_model=ExamSectionExplanationsResponse,
+    summary="Get the explanations for a graded exam section",
+    description="Returns the correct answer and explanation for each question of a section once it has been graded.",
+)
+async def get_exam_session_explanations(session_id: str, kind: SectionKind):
+    try:
+        keys = exam_session_service.explanations(session_id, kind)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except SectionNotReadyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return ExamSectionExplanationsResponse(
+        session_id=session_id,
+        kind=kind,
+        explanations=[
+            QuestionExplanation(question_id=question_id, correct_answer=correct, explanation=explanation)
+            for question_id, correct, explanation in keys
+        ],
+    )
+
+
+def _job_response(job) -> JobResponse:
+    return JobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        result_href=f"/jobs/{job.id}/result" if job.status == "succeeded" else None,
+    )
+
+
+@app.post(
+    "/jobs",
+    response_model=JobResponse,
+    status_code=202,
+    summary="Submit a background job",
+    description="Queues a section generation or audio rendering job and returns its id at once. A submission identical to a queued or running job returns that job; for audio jobs, so does one identical to a succeeded job.",
+)
+async def create_job(request: CreateJobRequest):
+    try:
+        job = await job_service.submit(request.kind, request.params)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return _job_response(job)
+
+
+@app.get(
+    "/jobs/{job_id}",
+    response_model=JobResponse,
+    summary="Get a background job",
+    description="Returns the status of a job. With `wait`, waits up to that many seconds (at most 60) for the job to finish first.",
+)
+async def get_job(job_id: str, wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish (at most 60).")):
+    try:
+        job = await job_service.wait(job_id, wait)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return _job_response(job)
+
+
+@app.api_route(
+    "/jobs/{job_id}/result",
+    methods=["GET", "HEAD"],
+    response_class=Response,
+    summary="Get the result of a background job",
+    description="Returns the result of a succeeded job: the section as JSON, or the audio (supporting Range requests). Returns 409 if the job has not succeeded.",
+)
+async def get_job_result(job_id: str, request: Request):
+    try:
+        path, media_type = job_service.result_path(job_id)
+        return ImmutableFileResponse(request, path, etag=job_id, media_type=media_type)
+    except (KeyError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail=f"No result for job '{job_id}'.")
+    except JobNotReadyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
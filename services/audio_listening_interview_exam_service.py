@@ -1,13 +1,13 @@
+import asyncio
 import os
 import random
-import io
-from openai import OpenAI
 from dotenv import load_dotenv
 from workflows.generate_interview import ConversationSegment
-import instructor
-from typing import List, Generator, Optional
-from concurrent.futures import ThreadPoolExecutor
-from pydub import AudioSegment
+from typing import AsyncIterator, Iterator, List, Optional
+from services.audio_service import AudioService, audio_service, elevenlabs_audio_key, openai_audio_key
+from utils.audio_cache import audio_cache
+from utils.circuit_breaker import CircuitOpenError
+from utils.mp3_frames import Mp3Clip, parse_mp3, silence
 
 # Load environment variables
 load_dotenv()
@@ -22,132 +22,150 @@ OPENAI_VOICES = {
 MIN_SILENCE_MS = 300
 MAX_SILENCE_MS = 700
 
+# Chunk size when streaming a fully concatenated interview
+CHUNK_SIZE = 4096
+
 class AudioListeningInterviewExamService:
-    def __init__(self, max_workers: Optional[int] = None):
-        self.client = instructor.patch(OpenAI(
-            api_key=os.getenv("OPENAI_API_KEY"),
-        ))
+    """
+    Interview audio synthesized with OpenAI TTS, segment by segment.
+
+    Segments are synthesized concurrently as tasks on the event loop; how
+    many run at once is bounded by the scheduler's "openai-tts" gate, shared
+    with every other TTS call in the process.
+    """
+
+    def __init__(self, audio: AudioService = audio_service):
         if not os.getenv("OPENAI_API_KEY"):
             raise ValueError("OPENAI_API_KEY environment variable not set.")
-        # Initialize ThreadPoolExecutor
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # ElevenLabs is used for segments while OpenAI TTS is failing
+        self.audio_service = audio
 
     def get_voice(self, gender: str) -> str:
         """Get the consistent OpenAI voice for the given gender."""
         return OPENAI_VOICES.get(gender.lower(), OPENAI_VOICES["male"])
 
-    def _generate_segment_audio_segment(self, segment: ConversationSegment) -> Optional[AudioSegment]:
-        """Generates audio, loads it into pydub AudioSegment, returns it or None on error."""
+    def clip_id(self, segment: ConversationSegment) -> str:
+        """Identifier of the segment's clip in the audio cache."""
+        return openai_audio_key(segment.text, self.get_voice(segment.speaker_gender))
+
+    async def synthesize_segment(self, segment: ConversationSegment) -> bytes:
+        """
+        Synthesizes a segment with OpenAI TTS. When OpenAI fails or its circuit
+        breaker is open, the segment is synthesized with ElevenLabs instead.
+        Either way, segments already in the audio cache are not synthesized again.
+        """
+        try:
+            return await self.audio_service.synthesize_openai(segment.text, self.get_voice(segment.speaker_gender))
+        except Exception as e:
+            if not isinstance(e, CircuitOpenError):
+                print(f"[Warning] OpenAI TTS failed, falling back to ElevenLabs: {e}")
+            voice_id = self.audio_service.get_voice(segment.speaker_gender, 0)
+            audio_bytes = await self.audio_service.synthesize_elevenlabs(segment.text, voice_id)
+            audio_cache.alias(self.clip_id(segment), elevenlabs_audio_key(segment.text, voice_id))
+            return audio_bytes
+
+    async def _generate_segment_clip(self, segment: ConversationSegment) -> Optional[Mp3Clip]:
+        """Synthesizes a segment and splits it into MP3 frames, returns None on error."""
         try:
-            voice = self.get_voice(segment.speaker_gender)
-            response = self.client.audio.speech.create(
-                model="gpt-4o-mini-tts",
-                voice=voice,
-                input=segment.text,
-                response_format="mp3"
-            )
-            audio_bytes = response.read()
-            # Load bytes into pydub segment
-            segment_audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format="mp3")
-            return segment_audio
+            return parse_mp3(await self.synthesize_segment(segment))
         except Exception as e:
-            # Catch OpenAI errors or pydub loading errors
+            # Catch TTS errors or unparseable audio
             print(f"[Error] Failed processing segment '{segment.text[:30]}...': {e}")
             return None # Indicate failure
 
-    def _generate_silence_segment(self, duration_ms: int) -> AudioSegment:
-        """Generates silent pydub AudioSegment."""
-        return AudioSegment.silent(duration=duration_ms)
+    def _start(self, segments: List[ConversationSegment]) -> List[asyncio.Task]:
+        return [asyncio.ensure_future(self._generate_segment_clip(segment)) for segment in segments]
 
-    def generate_concatenated_streaming_audio(self, segments: List[ConversationSegment]) -> Generator[bytes, None, None]:
+    async def _segment_parts(self, tasks: List[asyncio.Task], skip_failed: bool = True) -> AsyncIterator[bytes]:
         """
-        Generates audio segments in parallel, concatenates them using pydub 
-        with variable silence, exports the final audio, and streams the result.
+        Yields the frames of each successful segment in order, preceded by a
+        random silence in the same format from the second one on. Without
+        `skip_failed`, a failed segment raises RuntimeError instead.
+
+        The first segment sets the stream's format. A segment synthesized in
+        a format that can't follow it (e.g. by the ElevenLabs fallback, at a
+        different sample rate than OpenAI TTS) counts as failed, since a
+        sample rate change mid-stream breaks many decoders.
+        """
+        is_first_successful_part = True
+        stream_format = None
+        for index, task in enumerate(tasks):
+            clip = await task
+            if clip is not None and stream_format is not None and not stream_format.splices_with(clip.format):
+                print(
+                    f"[Warning] Segment {index} is {clip.format.sample_rate} Hz, "
+                    f"the interview {stream_format.sample_rate} Hz; treating it as failed."
+                )
+                clip = None
+            if clip is None:
+                if not skip_failed:
+                    raise RuntimeError(f"Audio for segment {index} could not be generated.")
+                print(f"[Warning] Skipping segment due to generation failure.")
+                continue
+            if not is_first_successful_part:
+                yield silence(clip.format, random.randint(MIN_SILENCE_MS, MAX_SILENCE_MS))
+            is_first_successful_part = False
+            stream_format = stream_format or clip.format
+            yield clip.frames
+
+    async def generate_concatenated_streaming_audio(
+        self, segments: List[ConversationSegment], skip_failed: bool = True
+    ) -> Iterator[bytes]:
+        """
+        Generates audio segments concurrently, splices their MP3 frames together
+        with pre-encoded silence of variable length between them, and streams
+        the result. Nothing is decoded or re-encoded.
 
         Args:
             segments: A list of ConversationSegment objects.
+            skip_failed: Leave out segments that fail; otherwise raise RuntimeError.
 
-        Yields:
-            Bytes chunks of the final concatenated MP3 audio stream.
+        Returns:
+            An iterator over bytes chunks of the final concatenated MP3 audio stream.
         """
-        CHUNK_SIZE = 4096
-        # Submit tasks to generate AudioSegment objects
-        futures = [self.executor.submit(self._generate_segment_audio_segment, segment) for segment in segments]
-
-        # Initialize an empty AudioSegment to accumulate results
-        final_audio = AudioSegment.empty()
-        is_first_successful_part = True
-
-        # Process futures and concatenate AudioSegments
-        for future in futures:
-            try:
-                segment_audio = future.result() # Get the AudioSegment result
-
-                if segment_audio:
-                    # Add silence before this segment if it's not the very first successful part
-                    if not is_first_successful_part:
-                        silence_duration = random.randint(MIN_SILENCE_MS, MAX_SILENCE_MS)
-                        silence_segment = self._generate_silence_segment(silence_duration)
-                        final_audio += silence_segment # Concatenate using pydub
-                    else:
-                        is_first_successful_part = False
-
-                    # Concatenate the actual segment audio
-                    final_audio += segment_audio
-                else:
-                    print(f"[Warning] Skipping segment due to generation failure.")
-
-            except Exception as e:
-                print(f"[Error] Failed to retrieve or process result from future: {e}")
-
-        # Export the final combined audio to an in-memory buffer
-        final_buffer = io.BytesIO()
+        tasks = self._start(segments)
         try:
-            if len(final_audio) > 0:
-                 final_audio.export(final_buffer, format="mp3")
-                 final_buffer.seek(0) # Rewind buffer to the beginning for reading
-            else:
-                 print("[Warning] No audio segments were successfully generated. Returning empty stream.")
-                 # final_buffer remains empty
-        except Exception as e:
-            print(f"[Error] Failed to export final concatenated audio: {e}")
-            # Handle export error, maybe yield nothing or raise
-            final_buffer = io.BytesIO() # Ensure it's an empty buffer on error
-        
-        # --- Generator function to stream the final bytes from the buffer --- 
+            final_audio = b"".join([part async for part in self._segment_parts(tasks, skip_failed)])
+        finally:
+            for task in tasks:
+                task.cancel()
+        if not final_audio:
+            print("[Warning] No audio segments were successfully generated. Returning empty stream.")
+
         def _stream_final_audio():
-            while True:
-                chunk = final_buffer.read(CHUNK_SIZE)
-                if not chunk:
-                    break
-                yield chunk
-        # --- End of generator function ---
+            view = memoryview(final_audio)
+            for offset in range(0, len(view), CHUNK_SIZE):
+                yield bytes(view[offset:offset + CHUNK_SIZE])
 
         return _stream_final_audio()
 
-    def shutdown_executor(self):
-        """Should be called on application shutdown to clean up the executor."""
-        self.executor.shutdown(wait=True)
-
-# Consider adding executor shutdown logic to your FastAPI app's shutdown event
-# Example (in main.py):
-# @app.on_event("shutdown")
-# def shutdown_event():
-#     audio_listening_interview_exam_service.shutdown_executor()
-
-# Example usage (optional, for testing)
-# if __name__ == "__main__":
-#    service = AudioListeningInterviewExamService()
-#    example_segments = [
-#        ConversationSegment(speaker="interviewer", text="Hallo, willkommen.", speaker_gender="female"),
-#        ConversationSegment(speaker="interviewee", text="Danke.", speaker_gender="male"),
-#        ConversationSegment(speaker="interviewer", text="Wie geht es Ihnen?", speaker_gender="female"),
-#    ]
-#    audio_stream_generator = service.generate_concatenated_streaming_audio(example_segments)
-#
-#    output_filename = "test_parallel_output.mp3"
-#    with open(output_filename, "wb") as f:
-#        for chunk in audio_stream_generator:
-#            f.write(chunk)
-#    print(f"Audio saved to {output_filename}")
-#    service.shutdown_executor() # Shutdown executor after use 
\ No newline at end of file
+    def generate_progressive_streaming_audio(self, segments: List[ConversationSegment]) -> AsyncIterator[bytes]:
+        """
+        Streams the interview segment by segment, in order, as each becomes ready.
+
+        All segments start synthesizing concurrently right away; segment N is
+        yielded (preceded by a random silence) as soon as it and every segment
+        before it are done, so playback can start after the first segment's
+        latency. Segments that fail are skipped, as in
+        `generate_concatenated_streaming_audio`.
+
+        Args:
+            segments: A list of ConversationSegment objects.
+
+        Yields:
+            MP3 bytes, one chunk per segment or silence.
+        """
+        tasks = self._start(segments)
+
+        async def _stream_segments():
+            try:
+                async for part in self._segment_parts(tasks):
+                    yield part
+            finally:
+                # Stop waiting on segments the client won't hear; syntheses already under way finish into the audio cache
+                for task in tasks:
+                    task.cancel()
+
+        return _stream_segments()
+
+
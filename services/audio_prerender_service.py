@@ -0,0 +1,86 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, List, Optional, Set
+
+from services.audio_listening_interview_exam_service import AudioListeningInterviewExamService
+from services.audio_service import AudioService
+from services.prefetch_service import on_claim
+from utils.metrics import metrics
+from utils.scheduler import Priority, request_context
+from workflows.generate_interview import Interview
+
+__all__ = ["AudioPrerenderService", "AUDIO_PRERENDER"]
+
+# Synthesize the audio of every generated listening exam in the background
+AUDIO_PRERENDER = os.getenv("AUDIO_PRERENDER", "false").lower() in ("1", "true", "yes")
+
+
+class AudioPrerenderService:
+    """
+    Synthesizes the audio of generated listening exams ahead of playback.
+
+    When enabled, each transcript, announcement or interview starts its clips
+    synthesizing in the background lane as soon as it is generated, and gets
+    the clips' ids to return with the exam. The clips land in the audio
+    cache, so the audio requests that follow are served without waiting for
+    a provider. The ids are the cache keys the audio endpoints serve the
+    same text and speaker from. A prefetched exam is only rendered once a
+    client claims it.
+    """
+
+    def __init__(
+        self,
+        audio: AudioService,
+        interview_audio: AudioListeningInterviewExamService,
+        enabled: bool = AUDIO_PRERENDER,
+    ):
+        self._audio = audio
+        self._interview_audio = interview_audio
+        self.enabled = enabled
+        # Strong references, so running renders aren't garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    def speakers(self, kind: str, speakers: List) -> Optional[List[str]]:
+        """Pre-renders the clips of a transcript's or announcement's speakers; returns their ids."""
+        if not self.enabled:
+            return None
+        self._start(kind, [
+            lambda speaker=speaker, index=index: self._audio.synthesize(speaker.opinion, speaker.gender, index)
+            for index, speaker in enumerate(speakers)
+        ])
+        return [self._audio.clip_id(speaker.opinion, speaker.gender, index) for index, speaker in enumerate(speakers)]
+
+    def interview(self, interview: Interview) -> Optional[List[str]]:
+        """Pre-renders the clips of an interview's conversation segments; returns their ids."""
+        if not self.enabled:
+            return None
+        segments = interview.conversation_segments
+        self._start("interview", [
+            lambda segment=segment: self._interview_audio.synthesize_segment(segment) for segment in segments
+        ])
+        return [self._interview_audio.clip_id(segment) for segment in segments]
+
+    def _start(self, kind: str, calls: List[Callable[[], Awaitable[bytes]]]) -> None:
+        async def render(call: Callable[[], Awaitable[bytes]]) -> None:
+            try:
+                await call()
+                metrics.increment("audio_prerender.clips", kind=kind, result="ok")
+            except Exception as e:
+                metrics.increment("audio_prerender.clips", kind=kind, result="failed")
+                print(f"[AudioPrerender] Failed to pre-render a {kind} clip: {e}")
+
+        async def run() -> None:
+            # Low priority: live audio and exam requests go first
+            with request_context(Priority.BACKGROUND, "audio-prerender"):
+                await asyncio.gather(*[render(call) for call in calls])
+
+        def start() -> None:
+            task = asyncio.ensure_future(run())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            metrics.increment("audio_prerender.started", kind=kind)
+
+        on_claim(start)
+
+    def state(self):
+        return {"enabled": self.enabled, "running": len(self._tasks)}
@@ -1,7 +1,17 @@
-from elevenlabs import ElevenLabs, VoiceSettings
+from elevenlabs import VoiceSettings
+from elevenlabs.client import AsyncElevenLabs
+from openai import AsyncOpenAI
+import asyncio
 import os
-import uuid
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+import httpx
 from dotenv import load_dotenv
+from utils.audio_cache import audio_cache, audio_key
+from utils.circuit_breaker import get_breaker, CircuitOpenError
+from utils.metrics import metrics
+from utils.mp3_frames import parse_mp3
+from utils.scheduler import scheduler
+from utils.sentences import split_sentences
 
 # Load environment variables
 load_dotenv()
@@ -24,63 +34,285 @@ VOICE_IDS = {
     ],
 }
 
+# OpenAI voices used when ElevenLabs is unavailable
+OPENAI_FALLBACK_VOICES = {
+    "male": ["onyx", "echo", "fable"],
+    "female": ["nova", "shimmer", "alloy"],
+}
+
+ELEVENLABS_MODEL = "eleven_flash_v2_5"
+ELEVENLABS_OUTPUT_FORMAT = "mp3_22050_32"
+# Optional voice settings that allow you to customize the output
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.0,
+    "similarity_boost": 1.0,
+    "style": 0.0,
+    "use_speaker_boost": True,
+    "speed": 1.0,
+}
+OPENAI_TTS_MODEL = "gpt-4o-mini-tts"
+
+# Timeout for a single synthesis request
+TTS_TIMEOUT = float(os.getenv("TTS_TIMEOUT", "60"))
+# Synthesize multi-sentence text sentence by sentence, in parallel, caching each sentence
+TTS_SENTENCE_CHUNKING = os.getenv("TTS_SENTENCE_CHUNKING", "false").lower() in ("1", "true", "yes")
+
+
+def elevenlabs_audio_key(text: str, voice_id: str) -> str:
+    return audio_key("elevenlabs", ELEVENLABS_MODEL, voice_id, ELEVENLABS_OUTPUT_FORMAT, text, **ELEVENLABS_VOICE_SETTINGS)
+
+
+def openai_audio_key(text: str, voice: str) -> str:
+    return audio_key("openai", OPENAI_TTS_MODEL, voice, "mp3", text)
+
 
 class AudioService:
+    """
+    Text to speech with ElevenLabs, failing over to OpenAI TTS.
+
+    Both providers are called with async clients sharing one connection pool.
+    Every call goes through the scheduler's "elevenlabs" or "openai-tts"
+    gate, so concurrency per provider is bounded process-wide (see
+    <PROVIDER>_MAX_CONCURRENCY) and synthesis never blocks the event loop.
+    """
+
     def __init__(self):
-        self.client = ElevenLabs(
+        self._http_client = httpx.AsyncClient(timeout=httpx.Timeout(TTS_TIMEOUT, connect=10.0))
+        self.client = AsyncElevenLabs(
             api_key=os.getenv("ELEVENLABS_API_KEY"),
+            httpx_client=self._http_client,
         )
-        # Create audio directory if it doesn't exist
-        os.makedirs("audio", exist_ok=True)
+        self._openai_client = None
+
+    @property
+    def openai_client(self) -> AsyncOpenAI:
+        if self._openai_client is None:
+            self._openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=self._http_client)
+        return self._openai_client
+
+    async def aclose(self) -> None:
+        """Closes the provider connection pool; called on application shutdown."""
+        await self._http_client.aclose()
 
     def get_voice(self, gender: str, speaker_index: int) -> str:
         """Get the voice for the given gender and speaker index."""
         voices = VOICE_IDS[gender.lower() if gender.lower() in VOICE_IDS else "male"]
         return voices[speaker_index % len(voices)]
 
-    def generate_audio(self, text: str, gender: str, speaker_index: int) -> str:
+    async def _synthesize_cached(
+        self,
+        text: str,
+        key_of: Callable[[str], str],
+        call: Callable[[str], Awaitable[bytes]],
+    ) -> bytes:
         """
-        Generate audio for the given text using a voice based on gender and speaker index.
+        Synthesizes `text` with `call` through the audio cache. With
+        TTS_SENTENCE_CHUNKING, text of several sentences is synthesized
+        sentence by sentence in parallel, each sentence cached on its own
+        (so recurring sentences are synthesized once), and the clips are
+        spliced at the frame level; the joined clip is cached under the
+        text's key as well.
+        """
+        if TTS_SENTENCE_CHUNKING:
+            sentences = split_sentences(text)
+            if len(sentences) > 1:
+                return await audio_cache.get_or_create(
+                    key_of(text), lambda: self._join_sentences(sentences, key_of, call)
+                )
+        return await audio_cache.get_or_create(key_of(text), lambda: call(text))
 
-        Args:
-            text: The text to convert to speech
-            gender: The gender of the speaker ("male" or "female")
-            speaker_index: The index of the speaker in the conversation
+    async def _join_sentences(
+        self,
+        sentences: List[str],
+        key_of: Callable[[str], str],
+        call: Callable[[str], Awaitable[bytes]],
+    ) -> bytes:
+        clips = await asyncio.gather(*[
+            audio_cache.get_or_create(key_of(sentence), lambda sentence=sentence: call(sentence))
+            for sentence in sentences
+        ])
+        metrics.increment("audio_sentences.texts")
+        metrics.increment("audio_sentences.sentences", len(sentences))
+        return b"".join(parse_mp3(clip).frames for clip in clips)
 
-        Returns:
-            The filename of the generated audio file
+    async def synthesize_elevenlabs(self, text: str, voice_id: str) -> bytes:
         """
-        try:
-            # Get voice based on speaker's gender and position
-            voice_id = self.get_voice(gender, speaker_index)
+        Synthesizes `text` with ElevenLabs, guarded by the "elevenlabs" circuit
+        breaker. Clips already in the audio cache are served without a call.
+        """
+        return await self._synthesize_cached(
+            text,
+            lambda t: elevenlabs_audio_key(t, voice_id),
+            lambda t: scheduler.run("elevenlabs", lambda: self._convert_elevenlabs(t, voice_id)),
+        )
 
+    async def _convert_elevenlabs(self, text: str, voice_id: str) -> bytes:
+        breaker = get_breaker("elevenlabs")
+        breaker.check()
+        try:
             # Get the audio stream
             audio_stream = self.client.text_to_speech.convert(
                 text=text,
                 voice_id=voice_id,
-                output_format="mp3_22050_32",
-                model_id="eleven_flash_v2_5",
-                # Optional voice settings that allow you to customize the output
-                voice_settings=VoiceSettings(
-                    stability=0.0,
-                    similarity_boost=1.0,
-                    style=0.0,
-                    use_speaker_boost=True,
-                    speed=1.0,
-                ),
+                output_format=ELEVENLABS_OUTPUT_FORMAT,
+                model_id=ELEVENLABS_MODEL,
+                voice_settings=VoiceSettings(**ELEVENLABS_VOICE_SETTINGS),
             )
 
             # Convert generator to bytes
-            audio_bytes = b"".join(list(audio_stream))
-
-            # Generate unique filename
-            filename = f"audio/{uuid.uuid4()}.mp3"
+            audio_bytes = b"".join([chunk async for chunk in audio_stream])
+        except asyncio.CancelledError:
+            breaker.release_trial()
+            raise
+        except Exception as e:
+            breaker.record(e)
+            raise
+        breaker.record_success()
+        return audio_bytes
 
-            # Save the audio to a file
-            with open(filename, "wb") as f:
-                f.write(audio_bytes)
+    async def synthesize_openai(self, text: str, voice: str) -> bytes:
+        """
+        Synthesizes `text` with OpenAI TTS, guarded by the "openai-tts" circuit
+        breaker. Clips already in the audio cache are served without a call.
+        """
+        return await self._synthesize_cached(
+            text,
+            lambda t: openai_audio_key(t, voice),
+            lambda t: scheduler.run("openai-tts", lambda: self.speech_openai(t, voice)),
+        )
 
-            return filename
+    async def speech_openai(self, text: str, voice: str) -> bytes:
+        """One uncached OpenAI TTS call, guarded by the "openai-tts" circuit breaker."""
+        breaker = get_breaker("openai-tts")
+        breaker.check()
+        try:
+            response = await self.openai_client.audio.speech.create(
+                model=OPENAI_TTS_MODEL,
+                voice=voice,
+                input=text,
+                response_format="mp3",
+            )
+            audio_bytes = await response.aread()
+        except asyncio.CancelledError:
+            breaker.release_trial()
+            raise
         except Exception as e:
-            print(f"Audio generation error: {e}")
+            breaker.record(e)
             raise
+        breaker.record_success()
+        return audio_bytes
+
+    def _openai_voice(self, gender: str, speaker_index: int) -> str:
+        voices = OPENAI_FALLBACK_VOICES[gender.lower() if gender.lower() in OPENAI_FALLBACK_VOICES else "male"]
+        return voices[speaker_index % len(voices)]
+
+    async def cached_audio(self, text: str, gender: str, speaker_index: int) -> Optional[bytes]:
+        """Returns the clip `synthesize` would produce if either provider's version is already cached."""
+        for key in (
+            elevenlabs_audio_key(text, self.get_voice(gender, speaker_index)),
+            openai_audio_key(text, self._openai_voice(gender, speaker_index)),
+        ):
+            if audio_cache.contains(key):
+                audio_bytes = await audio_cache.aget(key)
+                if audio_bytes is not None:
+                    return audio_bytes
+        return None
+
+    async def stream_elevenlabs(self, text: str, voice_id: str) -> AsyncIterator[bytes]:
+        """
+        Yields the ElevenLabs audio for `text` chunk by chunk as the provider
+        sends it, holding an "elevenlabs" slot for the duration. The complete
+        clip is added to the audio cache once the stream ends; a stream that
+        is closed early leaves nothing behind.
+        """
+        key = elevenlabs_audio_key(text, voice_id)
+        if audio_cache.contains(key):
+            audio_bytes = await audio_cache.aget(key)
+            if audio_bytes is not None:
+                yield audio_bytes
+                return
+
+        breaker = get_breaker("elevenlabs")
+        breaker.check()
+        chunks = []
+        try:
+            async with scheduler.slot("elevenlabs") as gate:
+                try:
+                    async for chunk in self.client.text_to_speech.convert_as_stream(
+                        voice_id,
+                        text=text,
+                        output_format=ELEVENLABS_OUTPUT_FORMAT,
+                        model_id=ELEVENLABS_MODEL,
+                        voice_settings=VoiceSettings(**ELEVENLABS_VOICE_SETTINGS),
+                    ):
+                        chunks.append(chunk)
+                        yield chunk
+                except (GeneratorExit, asyncio.CancelledError):
+                    # The consumer went away; that says nothing about the provider
+                    raise
+                except Exception as e:
+                    breaker.record(e)
+                    raise
+                gate.on_success()
+        except BaseException:
+            # Cancelled, closed early or never got a slot: give back a half-open
+            # trial slot (a no-op once the outcome was recorded above)
+            breaker.release_trial()
+            raise
+        breaker.record_success()
+        await audio_cache.aput(key, b"".join(chunks))
+
+    async def stream(self, text: str, gender: str, speaker_index: int) -> AsyncIterator[bytes]:
+        """
+        Streaming counterpart of `synthesize`. Fails over to OpenAI TTS if
+        ElevenLabs fails before its first chunk; after that the stream is
+        committed to ElevenLabs. With TTS_SENTENCE_CHUNKING, text of several
+        sentences is synthesized by sentence and sent as one chunk instead.
+        """
+        if TTS_SENTENCE_CHUNKING and len(split_sentences(text)) > 1:
+            # Parallel sentences finish sooner than one long streamed call
+            yield await self.synthesize(text, gender, speaker_index)
+            return
+
+        chunks = self.stream_elevenlabs(text, self.get_voice(gender, speaker_index))
+        try:
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                if not isinstance(e, CircuitOpenError):
+                    print(f"ElevenLabs streaming failed, falling back to OpenAI: {e}")
+                yield await self._synthesize_fallback(text, gender, speaker_index)
+                return
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    def clip_id(self, text: str, gender: str, speaker_index: int) -> str:
+        """Stable identifier of the clip for `text` in this speaker's voice."""
+        return elevenlabs_audio_key(text, self.get_voice(gender, speaker_index))
+
+    async def synthesize(self, text: str, gender: str, speaker_index: int) -> bytes:
+        """
+        Synthesizes `text` with ElevenLabs, failing over to OpenAI TTS when the
+        ElevenLabs call fails or its circuit breaker is open.
+        """
+        try:
+            return await self.synthesize_elevenlabs(text, self.get_voice(gender, speaker_index))
+        except Exception as e:
+            if not isinstance(e, CircuitOpenError):
+                print(f"ElevenLabs synthesis failed, falling back to OpenAI: {e}")
+            return await self._synthesize_fallback(text, gender, speaker_index)
+
+    async def _synthesize_fallback(self, text: str, gender: str, speaker_index: int) -> bytes:
+        voice = self._openai_voice(gender, speaker_index)
+        audio_bytes = await self.synthesize_openai(text, voice)
+        # The clip id is derived from the ElevenLabs voice; point it at what was actually synthesized
+        audio_cache.alias(self.clip_id(text, gender, speaker_index), openai_audio_key(text, voice))
+        return audio_bytes
+
+
+audio_service = AudioService()
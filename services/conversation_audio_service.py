@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+from typing import AsyncIterator, List, Tuple
+
+from services.audio_service import AudioService, audio_service
+from utils.metrics import metrics
+from utils.mp3_frames import parse_mp3, silence
+
+__all__ = ["ConversationAudioService", "SPEAKER_PAUSE_MS"]
+
+# Pause between two speakers in a concatenated conversation
+SPEAKER_PAUSE_MS = 1000
+
+
+class ConversationAudioService:
+    """
+    Audio for every speaker of a transcript or announcement in one response.
+
+    All speakers are synthesized concurrently (bounded by the provider
+    gates), each with the voice `/listening-exam/audio` assigns to its
+    position, so the clips are shared with that endpoint through the audio
+    cache. The result is either one stream with a pause between speakers or
+    a bundle with a clip per speaker.
+    """
+
+    def __init__(self, audio: AudioService = audio_service):
+        self._audio = audio
+
+    def _start(self, speakers: List) -> List[asyncio.Task]:
+        metrics.increment("conversation_audio.requests")
+        return [
+            asyncio.ensure_future(self._audio.synthesize(speaker.opinion, speaker.gender, index))
+            for index, speaker in enumerate(speakers)
+        ]
+
+    def stream(self, speakers: List) -> AsyncIterator[bytes]:
+        """
+        Streams the speakers' clips in order, each as soon as it and those
+        before it are ready, with SPEAKER_PAUSE_MS of silence in between.
+        Clips are spliced at the frame level. A speaker that can't be
+        synthesized ends the stream with an error rather than being skipped,
+        which would misalign the questions. So does a speaker whose clip
+        can't be spliced onto the first one's (e.g. from the OpenAI fallback,
+        at a different sample rate than ElevenLabs); the bundle has no such
+        restriction.
+        """
+        tasks = self._start(speakers)
+
+        async def _stream_speakers():
+            try:
+                stream_format = None
+                for index, task in enumerate(tasks):
+                    clip = parse_mp3(await task)
+                    if stream_format is None:
+                        stream_format = clip.format
+                    elif not stream_format.splices_with(clip.format):
+                        raise ValueError(
+                            f"Audio for speaker {index} is {clip.format.sample_rate} Hz, "
+                            f"the conversation {stream_format.sample_rate} Hz."
+                        )
+                    if index:
+                        yield silence(clip.format, SPEAKER_PAUSE_MS)
+                    yield clip.frames
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return _stream_speakers()
+
+    async def bundle(self, speakers: List) -> Tuple[bytes, str]:
+        """
+        Returns a multipart/form-data body with one `audio/mpeg` part per
+        speaker, named `speaker-<index>` with the clip id as its filename,
+        and the content type to send it with.
+        """
+        tasks = self._start(speakers)
+        try:
+            clips = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        boundary = uuid.uuid4().hex
+        parts = []
+        for index, (speaker, clip) in enumerate(zip(speakers, clips)):
+            clip_id = self._audio.clip_id(speaker.opinion, speaker.gender, index)
+            parts.append(
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="speaker-{index}"; filename="{clip_id}.mp3"\r\n'
+                f"Content-Type: audio/mpeg\r\n\r\n".encode()
+            )
+            parts.append(clip)
+            parts.append(b"\r\n")
+        parts.append(f"--{boundary}--\r\n".encode())
+        return b"".join(parts), f"multipart/form-data; boundary={boundary}"
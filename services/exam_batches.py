@@ -0,0 +1,63 @@
+import asyncio
+import os
+from collections import deque
+from typing import Awaitable, Callable, Deque, Generic, List, Optional, TypeVar
+
+from utils.metrics import metrics
+
+__all__ = ["BatchPool", "LISTENING_BATCH_SIZE"]
+
+T = TypeVar("T")
+
+# Listening exams requested per LLM call; 1 disables batching
+LISTENING_BATCH_SIZE = max(1, int(os.getenv("LISTENING_BATCH_SIZE", "3")))
+
+
+class _Batch(Generic[T]):
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.claimed = 0
+
+
+class BatchPool(Generic[T]):
+    """
+    Serves exams generated `batch_size` at a time by one call.
+
+    Requests that arrive while a batch is being generated claim one of its
+    exams until all are claimed; only then does the next request start a new
+    batch. Exams nobody claimed are kept and served to later requests
+    before any new generation.
+    """
+
+    def __init__(self, name: str, generate_batch: Callable[[int], Awaitable[List[T]]], batch_size: int = LISTENING_BATCH_SIZE):
+        self.name = name
+        self._generate_batch = generate_batch
+        self._batch_size = max(1, batch_size)
+        self._ready: Deque[T] = deque()
+        self._open: Optional[_Batch[T]] = None
+
+    async def next(self) -> T:
+        if self._ready:
+            metrics.increment("exam_batches.served", exam=self.name, source="buffer")
+            return self._ready.popleft()
+
+        batch = self._open
+        if batch is None or batch.claimed >= self._batch_size:
+            batch = self._open = _Batch()
+            batch.task = asyncio.ensure_future(self._run(batch))
+        index = batch.claimed
+        batch.claimed += 1
+        exams = await asyncio.shield(batch.task)
+        metrics.increment("exam_batches.served", exam=self.name, source="batch")
+        return exams[index]
+
+    async def _run(self, batch: "_Batch[T]") -> List[T]:
+        try:
+            exams = await self._generate_batch(self._batch_size)
+        finally:
+            # No more claims once the batch is done; later requests start a new one
+            if self._open is batch:
+                self._open = None
+        metrics.increment("exam_batches.generated", exam=self.name)
+        self._ready.extend(exams[batch.claimed:])
+        return exams
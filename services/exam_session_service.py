@@ -0,0 +1,246 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel
+
+from services.prefetch_service import start_prefetch
+from utils.metrics import metrics
+
+__all__ = ["ExamSession", "ExamSessionService", "SECTION_TITLES", "SectionNotReadyError"]
+
+# Sessions kept in memory, least recently used are evicted first
+MAX_SESSIONS = int(os.getenv("EXAM_SESSION_MAX_SESSIONS", "1000"))
+# Sessions expire this long after their last use
+SESSION_TTL_SECONDS = float(os.getenv("EXAM_SESSION_TTL_SECONDS", str(4 * 3600)))
+
+SECTION_TITLES: Dict[str, str] = {
+    "transcript": "Hörverstehen: Meinungen",
+    "announcement": "Hörverstehen: Durchsagen",
+    "interview": "Hörverstehen: Interview",
+    "advert": "Leseverstehen: Anzeigen",
+    "match_titles": "Leseverstehen: Überschriften",
+    "comprehension": "Leseverstehen: Text",
+    "writing": "Schriftlicher Ausdruck",
+}
+
+_ANSWER_FIELDS = {"correct_answer", "explanation"}
+
+# Fields left out of the section content sent to the client
+_HIDDEN_FIELDS: Dict[str, Dict[str, Any]] = {
+    "transcript": {"conversation": {"speakers": {"__all__": _ANSWER_FIELDS}}},
+    "announcement": {"announcement": {"speakers": {"__all__": _ANSWER_FIELDS}}},
+    "interview": {"interview": {"exam_questions": {"__all__": _ANSWER_FIELDS}}},
+    "advert": {"questions": {"__all__": {"correct_advert_id", "explanation"}}},
+    "match_titles": {"questions": {"__all__": {"correct_title_id", "explanation"}}},
+    "comprehension": {"questions": {"__all__": {"correct_option_id", "explanation"}}},
+}
+
+# (question id, correct answer, explanation) for each question of a section
+AnswerKey = Tuple[str, Union[bool, str], str]
+
+
+def _speaker_keys(speakers: List[Any]) -> List[AnswerKey]:
+    # Listening questions have no ids of their own; they are identified by position
+    return [(str(i), speaker.correct_answer, speaker.explanation) for i, speaker in enumerate(speakers)]
+
+
+_ANSWER_KEYS: Dict[str, Callable[[Any], List[AnswerKey]]] = {
+    "transcript": lambda result: _speaker_keys(result.conversation.speakers),
+    "announcement": lambda result: _speaker_keys(result.announcement.speakers),
+    "interview": lambda result: [
+        (str(i), question.correct_answer, question.explanation)
+        for i, question in enumerate(result.interview.exam_questions)
+    ],
+    "advert": lambda result: [(q.id, q.correct_advert_id, q.explanation) for q in result.questions],
+    "match_titles": lambda result: [(q.id, q.correct_title_id, q.explanation) for q in result.questions],
+    "comprehension": lambda result: [(q.id, q.correct_option_id, q.explanation) for q in result.questions],
+    # Letters are reviewed by /writing-exam/review rather than graded against a key
+    "writing": lambda result: [],
+}
+
+
+class SectionNotReadyError(Exception):
+    """Raised when a section is graded before loading or without an answer key, or explained before grading."""
+
+
+@dataclass
+class ExamSession:
+    id: str
+    kinds: List[str]
+    results: Dict[str, BaseModel] = field(default_factory=dict)
+    # The first grading of each section; it stands once the answers have been graded
+    grades: Dict[str, List[Tuple[str, bool, bool]]] = field(default_factory=dict)
+    # Sections generated ahead of the learner opening them
+    prefetched: Set[str] = field(default_factory=set)
+    # Work deferred by a prefetched section's generation (see `on_claim`), run once it is opened
+    claim_actions: Dict[str, List[Callable[[], None]]] = field(default_factory=dict)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+def _matches(answer: Union[bool, str], correct: Union[bool, str]) -> bool:
+    if isinstance(correct, bool) and isinstance(answer, str):
+        return answer.strip().lower() == str(correct).lower()
+    return answer == correct
+
+
+class ExamSessionService:
+    """
+    Holds exams server-side for the duration of a session.
+
+    Creating a session generates nothing; it returns a stub per section. A
+    section is generated the first time it is requested and sent without its
+    answer key. Answers are graded here, and explanations (with the correct
+    answers) are released for a section once it has been graded. Opening a
+    section starts generating the one after it in the background, so it is
+    usually ready by the time the learner gets there; sections further
+    ahead are never generated or transferred unless opened.
+    """
+
+    def __init__(
+        self,
+        generators: Dict[str, Callable[[], Awaitable[BaseModel]]],
+        max_sessions: int = MAX_SESSIONS,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+    ):
+        self._generators = generators
+        self._max_sessions = max_sessions
+        self._ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, ExamSession]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def create(self, kinds: Optional[List[str]] = None) -> ExamSession:
+        kinds = list(dict.fromkeys(kinds)) if kinds else list(self._generators)
+        for kind in kinds:
+            if kind not in self._generators:
+                raise KeyError(f"Unknown exam section '{kind}'.")
+        session = ExamSession(id=uuid.uuid4().hex, kinds=kinds)
+        with self._lock:
+            self._sessions[session.id] = session
+            while len(self._sessions) > self._max_sessions:
+                self._discard(self._sessions.popitem(last=False)[1])
+        metrics.increment("exam_sessions.created")
+        return session
+
+    def get(self, session_id: str) -> ExamSession:
+        """
+        Raises:
+            KeyError: If the session does not exist or has expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and now - session.last_used > self._ttl_seconds:
+                self._discard(self._sessions.pop(session_id))
+                session = None
+            if session is None:
+                raise KeyError(f"No exam session with id '{session_id}'.")
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    @staticmethod
+    def _discard(session: ExamSession) -> None:
+        for kind in session.prefetched:
+            metrics.increment("prefetch.wasted", kind=kind, reason="expired")
+
+    def _section(self, session_id: str, kind: str) -> ExamSession:
+        session = self.get(session_id)
+        if kind not in session.kinds:
+            raise KeyError(f"Exam session '{session_id}' has no '{kind}' section.")
+        return session
+
+    def question_count(self, session: ExamSession, kind: str) -> Optional[int]:
+        result = session.results.get(kind)
+        return len(_ANSWER_KEYS[kind](result)) if result is not None else None
+
+    async def load_section(self, session_id: str, kind: str) -> Dict[str, Any]:
+        """Returns the section content without its answer key, generating the section on first request."""
+        session = self._section(session_id, kind)
+        claim_actions = session.claim_actions.pop(kind, None)
+        if kind in session.prefetched:
+            session.prefetched.discard(kind)
+            # A failed prefetch leaves neither a result nor a running generation
+            ready = kind in session.results or (session.id, kind) in self._inflight
+            metrics.increment("prefetch.requests", kind=kind, result="hit" if ready else "miss")
+            if not ready:
+                claim_actions = None
+        self._prefetch_next(session, kind)
+        result = session.results.get(kind)
+        if result is None:
+            result = await asyncio.shield(self._start(session, kind))
+        for action in claim_actions or ():
+            action()
+        return result.model_dump(mode="json", exclude=_HIDDEN_FIELDS.get(kind))
+
+    def _start(self, session: ExamSession, kind: str, prefetch: bool = False) -> asyncio.Task:
+        key = (session.id, kind)
+        task = self._inflight.get(key)
+        if task is None:
+            if prefetch:
+                claim_actions = session.claim_actions[kind] = []
+                task = start_prefetch(
+                    kind, lambda: self._generate(session, kind), source="session", claim_actions=claim_actions
+                )
+            else:
+                task = asyncio.ensure_future(self._generate(session, kind))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def _prefetch_next(self, session: ExamSession, kind: str) -> None:
+        index = session.kinds.index(kind) + 1
+        if index < len(session.kinds):
+            next_kind = session.kinds[index]
+            if next_kind not in session.results and (session.id, next_kind) not in self._inflight:
+                session.prefetched.add(next_kind)
+                self._start(session, next_kind, prefetch=True)
+
+    async def _generate(self, session: ExamSession, kind: str) -> BaseModel:
+        result = await self._generators[kind]()
+        session.results[kind] = result
+        metrics.increment("exam_sessions.sections_loaded", kind=kind)
+        return result
+
+    def _answer_keys(self, session_id: str, kind: str) -> List[AnswerKey]:
+        session = self._section(session_id, kind)
+        result = session.results.get(kind)
+        if result is None:
+            raise SectionNotReadyError(f"The '{kind}' section has not been loaded yet.")
+        return _ANSWER_KEYS[kind](result)
+
+    def grade(self, session_id: str, kind: str, answers: Dict[str, Union[bool, str]]) -> List[Tuple[str, bool, bool]]:
+        """
+        Returns (question id, answered, correct) for each question of the
+        section. Only the first submission is graded: once it has been (and
+        the explanations may have revealed the answers), later submissions
+        get the recorded result.
+        """
+        keys = self._answer_keys(session_id, kind)
+        if not keys:
+            raise SectionNotReadyError(f"The '{kind}' section has no answer key; use its review endpoint.")
+        session = self.get(session_id)
+        with self._lock:
+            recorded = session.grades.get(kind)
+            if recorded is not None:
+                metrics.increment("exam_sessions.regrades_ignored", kind=kind)
+                return recorded
+            results = session.grades[kind] = [
+                (question_id, question_id in answers, question_id in answers and _matches(answers[question_id], correct))
+                for question_id, correct, _ in keys
+            ]
+        metrics.increment("exam_sessions.graded", kind=kind)
+        return results
+
+    def explanations(self, session_id: str, kind: str) -> List[AnswerKey]:
+        """Returns the answer key with explanations, once the section has been graded."""
+        keys = self._answer_keys(session_id, kind)
+        if kind not in self.get(session_id).grades:
+            raise SectionNotReadyError(f"The '{kind}' section has not been graded yet.")
+        return keys
@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+from typing import Any, Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+from utils.metrics import metrics
+
+__all__ = ["ExamVariant", "VariantPool", "source_id_for", "VARIANTS_PER_GENERATION"]
+
+T = TypeVar("T")
+
+# Exams derived from one generation before a fresh one is requested from the LLM
+VARIANTS_PER_GENERATION = int(os.getenv("VARIANTS_PER_GENERATION", "20"))
+
+
+def source_id_for(source: Any) -> str:
+    """Content hash of a generated exam (or list of exam parts)."""
+    if isinstance(source, BaseModel):
+        payload = source.model_dump(mode="json")
+    elif isinstance(source, list):
+        payload = [item.model_dump(mode="json") if isinstance(item, BaseModel) else item for item in source]
+    else:
+        payload = source
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:32]
+
+
+class ExamVariant(Generic[T]):
+    """
+    One derived exam: the generated source plus a variant number.
+
+    `rng` is seeded from the source id and variant number, so a variant always
+    comes out the same (same subsets, same order) and `id` identifies it stably.
+    """
+
+    def __init__(self, source: T, source_id: str, number: int):
+        self.source = source
+        self.source_id = source_id
+        self.number = number
+        self.id = f"{source_id}-{number}"
+        self.rng = random.Random(self.id)
+
+    def shuffled(self, items: List[Any]) -> List[Any]:
+        items = list(items)
+        self.rng.shuffle(items)
+        return items
+
+    def sample(self, items: List[Any], k: int) -> List[Any]:
+        return self.rng.sample(list(items), min(k, len(items)))
+
+
+class VariantPool(Generic[T]):
+    """
+    Serves up to `variants_per_source` distinct variants from each generated
+    exam before generating the next one, so a single LLM call serves many users.
+
+    Concurrent requests that arrive while a generation is running wait for it
+    and receive different variants of its result.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        generate: Callable[[], Awaitable[T]],
+        variants_per_source: int = VARIANTS_PER_GENERATION,
+    ):
+        self.name = name
+        self._generate = generate
+        self._variants_per_source = max(1, variants_per_source)
+        self._source: Optional[Tuple[T, str]] = None
+        self._served = 0
+        self._lock = asyncio.Lock()
+
+    async def next(self) -> ExamVariant[T]:
+        async with self._lock:
+            if self._source is None or self._served >= self._variants_per_source:
+                source = await self._generate()
+                self._source = (source, source_id_for(source))
+                self._served = 0
+                metrics.increment("exam_variants.generations", exam=self.name)
+            source, source_id = self._source
+            number = self._served
+            self._served += 1
+        metrics.increment("exam_variants.served", exam=self.name)
+        return ExamVariant(source, source_id, number)
+
+    def variant(self, source: T, number: int) -> ExamVariant[T]:
+        """Re-derives a specific variant of a known source."""
+        return ExamVariant(source, source_id_for(source), number)
@@ -2,6 +2,7 @@ from workflows.generate_interview import generate_interview_transcript, Intervie
 from langsmith import traceable
 from typing import List, Optional
 import random
+from utils.fallback_store import fallback_store
 
 class InterviewService:
     """Service to handle the generation of interview transcripts for listening exams."""
@@ -11,16 +12,22 @@ class InterviewService:
         pass # No initialization needed
 
     @traceable(run_type="chain")
-    def generate_interview(self) -> Interview:
+    async def generate_interview(self, lean: bool = False) -> Interview:
         """Generates an interview transcript focused on the interviewee's life/career.
 
+        Args:
+            lean: Skip generating the English translation of the conversation.
+
         Returns:
             An Interview object containing the generated content.
         """
         # Call the generation function from the workflow
         try:
-            # The workflow now focuses the questions based on the interviewee's profile
-            interview_data = generate_interview_transcript()
+            # The workflow now focuses the questions based on the interviewee's profile.
+            # A stored interview from the same mode is served if generation fails.
+            interview_data = await fallback_store.with_fallback(
+                f"listening_interview{'_lean' if lean else ''}", lambda: generate_interview_transcript(lean=lean)
+            )
             return interview_data
         except Exception as e:
             print(f"Error generating interview transcript: {e}")
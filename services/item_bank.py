@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from utils.metrics import metrics
+from utils.seeding import exam_random, seeded_random
+from utils.scheduler import Priority, request_context
+from services.prefetch_service import on_claim
+
+__all__ = ["BankItem", "ItemBank", "item_bank"]
+
+M = TypeVar("M", bound=BaseModel)
+
+# Times an item may appear in assembled exams before it is retired
+MAX_SERVES = int(os.getenv("ITEM_BANK_MAX_SERVES", "50"))
+# Optional JSONL file the bank is persisted to and reloaded from
+ITEM_BANK_PATH = os.getenv("ITEM_BANK_PATH")
+
+
+@dataclass
+class BankItem:
+    id: str
+    kind: str
+    topic: str
+    payload: Dict[str, Any]
+    added_at: float = field(default_factory=time.time)
+    served: int = 0
+
+    def as_model(self, model: Type[M]) -> M:
+        return model.model_validate(self.payload)
+
+
+def _item_id(kind: str, payload: Dict[str, Any]) -> str:
+    return hashlib.sha256(f"{kind}:{json.dumps(payload, sort_keys=True, ensure_ascii=False)}".encode()).hexdigest()[:32]
+
+
+class ItemBank:
+    """
+    Stores individually reusable exam items (an advert question, a match-title
+    text, an announcement scenario, a comprehension text with its questions)
+    with their kind and topic, and assembles sections from them locally.
+
+    Assembly never repeats an item within a section, picks items from distinct
+    topics, and prefers the least served items; items are retired after
+    MAX_SERVES uses. When the stock of a kind runs low a refill is started in
+    the background lane, so generation happens ahead of demand.
+    """
+
+    def __init__(self, path: Optional[str] = ITEM_BANK_PATH, max_serves: int = MAX_SERVES):
+        self._path = path
+        self._max_serves = max_serves
+        self._items: Dict[str, Dict[str, BankItem]] = {}
+        self._refills: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                item = BankItem(**record)
+                self._items.setdefault(item.kind, {})[item.id] = item
+        print(f"[ItemBank] Loaded {sum(len(items) for items in self._items.values())} items from {path}")
+
+    def add(self, kind: str, topic: str, item: BaseModel) -> bool:
+        """Adds an item; returns False if the same item is already stored."""
+        payload = item.model_dump(mode="json")
+        bank_item = BankItem(id=_item_id(kind, payload), kind=kind, topic=topic, payload=payload)
+        with self._lock:
+            items = self._items.setdefault(kind, {})
+            if bank_item.id in items:
+                return False
+            items[bank_item.id] = bank_item
+            if self._path:
+                with open(self._path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(bank_item.__dict__, ensure_ascii=False) + "\n")
+        metrics.increment("item_bank.added", kind=kind)
+        return True
+
+    def available(self, kind: str, where: Optional[Callable[[BankItem], bool]] = None) -> int:
+        """Number of items of `kind` that can still be served."""
+        with self._lock:
+            return sum(
+                1 for item in self._items.get(kind, {}).values()
+                if item.served < self._max_serves and (where is None or where(item))
+            )
+
+    def assemble(
+        self,
+        kind: str,
+        count: int,
+        where: Optional[Callable[[BankItem], bool]] = None,
+    ) -> Optional[List[BankItem]]:
+        """
+        Picks `count` distinct items of `kind` with distinct topics, least served
+        first, and marks them served (for a prefetched section, once it is
+        claimed). Returns None (serving nothing) if the bank can't satisfy the
+        constraints.
+        """
+        with self._lock:
+            candidates = [
+                item for item in self._items.get(kind, {}).values()
+                if item.served < self._max_serves and (where is None or where(item))
+            ]
+            # Least served first, random among equals so sections don't repeat as a whole
+            exam_random().shuffle(candidates)
+            candidates.sort(key=lambda item: item.served)
+
+            selected: List[BankItem] = []
+            topics = set()
+            for item in candidates:
+                topic = item.topic.strip().lower()
+                if topic in topics:
+                    continue
+                selected.append(item)
+                topics.add(topic)
+                if len(selected) == count:
+                    break
+
+            if len(selected) < count:
+                metrics.increment("item_bank.assembly", kind=kind, result="miss")
+                return None
+        on_claim(lambda: self._mark_served(selected))
+        metrics.increment("item_bank.assembly", kind=kind, result="hit")
+        return selected
+
+    def _mark_served(self, items: List[BankItem]) -> None:
+        with self._lock:
+            for item in items:
+                item.served += 1
+
+    def ensure_stock(self, kind: str, minimum: int, refill: Callable[[], Awaitable[Any]], where: Optional[Callable[[BankItem], bool]] = None) -> None:
+        """Starts a background refill of `kind` if fewer than `minimum` items are left and none is running."""
+        if self.available(kind, where) >= minimum:
+            return
+        running = self._refills.get(kind)
+        if running is not None and not running.done():
+            return
+
+        async def run_refill():
+            # Refills run in the background lane so they never delay user requests,
+            # and unseeded so a seeded request doesn't fix the topics of the refill
+            with request_context(Priority.BACKGROUND, "background"), seeded_random(None):
+                try:
+                    await refill()
+                    metrics.increment("item_bank.refills", kind=kind)
+                except Exception as e:
+                    print(f"[ItemBank] Refill of {kind} failed: {e}")
+
+        self._refills[kind] = asyncio.ensure_future(run_refill())
+
+    def state(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                kind: {
+                    "items": len(items),
+                    "available": sum(1 for item in items.values() if item.served < self._max_serves),
+                    "topics": len({item.topic for item in items.values()}),
+                }
+                for kind, items in self._items.items()
+            }
+
+
+# Process-wide bank
+item_bank = ItemBank()
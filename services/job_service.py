@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import metrics
+from utils.scheduler import Priority, request_context
+
+__all__ = ["Job", "JobService", "JobNotReadyError", "JOB_WORKERS"]
+
+# Where job metadata and results are kept; survives restarts
+JOB_DIR = os.getenv("JOB_DIR", "cache/jobs")
+# Jobs processed at once
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Finished jobs and their results are removed this long after finishing
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", str(24 * 3600)))
+# Longest a client may long-poll a job in one request
+MAX_WAIT_SECONDS = 60.0
+
+# Normalized parameters -> (result bytes, media type)
+JobRunner = Callable[[Dict[str, Any]], Awaitable[Tuple[bytes, str]]]
+
+
+class JobNotReadyError(Exception):
+    """Raised when the result of a job that has not succeeded is requested."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    # Identifies identical submissions: kind and normalized parameters
+    key: str
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    media_type: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+
+@dataclass
+class _Handler:
+    run: JobRunner
+    parse: Callable[[Dict[str, Any]], Dict[str, Any]]
+    reuse_results: bool
+
+
+class JobService:
+    """
+    Runs long generation and audio rendering requests as jobs.
+
+    Submitting a job returns at once; JOB_WORKERS workers process the queue,
+    and each result is written to disk next to the job's metadata, so both
+    survive restarts (jobs still queued or running at shutdown are queued
+    again). Clients fetch the status, long-polling if they like, and then the
+    result. A submission identical to a queued or running job (same kind and
+    parameters) attaches to it; for kinds whose result depends only on the
+    parameters (`reuse_results`), so does one identical to a succeeded job.
+    """
+
+    def __init__(
+        self,
+        root: str = JOB_DIR,
+        workers: int = JOB_WORKERS,
+        ttl_seconds: float = JOB_TTL_SECONDS,
+    ):
+        self._root = root
+        self._workers = max(1, workers)
+        self._ttl_seconds = ttl_seconds
+        self._handlers: Dict[str, _Handler] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, str] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._load()
+
+    def register(
+        self,
+        kind: str,
+        run: JobRunner,
+        parse: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        reuse_results: bool = False,
+    ) -> None:
+        """
+        Registers a job kind. `parse` validates and normalizes submitted
+        parameters (raising ValueError) into JSON-serializable ones for `run`.
+        """
+        self._handlers[kind] = _Handler(run, parse or (lambda params: params), reuse_results)
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self._root, f"{job_id}.{suffix}")
+
+    def _load(self) -> None:
+        if not os.path.isdir(self._root):
+            return
+        for name in os.listdir(self._root):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self._root, name), encoding="utf-8") as f:
+                    job = Job(**json.load(f))
+            except (OSError, ValueError, TypeError) as e:
+                print(f"[Jobs] Skipping unreadable job {name}: {e}")
+                continue
+            if not job.finished:
+                # Interrupted by a restart
+                job.status = "queued"
+            self._jobs[job.id] = job
+            self._by_key[job.key] = job.id
+
+    def _save(self, job: Job) -> None:
+        os.makedirs(self._root, exist_ok=True)
+        path = self._path(job.id, "json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(asdict(job), f)
+        os.replace(f"{path}.tmp", path)
+
+    def _write_result(self, job: Job, result: bytes) -> None:
+        os.makedirs(self._root, exist_ok=True)
+        path = self._path(job.id, "result")
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(result)
+        os.replace(f"{path}.tmp", path)
+
+    def _remove_files(self, job_ids: List[str]) -> None:
+        for job_id in job_ids:
+            for suffix in ("json", "result"):
+                try:
+                    os.remove(self._path(job_id, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def start(self) -> None:
+        """Starts the workers, queuing jobs interrupted by a restart; called on startup and first submission."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        for job in sorted(self._jobs.values(), key=lambda job: job.created_at):
+            if job.status == "queued":
+                self._queue.put_nowait(job.id)
+        self._worker_tasks = [asyncio.ensure_future(self._work()) for _ in range(self._workers)]
+
+    async def _sweep(self) -> None:
+        cutoff = time.time() - self._ttl_seconds
+        expired = [job.id for job in self._jobs.values() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+            self._events.pop(job_id, None)
+        if expired:
+            await asyncio.to_thread(self._remove_files, expired)
+            metrics.increment("jobs.expired", len(expired))
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        """
+        Queues a job, or returns the existing job an identical submission attaches to.
+
+        Raises:
+            KeyError: If the job kind is unknown.
+            ValueError: If the parameters are invalid for the kind.
+        """
+        handler = self._handlers.get(kind)
+        if handler is None:
+            raise KeyError(f"Unknown job kind '{kind}'.")
+        params = handler.parse(params)
+        key = hashlib.sha256(json.dumps([kind, params], sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+        self.start()
+        await self._sweep()
+        existing = self._jobs.get(self._by_key.get(key, ""))
+        if existing is not None and (
+            not existing.finished or (existing.status == "succeeded" and handler.reuse_results)
+        ):
+            metrics.increment("jobs.submitted", kind=kind, result="attached")
+            return existing
+
+        job = Job(id=uuid.uuid4().hex, kind=kind, params=params, key=key)
+        self._jobs[job.id] = job
+        self._by_key[key] = job.id
+        await asyncio.to_thread(self._save, job)
+        self._queue.put_nowait(job.id)
+        metrics.increment("jobs.submitted", kind=kind, result="queued")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """
+        Raises:
+            KeyError: If there is no job with this id (or it has expired).
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"No job with id '{job_id}'.")
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Job:
+        """Returns the job once it has finished, or as it is after `timeout` seconds (at most MAX_WAIT_SECONDS)."""
+        job = self.get(job_id)
+        if not job.finished and timeout > 0:
+            event = self._events.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), min(timeout, MAX_WAIT_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def result_path(self, job_id: str) -> Tuple[str, str]:
+        """
+        Returns the path and media type of a succeeded job's result.
+
+        Raises:
+            KeyError: If there is no job with this id.
+            JobNotReadyError: If the job has not succeeded.
+        """
+        job = self.get(job_id)
+        if job.status != "succeeded":
+            detail = f": {job.error}" if job.error else ""
+            raise JobNotReadyError(f"Job '{job_id}' is {job.status}{detail}.")
+        return self._path(job_id, "result"), job.media_type
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        started = time.perf_counter()
+        try:
+            with request_context(Priority.GENERATION, "jobs"):
+                result, media_type = await self._handlers[job.kind].run(job.params)
+            await asyncio.to_thread(self._write_result, job, result)
+            job.status, job.media_type = "succeeded", media_type
+        except asyncio.CancelledError:
+            # Shutting down; left queued on disk and picked up again on restart
+            job.status = "queued"
+            raise
+        except Exception as e:
+            print(f"[Jobs] {job.kind} job {job.id} failed: {e}")
+            job.status, job.error = "failed", str(e)
+        job.finished_at = time.time()
+        metrics.increment("jobs.finished", kind=job.kind, status=job.status)
+        metrics.observe("jobs.run_ms", (time.perf_counter() - started) * 1000, kind=job.kind)
+        await asyncio.to_thread(self._save, job)
+        event = self._events.pop(job.id, None)
+        if event is not None:
+            event.set()
+
+    async def stop(self) -> None:
+        """Cancels the workers; called on application shutdown."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+
+    def state(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": len(self._worker_tasks), "queued": self._queue.qsize() if self._queue else 0, "jobs": counts}
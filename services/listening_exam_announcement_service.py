@@ -1,10 +1,22 @@
 from dotenv import load_dotenv
 from workflows.generate_announcements import (
     generate_listening_exam_announcement,
+    generate_listening_exam_announcements,
     Announcement,
     Announcer,
 )
-from services.audio_service import AudioService
+from services.audio_service import audio_service
+from utils.fallback_store import fallback_store
+from services.item_bank import item_bank
+from services.exam_batches import BatchPool
+from utils.seeding import current_seed, mark_degraded
+
+# Announcement scenarios in a section
+NUM_ANNOUNCEMENTS = 5
+
+
+def _has_translation(item) -> bool:
+    return bool(item.payload.get("english_translation"))
 
 # Load environment variables
 load_dotenv()
@@ -14,23 +26,58 @@ load_dotenv()
 
 class ListeningExamAnnouncementService:
     def __init__(self):
-        self.audio_service = AudioService()
+        self.audio_service = audio_service
+        # Announcement sets are generated several per call
+        self._batches = {
+            lean: BatchPool(
+                f"listening_announcement{'_lean' if lean else ''}",
+                lambda count, lean=lean: generate_listening_exam_announcements(count, lean=lean),
+            )
+            for lean in (False, True)
+        }
 
 
-    def generate_announcement(self) -> Announcement:
+    def add_to_bank(self, announcement: Announcement) -> None:
+        # Each scenario is reusable on its own; the announcer's role serves as its topic
+        for speaker in announcement.speakers:
+            item_bank.add("listening_announcement", speaker.name, speaker)
+
+    async def refill_bank(self) -> None:
+        self.add_to_bank(await generate_listening_exam_announcement())
+
+    async def generate_announcement(self, lean: bool = False) -> Announcement:
         """
         Generates a listening exam announcement with questions and answers.
 
+        Args:
+            lean: Skip generating the English translations of the announcements.
+
         Returns:
             A Conversation object containing the announcement, questions, and answers
         """
         try:
+            # Assemble from banked scenarios with distinct announcer roles when possible;
+            # full requests need scenarios that include their translation.
+            where = None if lean else _has_translation
+            items = item_bank.assemble("listening_announcement", NUM_ANNOUNCEMENTS, where=where)
+            if items is not None:
+                item_bank.ensure_stock("listening_announcement", 2 * NUM_ANNOUNCEMENTS, self.refill_bank, where=_has_translation)
+                return Announcement(speakers=[item.as_model(Announcer) for item in items])
 
-            # Generate the announcement
-            announcement: Announcement = generate_listening_exam_announcement()
+            # Generate the announcement, or serve a stored one from the same mode if generation fails.
+            # Seeded requests are generated on their own, so they don't depend on other traffic.
+            if current_seed() is not None:
+                generate = lambda: generate_listening_exam_announcement(lean=lean)
+            else:
+                generate = lambda: self._batches[lean].next()
+            announcement: Announcement = await fallback_store.with_fallback(
+                f"listening_announcement{'_lean' if lean else ''}", generate
+            )
+            self.add_to_bank(announcement)
             return announcement
         except Exception as e:
             print(f"Announcement generation error: {e}")
+            mark_degraded()
             # Return a simple fallback conversation with the correct structure
             return Announcement(
                 speakers=[
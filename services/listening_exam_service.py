@@ -1,11 +1,15 @@
 from dotenv import load_dotenv
 from workflows.generate_transcript import (
     generate_listening_exam_transcript,
+    generate_listening_exam_transcripts,
     Conversation,
     Speaker,
 )
-from services.audio_service import AudioService
 from itertools import cycle
+from utils.fallback_store import fallback_store
+from utils.seeding import current_seed, exam_random, mark_degraded
+from services.exam_batches import BatchPool
+from typing import List, Tuple
 
 # Load environment variables
 load_dotenv()
@@ -34,37 +38,67 @@ DEFAULT_TOPICS = [
 
 class ListeningExamService:
     def __init__(self):
-        self.audio_service = AudioService()
         self._topic_cycle = cycle(DEFAULT_TOPICS)
+        # Transcripts on the next topics of the cycle are generated several per call
+        self._batches = {
+            lean: BatchPool(f"listening_transcript{'_lean' if lean else ''}", self._batch_generator(lean))
+            for lean in (False, True)
+        }
+
+    def _batch_generator(self, lean: bool):
+        async def generate(count: int) -> List[Tuple[str, Conversation]]:
+            topics = [next(self._topic_cycle) for _ in range(count)]
+            return list(zip(topics, await generate_listening_exam_transcripts(topics, lean=lean)))
+
+        return generate
 
     def get_next_topic(self) -> str:
         """
-        Get the next topic from the round-robin cycle.
+        Get the next topic from the round-robin cycle, or a seed-determined
+        topic for seeded requests.
 
         Returns:
             str: The next topic from the cycle
         """
+        if current_seed() is not None:
+            return exam_random().choice(DEFAULT_TOPICS)
         return next(self._topic_cycle)
 
-    def generate_transcript(self, topic: str = None) -> Conversation:
+    async def generate_transcript(self, topic: str = None, lean: bool = False) -> Conversation:
         """
         Generates a listening exam transcript with questions and answers.
 
         Args:
             topic: The topic for the conversation. If None, uses round-robin selection.
+            lean: Skip generating the English translations of the opinions.
 
         Returns:
             A Conversation object containing the dialogue, questions, and answers
         """
+        # Stored transcripts may stand in for a failed generation; they are kept per
+        # mode, so full requests only get transcripts with translations, and when the
+        # caller asked for a specific topic, only transcripts on that topic qualify.
+        base_kind = f"listening_transcript{'_lean' if lean else ''}"
+        fallback_kind = base_kind if topic is None else f"{base_kind}:{topic}"
         try:
-            # If no topic provided, get the next topic from the cycle
-            if topic is None:
-                topic = self.get_next_topic()
-
-            transcript: Conversation = generate_listening_exam_transcript(topic)
+            if topic is None and current_seed() is None:
+                # Next topic from the cycle, generated together with the following ones
+                topic, transcript = await self._batches[lean].next()
+            else:
+                # Seeded requests pick their own topic and are generated on their own
+                if topic is None:
+                    topic = self.get_next_topic()
+                transcript = await generate_listening_exam_transcript(topic, lean=lean)
+            fallback_store.remember(base_kind, transcript)
+            fallback_store.remember(f"{base_kind}:{topic}", transcript)
             return transcript
         except Exception as e:
             print(f"Transcript generation error: {e}")
+            # Neither stand-in may be kept as a seed's transcript
+            mark_degraded()
+            stored = fallback_store.recall(fallback_kind)
+            if stored is not None:
+                return stored
             # Return a simple fallback conversation with the correct structure
             return Conversation(
                 speakers=[
@@ -74,46 +108,7 @@ class ListeningExamService:
                         opinion="Error generating conversation",
                         question="Error generating question?",
                         correct_answer=False,
-                    )
-                ]
-            )
-
-    def generate_conversation(
-        self, topic: str = "Is friendship important to you?"
-    ) -> Conversation:
-        """
-        Generates a listening exam conversation with questions and answers.
-
-        Args:
-            topic: The topic for the conversation
-
-        Returns:
-            A Conversation object containing the dialogue, questions, and answers
-        """
-        try:
-            transcript: Conversation = generate_listening_exam_transcript(topic)
-
-            for idx, speaker in enumerate(transcript.speakers):
-                # Generate audio for each speaker
-                audio_file = self.audio_service.generate_audio(
-                    text=speaker.opinion, gender=speaker.gender, speaker_index=idx
-                )
-                print(
-                    f"Saved audio for {speaker.name} ({speaker.gender}) as {audio_file}"
-                )
-
-            return transcript
-        except Exception as e:
-            print(f"Conversation generation error: {e}")
-            # Return a simple fallback conversation with the correct structure
-            return Conversation(
-                speakers=[
-                    Speaker(
-                        name="System",
-                        gender="none",
-                        opinion="Error generating conversation",
-                        question="Error generating question?",
-                        correct_answer=False,
+                        explanation="Error occurred during generation",
                     )
                 ]
             )
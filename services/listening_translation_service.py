@@ -0,0 +1,98 @@
+import asyncio
+from typing import Callable, Dict, List, Tuple
+
+from pydantic import BaseModel
+
+from utils.exam_store import exam_store
+from utils.metrics import metrics
+from workflows.generate_announcements import Announcement
+from workflows.generate_interview import Interview
+from workflows.generate_transcript import Conversation
+from workflows.translate_texts import translate_texts
+
+__all__ = ["ListeningTranslationService", "TRANSLATABLE_KINDS"]
+
+
+def _speaker_texts(exam: BaseModel) -> List[str]:
+    return [speaker.opinion for speaker in exam.speakers]
+
+
+def _speaker_translations(exam: BaseModel) -> List[str]:
+    return [speaker.english_translation for speaker in exam.speakers]
+
+
+def _fill_speakers(exam: BaseModel, translations: List[str]) -> BaseModel:
+    speakers = [
+        speaker.model_copy(update={"english_translation": translation})
+        for speaker, translation in zip(exam.speakers, translations)
+    ]
+    return exam.model_copy(update={"speakers": speakers})
+
+
+def _interview_texts(exam: Interview) -> List[str]:
+    # Translated as one text so the conversation reads coherently in English
+    return ["\n".join(f"{segment.speaker}: {segment.text}" for segment in exam.conversation_segments)]
+
+
+def _interview_translations(exam: Interview) -> List[str]:
+    return [exam.english_translation_conversation]
+
+
+def _fill_interview(exam: Interview, translations: List[str]) -> Interview:
+    return exam.model_copy(update={"english_translation_conversation": translations[0]})
+
+
+# Exam kinds with translatable text: (exam type, texts, existing translations, fill in translations)
+TRANSLATABLE_KINDS: Dict[str, Tuple[type, Callable, Callable, Callable]] = {
+    "transcript": (Conversation, _speaker_texts, _speaker_translations, _fill_speakers),
+    "announcement": (Announcement, _speaker_texts, _speaker_translations, _fill_speakers),
+    "interview": (Interview, _interview_texts, _interview_translations, _fill_interview),
+}
+
+
+class ListeningTranslationService:
+    """
+    Produces the English translations of a stored listening exam on request.
+
+    Exams generated in lean mode come without translations; the first request
+    for an exam's translation generates it and stores it with the exam, so
+    later requests (and concurrent ones) share the same result.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    async def get_translations(self, kind: str, exam_id: str) -> List[str]:
+        """
+        Returns the English translations for an exam: one per speaker for
+        transcripts and announcements, one for the whole interview conversation.
+
+        Raises:
+            KeyError: If the kind is unknown or the exam is not stored.
+        """
+        if kind not in TRANSLATABLE_KINDS:
+            raise KeyError(f"Unknown listening exam kind '{kind}'.")
+        _, texts_of, translations_of, _ = TRANSLATABLE_KINDS[kind]
+        exam = exam_store.get(kind, exam_id)
+        if exam is None:
+            raise KeyError(f"No {kind} exam with id '{exam_id}'.")
+
+        translations = translations_of(exam)
+        if all(translations):
+            metrics.increment("listening_translation.cache", kind=kind, result="hit")
+            return translations
+        metrics.increment("listening_translation.cache", kind=kind, result="miss")
+
+        key = (kind, exam_id)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._translate(kind, exam_id, exam))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _translate(self, kind: str, exam_id: str, exam: BaseModel) -> List[str]:
+        _, texts_of, _, fill = TRANSLATABLE_KINDS[kind]
+        translations = await translate_texts(texts_of(exam))
+        exam_store.replace(kind, exam_id, fill(exam, translations))
+        return translations
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.metrics import metrics
+from utils.scheduler import Priority, request_context
+
+__all__ = ["PrefetchService", "DEFAULT_NEXT_SECTION", "CLIENT_ID_HEADER", "start_prefetch", "on_claim"]
+
+# Header identifying a learner's client across requests; without it nothing is prefetched
+CLIENT_ID_HEADER = "X-Client-Id"
+# How long a prefetched section is held for its client before it counts as wasted
+PREFETCH_TTL_SECONDS = float(os.getenv("PREFETCH_TTL_SECONDS", "300"))
+# Clients tracked at once, least recently seen are dropped first
+MAX_CLIENTS = int(os.getenv("PREFETCH_MAX_CLIENTS", "1000"))
+# Observed transitions out of a section before they replace its default successor
+MIN_TRANSITIONS = 20
+
+# The path learners usually take through the sections
+DEFAULT_NEXT_SECTION: Dict[str, str] = {
+    "transcript": "announcement",
+    "announcement": "interview",
+    "comprehension": "match_titles",
+    "match_titles": "advert",
+    "advert": "writing",
+}
+
+
+# Actions deferred by the speculative generation running in this context, None outside one
+_claim_actions: ContextVar[Optional[List[Callable[[], None]]]] = ContextVar("prefetch_claim_actions", default=None)
+
+
+def on_claim(action: Callable[[], None]) -> None:
+    """
+    Runs `action` now, or, during speculative generation for a client, once
+    the client claims the section; it never runs for a wasted prefetch. For
+    side effects that only pay off for a section someone is served, like
+    pre-rendering its audio or counting item bank uses.
+    """
+    actions = _claim_actions.get()
+    if actions is None:
+        action()
+    else:
+        actions.append(action)
+
+
+def _discard_result(task: asyncio.Task) -> None:
+    # Failed speculative work is only counted; retrieving the exception keeps asyncio from logging it
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[Prefetch] Speculative generation failed: {task.exception()}")
+
+
+def start_prefetch(
+    kind: str,
+    generate: Callable[[], Awaitable[Any]],
+    source: str,
+    claim_actions: Optional[List[Callable[[], None]]] = None,
+) -> asyncio.Task:
+    """
+    Starts speculative generation of a section in the background lane, so it
+    never delays live requests. Actions the generation defers through
+    `on_claim` are collected in `claim_actions`, for the caller to run once
+    the section is served.
+    """
+    async def run():
+        # The task runs in its own copy of the context, so this only affects its generation
+        _claim_actions.set(claim_actions)
+        with request_context(Priority.BACKGROUND, "prefetch"):
+            return await generate()
+
+    task = asyncio.ensure_future(run())
+    task.add_done_callback(_discard_result)
+    metrics.increment("prefetch.started", kind=kind, source=source)
+    return task
+
+
+@dataclass
+class Reservation:
+    kind: str
+    task: asyncio.Task
+    expires_at: float
+    # Deferred by the generation through `on_claim`, run when the client takes the section
+    claim_actions: List[Callable[[], None]] = field(default_factory=list)
+
+
+class PrefetchService:
+    """
+    Speculatively generates the section a client is likely to open next.
+
+    When a client fetches a section, generation of the predicted next section
+    starts right away and is reserved for that client for PREFETCH_TTL_SECONDS.
+    If the client then asks for that section it gets the reserved one (waiting
+    for it if it is still being generated); otherwise the reservation expires
+    and is counted as wasted. Predictions follow the transitions observed
+    across clients once there are enough of them, and DEFAULT_NEXT_SECTION
+    until then. Sections backed by the item bank are reserved from stock, so
+    their prefetch costs no generation. Work a section only needs once it is
+    served (see `on_claim`) waits until the reservation is taken.
+    """
+
+    def __init__(
+        self,
+        generators: Dict[str, Callable[[], Awaitable[Any]]],
+        next_section: Optional[Dict[str, str]] = None,
+        ttl_seconds: float = PREFETCH_TTL_SECONDS,
+        max_clients: int = MAX_CLIENTS,
+    ):
+        self._generators = generators
+        self._next_section = dict(DEFAULT_NEXT_SECTION if next_section is None else next_section)
+        self._ttl_seconds = ttl_seconds
+        self._max_clients = max_clients
+        self._reservations: "OrderedDict[str, Reservation]" = OrderedDict()
+        self._last_kind: "OrderedDict[str, str]" = OrderedDict()
+        self._transitions: Dict[str, Counter] = {}
+
+    def predict(self, kind: str) -> Optional[str]:
+        counts = self._transitions.get(kind)
+        if counts and sum(counts.values()) >= MIN_TRANSITIONS:
+            return counts.most_common(1)[0][0]
+        return self._next_section.get(kind)
+
+    def _observe(self, client_id: str, kind: str) -> None:
+        previous = self._last_kind.pop(client_id, None)
+        if previous is not None and previous != kind:
+            self._transitions.setdefault(previous, Counter())[kind] += 1
+        self._last_kind[client_id] = kind
+        while len(self._last_kind) > self._max_clients:
+            self._last_kind.popitem(last=False)
+
+    def _drop(self, client_id: str, reason: str) -> None:
+        reservation = self._reservations.pop(client_id)
+        if not reservation.task.done():
+            reservation.task.cancel()
+        metrics.increment("prefetch.wasted", kind=reservation.kind, reason=reason)
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        for client_id in [c for c, r in self._reservations.items() if r.expires_at <= now]:
+            self._drop(client_id, "expired")
+
+    def _prefetch(self, client_id: str, kind: str) -> None:
+        next_kind = self.predict(kind)
+        if next_kind is None or next_kind not in self._generators:
+            return
+        current = self._reservations.get(client_id)
+        if current is not None:
+            if current.kind == next_kind:
+                return
+            self._drop(client_id, "replaced")
+        claim_actions: List[Callable[[], None]] = []
+        task = start_prefetch(next_kind, self._generators[next_kind], source="client", claim_actions=claim_actions)
+        self._reservations[client_id] = Reservation(next_kind, task, time.monotonic() + self._ttl_seconds, claim_actions)
+        while len(self._reservations) > self._max_clients:
+            self._drop(next(iter(self._reservations)), "evicted")
+
+    async def fetch(
+        self,
+        client_id: Optional[str],
+        kind: str,
+        create: Callable[[], Awaitable[Any]],
+        reservable: bool = True,
+    ) -> Any:
+        """
+        Returns the section `kind` for a client: its reservation if it has one,
+        otherwise `create()`. Starts prefetching the predicted next section.
+        `reservable` is False for requests with non-default parameters, which
+        a prefetched section can't stand in for.
+        """
+        if not client_id:
+            return await create()
+        self._sweep()
+        self._observe(client_id, kind)
+
+        reservation = self._reservations.get(client_id)
+        if reservation is not None and reservation.kind == kind and reservable:
+            del self._reservations[client_id]
+        else:
+            reservation = None
+        # Started before this section is served, so both generate in parallel
+        self._prefetch(client_id, kind)
+
+        if reservation is not None:
+            try:
+                result = await asyncio.shield(reservation.task)
+                metrics.increment("prefetch.requests", kind=kind, result="hit")
+                for action in reservation.claim_actions:
+                    action()
+                return result
+            except Exception:
+                metrics.increment("prefetch.wasted", kind=kind, reason="failed")
+        metrics.increment("prefetch.requests", kind=kind, result="miss")
+        return await create()
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "reservations": len(self._reservations),
+            "clients": len(self._last_kind),
+            "predictions": {kind: self.predict(kind) for kind in self._generators if self.predict(kind)},
+        }
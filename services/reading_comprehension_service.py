@@ -1,9 +1,12 @@
 from workflows.reading_comprehension_workflow import ReadingComprehensionWorkflow, ReadingComprehensionExam, ReadingComprehensionQuestion
 from pydantic import BaseModel, Field
-from typing import List
-import random
+from typing import List, Optional
 import hashlib
 import asyncio
+from utils.fallback_store import fallback_store
+from services.exam_variants import ExamVariant, VariantPool
+from services.item_bank import item_bank
+from workflows.html_formatter_workflow import format_text_html
 
 class ComprehensionOption(BaseModel):
     id: str
@@ -21,18 +24,46 @@ class ReadingComprehensionResult(BaseModel):
     topic: str
     full_text: str
     paragraphs: List[str] = Field(description="The full_text split into individual paragraphs.")
+    paragraphs_html: Optional[List[str]] = Field(default=None, description="The paragraphs formatted as HTML.")
     questions: List[ComprehensionQuestion]
+    variant_id: Optional[str] = None
 
 class ReadingComprehensionService:
     def __init__(self):
         self.workflow = ReadingComprehensionWorkflow()
+        # Each generated exam is served as many variants with reshuffled options
+        self.variants = VariantPool("reading_comprehension", self.generate_exam)
 
     def to_hash_id(self, text: str) -> str:
         return hashlib.sha256(text.encode()).hexdigest()
 
+    async def generate_exam(self) -> ReadingComprehensionExam:
+        """Generates an exam, formats its paragraphs and adds it to the item bank."""
+        exam: ReadingComprehensionExam = await fallback_store.with_fallback(
+            "reading_comprehension", self.workflow.generate_exam
+        )
+        # Formatted once here; later variants read the cached HTML
+        for paragraph in exam.full_text.split("\n\n"):
+            if paragraph.strip():
+                format_text_html(paragraph.strip())
+        item_bank.add("reading_comprehension", exam.topic, exam)
+        return exam
+
     async def get_comprehension_section(self) -> ReadingComprehensionResult:
         """Generates and formats the reading comprehension section."""
-        exam_data: ReadingComprehensionExam = await self.workflow.generate_exam()
+        # Questions refer to paragraphs of their text, so a whole text with its questions is one banked item
+        items = item_bank.assemble("reading_comprehension", 1)
+        if items is None:
+            return self.derive_comprehension_section(await self.variants.next())
+        item_bank.ensure_stock("reading_comprehension", 5, self.generate_exam)
+        exam = items[0].as_model(ReadingComprehensionExam)
+        return self.derive_comprehension_section(self.variants.variant(exam, items[0].served))
+
+    def derive_comprehension_section(
+        self, variant: ExamVariant[ReadingComprehensionExam]
+    ) -> ReadingComprehensionResult:
+        """Formats a variant of a generated exam; variants differ in the order of each question's options."""
+        exam_data = variant.source
 
         # Split full_text into paragraphs by blank lines
         paragraphs = [p.strip() for p in exam_data.full_text.split("\n\n") if p.strip()]
@@ -50,7 +81,7 @@ class ReadingComprehensionService:
             ]
 
             # Shuffle the options for presentation
-            random.shuffle(options)
+            options = variant.shuffled(options)
 
             # Get the hash ID of the correct answer
             correct_option_id = self.to_hash_id(q_data.correct_answer)
@@ -73,5 +104,7 @@ class ReadingComprehensionService:
             topic=exam_data.topic,
             full_text=exam_data.full_text,
             paragraphs=paragraphs,
-            questions=formatted_questions
+            paragraphs_html=[format_text_html(p) for p in paragraphs],
+            questions=formatted_questions,
+            variant_id=variant.id,
         ) 
\ No newline at end of file
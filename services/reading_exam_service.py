@@ -1,11 +1,16 @@
 from workflows.reading_advert_workflow import ReadingAdvertExamWorkflow, ReadingAdvertExam, ReadingAdvert
 from pydantic import BaseModel
-from typing import List
-import random
+from typing import List, Optional
 import hashlib
+from utils.fallback_store import fallback_store
+from services.exam_variants import ExamVariant, VariantPool
+from services.item_bank import item_bank
+from workflows.html_formatter_workflow import format_advert_html
+
 class Advert(BaseModel):
     id: str
-    text: str   
+    text: str
+    html: Optional[str] = None
 
 class AdvertQuestion(BaseModel):
     id: str
@@ -16,36 +21,75 @@ class AdvertQuestion(BaseModel):
 class ReadingAdvertExamResult(BaseModel):
     questions: List[AdvertQuestion]
     adverts: List[Advert]
+    variant_id: Optional[str] = None
+
+
+# Adverts in an exam that match no question
+NUM_DISTRACTORS = 2
+# Questions in an advert section assembled from the item bank
+NUM_QUESTIONS = 10
+# Questions each variant asks out of its source's; the adverts of the others become distractor candidates
+QUESTIONS_PER_VARIANT = 8
 
 
 class ReadingExamService:
     def __init__(self):
         self.workflow = ReadingAdvertExamWorkflow()
+        # Each generated exam is served as many variants with different questions, distractors and ordering
+        self.variants = VariantPool("reading_advert", self.generate_exam)
 
     def to_hash_id(self, text: str) -> str:
         return hashlib.sha256(text.encode()).hexdigest()
 
+    async def generate_exam(self) -> ReadingAdvertExam:
+        """Generates an exam, formats its adverts and adds its questions to the item bank."""
+        exam: ReadingAdvertExam = await fallback_store.with_fallback("reading_advert", self.workflow.generate_exam)
+        for question in exam.questions:
+            # Formatted once here; later variants read the cached HTML
+            format_advert_html(question.correct_advert)
+            format_advert_html(question.wrong_advert)
+            item_bank.add("reading_advert", question.topic, question)
+        return exam
+
     async def get_advert_section(self) -> ReadingAdvertExamResult:
-        exam: ReadingAdvertExam = await self.workflow.generate_exam()
-        questions = exam.questions
-        correct_answers = [advert.correct_advert for advert in questions]
+        # Assemble from banked questions on distinct topics; generate only when the bank can't
+        items = item_bank.assemble("reading_advert", NUM_QUESTIONS)
+        if items is None:
+            return self.derive_advert_section(await self.variants.next(), QUESTIONS_PER_VARIANT)
+        item_bank.ensure_stock("reading_advert", 2 * NUM_QUESTIONS, self.generate_exam)
+        exam = ReadingAdvertExam(questions=[item.as_model(ReadingAdvert) for item in items])
+        return self.derive_advert_section(self.variants.variant(exam, 0), QUESTIONS_PER_VARIANT)
 
-        ## Randomly select two wrong answers from the questions
-        wrong_answers = [question.wrong_advert for question in questions]
-        wrong_answers = random.sample(wrong_answers, 2) 
+    def derive_advert_section(
+        self, variant: ExamVariant[ReadingAdvertExam], num_questions: Optional[int] = None
+    ) -> ReadingAdvertExamResult:
+        """
+        Builds one exam from a generated exam: a variant specific subset of the
+        questions (all by default), NUM_DISTRACTORS adverts that match none of
+        them, and a variant specific order of both. Ids are content hashes, so
+        they are the same in every variant.
+        """
+        questions = variant.shuffled(variant.source.questions)
+        unused = questions[num_questions:] if num_questions is not None else []
+        questions = questions[:num_questions] if num_questions is not None else questions
+        correct_answers = [question.correct_advert for question in questions]
 
-        ## Combine the correct answer and the two wrong answers
-        adverts = correct_answers + wrong_answers
+        ## Select the distractors from the wrong adverts and the adverts of unused questions
+        wrong_answers = [question.wrong_advert for question in variant.source.questions]
+        wrong_answers += [question.correct_advert for question in unused]
+        wrong_answers = variant.sample(wrong_answers, NUM_DISTRACTORS)
 
-        ## Create the adverts
-        adverts = [Advert(id=self.to_hash_id(advert), text=advert) for advert in adverts]
+        ## Combine the correct answers and the wrong answers
+        adverts = correct_answers + wrong_answers
 
-        ## Randomly shuffle the adverts
-        random.shuffle(adverts)
+        ## Create the adverts in the variant's order
+        adverts = variant.shuffled(
+            [Advert(id=self.to_hash_id(advert), text=advert, html=format_advert_html(advert)) for advert in adverts]
+        )
 
         ## Create the advert questions
         advert_questions = [AdvertQuestion(id=self.to_hash_id(question.question), question=question.question, correct_advert_id=self.to_hash_id(question.correct_advert), explanation=question.explanation) for question in questions]
 
         ## Create the exam result
-        result = ReadingAdvertExamResult(questions=advert_questions, adverts=adverts)
+        result = ReadingAdvertExamResult(questions=advert_questions, adverts=adverts, variant_id=variant.id)
         return result
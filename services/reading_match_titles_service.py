@@ -1,44 +1,92 @@
-from workflows.reading_match_titles_workflow import ReadingMatchTitleWorkflow, ReadingMatchTitle
+from workflows.reading_match_titles_workflow import ReadingMatchTitleWorkflow, ReadingMatchTitle, TOPIC_LIST
 from pydantic import BaseModel
-from typing import List
-import random
+from typing import List, Optional
 import hashlib
 import asyncio
+from utils.fallback_store import fallback_store
+from utils.metrics import metrics
+from utils.seeding import exam_random, mark_degraded
+from services.exam_variants import ExamVariant, VariantPool
+from services.item_bank import item_bank
+from workflows.html_formatter_workflow import format_text_html
 
 class TitleOption(BaseModel):
     id: str
     title: str
 
 class MatchTitleQuestion(BaseModel):
+    id: Optional[str] = None
     text: str
+    html: Optional[str] = None
     correct_title_id: str
     explanation: str
 
 class ReadingMatchTitleResult(BaseModel):
     questions: List[MatchTitleQuestion]
     titles: List[TitleOption]
+    variant_id: Optional[str] = None
+
+# Texts in a match-title section
+NUM_TEXTS = 5
 
 class ReadingMatchTitlesService:
     def __init__(self):
         self.workflow = ReadingMatchTitleWorkflow()
+        # Each set of generated texts is served as many variants with reordered texts and titles
+        self.variants = VariantPool("reading_match_titles", self.generate_questions)
 
     def to_hash_id(self, text: str) -> str:
         return hashlib.sha256(text.encode()).hexdigest()
 
+    async def generate_question(self, topic: str) -> ReadingMatchTitle:
+        question = await self.workflow.generate_match_title(topic)
+        # Formatted once here; later variants read the cached HTML
+        format_text_html(question.text)
+        item_bank.add("reading_match_title", topic, question)
+        fallback_store.remember("reading_match_title", question)
+        return question
+
+    async def generate_questions(self) -> List[ReadingMatchTitle]:
+        # Generate 5 questions on distinct topics in parallel, adding each to the item bank
+        topics = exam_random().sample(TOPIC_LIST, NUM_TEXTS)
+        results = await asyncio.gather(*[self.generate_question(topic) for topic in topics], return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        questions = [result for result in results if not isinstance(result, Exception)]
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            # Stand in stored texts for the failed ones, each different from the others in the section
+            stored = fallback_store.recall_many("reading_match_title", len(errors), exclude=questions)
+            if stored is None:
+                raise errors[0]
+            print(f"[Fallback] Serving {len(stored)} stored reading_match_title after generation errors: {errors[0]}")
+            metrics.increment("fallback.served", len(stored), kind="reading_match_title")
+            mark_degraded()
+            questions += stored
+        return questions
+
     async def get_match_title(self) -> ReadingMatchTitleResult:
-        # Generate 5 questions in parallel
-        generated_questions: List[ReadingMatchTitle] = await asyncio.gather(
-            *[self.workflow.generate_match_title() for _ in range(5)]
-        )
+        # Assemble from banked texts on distinct topics; generate only when the bank can't
+        items = item_bank.assemble("reading_match_title", NUM_TEXTS)
+        if items is None:
+            return self.derive_match_title(await self.variants.next())
+        item_bank.ensure_stock("reading_match_title", 2 * NUM_TEXTS, self.generate_questions)
+        questions = [item.as_model(ReadingMatchTitle) for item in items]
+        return self.derive_match_title(self.variants.variant(questions, 0))
 
+    def derive_match_title(self, variant: ExamVariant[List[ReadingMatchTitle]]) -> ReadingMatchTitleResult:
+        """Formats a variant of a generated set of texts; variants differ in the order of texts and titles."""
         questions_list: List[MatchTitleQuestion] = []
         all_titles_list: List[str] = []
 
-        for question in generated_questions:
+        for question in variant.shuffled(variant.source):
             # Collect question details
             questions_list.append(
                 MatchTitleQuestion(
+                    id=self.to_hash_id(question.text),
                     text=question.text,
+                    html=format_text_html(question.text),
                     correct_title_id=self.to_hash_id(question.correct_title),
                     explanation=question.explanation,
                 )
@@ -48,8 +96,7 @@ class ReadingMatchTitlesService:
             all_titles_list.append(question.wrong_title)
 
         # Prepare title options with hashed IDs and shuffle
-        unique_titles = list(set(all_titles_list))
-        titles = [TitleOption(id=self.to_hash_id(t), title=t) for t in unique_titles]
-        random.shuffle(titles)
+        unique_titles = list(dict.fromkeys(all_titles_list))
+        titles = variant.shuffled([TitleOption(id=self.to_hash_id(t), title=t) for t in unique_titles])
 
-        return ReadingMatchTitleResult(questions=questions_list, titles=titles)
\ No newline at end of file
+        return ReadingMatchTitleResult(questions=questions_list, titles=titles, variant_id=variant.id)
\ No newline at end of file
@@ -2,8 +2,9 @@ import os
 from typing import Optional
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
+from utils.model_router import model_router
+from utils.token_budget import check_input_tokens
 
 # Load environment variables
 load_dotenv()
@@ -22,14 +23,15 @@ class SentenceTranslationResponse(BaseModel):
     translation: str = Field(description="The translated sentence.")
 
 
+# Longest input accepted for translation, in tokens
+TEXT_TOKEN_LIMIT = 1000
+
+
 class SentenceTranslationService:
     def __init__(self):
-        """Initialize the sentence translation service with the Groq language model."""
-        # Initialize the Groq model - using a model suitable for generation/translation
-        self.model = ChatOpenAI(
-            model="gpt-4.1-nano-2025-04-14", # Using a larger model for potentially better translation
-            temperature=0.2, # Slightly higher temp for translation creativity
-        )
+        """Initialize the sentence translation service."""
+        # Models are selected per call by the router from the "sentence_translation" allow-list
+        self.route = "sentence_translation"
 
         # Define prompt templates
         self.en_to_de_prompt = PromptTemplate.from_template("""
@@ -54,9 +56,10 @@ class SentenceTranslationService:
         Returns:
             The German translation.
         """
+        check_input_tokens(text, TEXT_TOKEN_LIMIT, "text")
         try:
             prompt = self.en_to_de_prompt.format(sentence=text)
-            result = await self.model.ainvoke(prompt)
+            result = await model_router.ainvoke(self.route, prompt, temperature=0.2)
             # Extract the content from the AIMessage object
             return result.content.strip()
         except Exception as e:
@@ -74,9 +77,10 @@ class SentenceTranslationService:
         Returns:
             The English translation.
         """
+        check_input_tokens(text, TEXT_TOKEN_LIMIT, "text")
         try:
             prompt = self.de_to_en_prompt.format(sentence=text)
-            result = await self.model.ainvoke(prompt)
+            result = await model_router.ainvoke(self.route, prompt, temperature=0.2)
             # Extract the content from the AIMessage object
             return result.content.strip()
         except Exception as e:
@@ -2,8 +2,9 @@ import os
 from typing import Optional, List
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
-from langchain_groq import ChatGroq
 from pydantic import BaseModel, Field
+from utils.model_router import model_router
+from utils.tokens import count_tokens
 
 # Load environment variables
 load_dotenv()
@@ -28,17 +29,27 @@ class TranslationResult(BaseModel):
     )
 
 
+# Context passed to the model for a single word, in tokens; longer contexts are
+# narrowed to a window of words around the word being translated
+CONTEXT_TOKEN_LIMIT = 300
+CONTEXT_WINDOW_WORDS = 40
+
+
+def trim_context(context: str, word_index: int) -> tuple:
+    """Returns (context, word_index) narrowed to a window around the word if the context is too long."""
+    if count_tokens(context) <= CONTEXT_TOKEN_LIMIT:
+        return context, word_index
+    words = context.split()
+    start = max(0, word_index - CONTEXT_WINDOW_WORDS // 2)
+    window = words[start:start + CONTEXT_WINDOW_WORDS]
+    return " ".join(window), word_index - start
+
+
 class TranslationService:
     def __init__(self):
-        """Initialize the translation service with the Groq language model."""
-        # Initialize the Groq model
-        self.model = ChatGroq(
-            model="llama-3.1-8b-instant",
-            temperature=0.1,
-        )
-
-        # Create a structured output model
-        self.structured_model = self.model.with_structured_output(TranslationResult)
+        """Initialize the translation service."""
+        # Models are selected per call by the router from the "translation" allow-list
+        self.route = "translation"
 
         # Define the translation prompt template
         self.translation_prompt = PromptTemplate.from_template("""
@@ -50,7 +61,7 @@ class TranslationService:
         Analyze the word in its context and provide the most accurate translation.
         """)
 
-    def translate(self, word: str, context: str = "", word_index: int = 0) -> str:
+    async def translate(self, word: str, context: str = "", word_index: int = 0) -> str:
         """
         Translates a word from any language to English using context if available.
 
@@ -66,6 +77,7 @@ class TranslationService:
         if not context:
             context = word
             word_index = 0
+        context, word_index = trim_context(context, word_index)
 
         try:
             # First format the prompt
@@ -74,7 +86,9 @@ class TranslationService:
             )
 
             # Then invoke the structured model with the formatted prompt
-            result = self.structured_model.invoke(prompt)
+            result = await model_router.ainvoke(
+                self.route, prompt, TranslationResult, temperature=0.1
+            )
 
             # Return just the translation for compatibility with existing code
             print(result)
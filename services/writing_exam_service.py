@@ -1,4 +1,5 @@
 from workflows.writing_exam_workflow import WritingExamWorkflow, WritingExam
+from utils.fallback_store import fallback_store
 
 class WritingExamService:
     """Service to handle the generation of letter writing exams."""
@@ -8,5 +9,5 @@ class WritingExamService:
 
     async def get_writing_exam(self) -> WritingExam:
         """Generates a letter writing exam containing a letter and four tasks."""
-        exam: WritingExam = await self.workflow.generate_writing_exam()
+        exam: WritingExam = await fallback_store.with_fallback("writing_exam", self.workflow.generate_writing_exam)
         return exam 
\ No newline at end of file
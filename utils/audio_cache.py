@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.metrics import metrics
+
+__all__ = ["AudioCache", "audio_cache", "audio_key"]
+
+# Where synthesized audio is kept; survives restarts
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "cache/audio")
+# Disk quota; least recently used clips are evicted beyond it
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+# In-memory tier for short clips, so the most requested ones don't touch the disk
+AUDIO_CACHE_MEMORY_BYTES = int(os.getenv("AUDIO_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+AUDIO_CACHE_MEMORY_ITEM_BYTES = int(os.getenv("AUDIO_CACHE_MEMORY_ITEM_BYTES", str(256 * 1024)))
+# Aliases remembered, least recently set are dropped first
+MAX_ALIASES = 10000
+
+
+def audio_key(provider: str, model: str, voice: str, output_format: str, text: str, **settings: Any) -> str:
+    """Content address of a synthesized clip: everything that determines its bytes."""
+    raw = json.dumps(
+        {"provider": provider, "model": model, "voice": voice, "format": output_format, "text": text, "settings": settings},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class AudioCache:
+    """
+    Content-addressed store for synthesized speech.
+
+    Clips live on disk as `<root>/<key[:2]>/<key>.mp3` and are evicted least
+    recently used first once the directory exceeds `max_bytes`; file mtimes
+    record use, so the order survives restarts. Clips up to
+    `memory_item_bytes` are also kept in an in-memory LRU of `memory_bytes`.
+    The blocking methods are thread-safe; the async ones keep disk I/O off
+    the event loop.
+    """
+
+    def __init__(
+        self,
+        root: str = AUDIO_CACHE_DIR,
+        max_bytes: int = AUDIO_CACHE_MAX_BYTES,
+        memory_bytes: int = AUDIO_CACHE_MEMORY_BYTES,
+        memory_item_bytes: int = AUDIO_CACHE_MEMORY_ITEM_BYTES,
+    ):
+        self._root = root
+        self._max_bytes = max_bytes
+        self._memory_max_bytes = memory_bytes
+        self._memory_item_bytes = memory_item_bytes
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._aliases: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self) -> None:
+        if not os.path.isdir(self._root):
+            return
+        entries = []
+        for directory, _, files in os.walk(self._root):
+            for name in files:
+                if name.endswith(".mp3"):
+                    stat = os.stat(os.path.join(directory, name))
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def path(self, key: str) -> str:
+        return os.path.join(self._root, key[:2], f"{key}.mp3")
+
+    def alias(self, key: str, target: str) -> None:
+        """
+        Makes `resolve(key)` point to the clip stored under `target`, e.g.
+        when a clip was synthesized by the fallback provider instead of the
+        one its id was derived from. Aliases are kept in memory only.
+        """
+        with self._lock:
+            self._aliases.pop(key, None)
+            self._aliases[key] = target
+            while len(self._aliases) > MAX_ALIASES:
+                self._aliases.popitem(last=False)
+
+    def resolve(self, key: str) -> Optional[str]:
+        """The key the clip for `key` is stored under: `key` itself or what it is aliased to; None if not cached."""
+        with self._lock:
+            for candidate in (key, self._aliases.get(key)):
+                if candidate is not None and candidate in self._disk:
+                    return candidate
+        return None
+
+    def locate(self, key: str) -> Optional[str]:
+        """Path of the clip stored under `key`, marking it as used; None if not cached. Aliases are not followed."""
+        with self._lock:
+            path = None
+            if key in self._disk:
+                self._disk.move_to_end(key)
+                path = self.path(key)
+        if path is not None:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                path = None
+        metrics.increment("audio_cache.requests", tier="file", result="hit" if path else "miss")
+        return path
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                metrics.increment("audio_cache.requests", tier="memory", result="hit")
+                metrics.increment("audio_cache.bytes_saved", len(data))
+                return data
+            on_disk = key in self._disk
+        if not on_disk:
+            return None
+        try:
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self._remember(key, data)
+        metrics.increment("audio_cache.requests", tier="disk", result="hit")
+        metrics.increment("audio_cache.bytes_saved", len(data))
+        return data
+
+    def _remember(self, key: str, data: bytes) -> None:
+        # Called with the lock held
+        if len(data) > self._memory_item_bytes or key in self._memory:
+            return
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self._memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self._lookup(key)
+        if data is None:
+            metrics.increment("audio_cache.requests", tier="none", result="miss")
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a reader never sees a partial clip
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        evicted = []
+        with self._lock:
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._remember(key, data)
+            while self._disk_bytes > self._max_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                old_data = self._memory.pop(old_key, None)
+                if old_data is not None:
+                    self._memory_bytes -= len(old_data)
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self.path(old_key))
+            except FileNotFoundError:
+                pass
+        if evicted:
+            metrics.increment("audio_cache.evictions", len(evicted))
+
+    async def _alookup(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            needs_disk = key not in self._memory and key in self._disk
+        if needs_disk:
+            return await asyncio.to_thread(self._lookup, key)
+        return self._lookup(key)
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        data = await self._alookup(key)
+        if data is None:
+            metrics.increment("audio_cache.requests", tier="none", result="miss")
+        return data
+
+    async def aput(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self.put, key, data)
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        Returns the cached clip, synthesizing it with `create` on a miss.
+        Concurrent misses for a key synthesize once, and a synthesis whose
+        callers all went away still completes and is cached.
+        """
+        data = await self._alookup(key)
+        if data is not None:
+            return data
+        task = self._pending.get(key)
+        if task is None:
+            metrics.increment("audio_cache.requests", tier="none", result="miss")
+            task = self._pending[key] = asyncio.ensure_future(self._create(key, create))
+            task.add_done_callback(lambda done: self._settle(key, done))
+        return await asyncio.shield(task)
+
+    def _settle(self, key: str, task: asyncio.Task) -> None:
+        self._pending.pop(key, None)
+        # Retrieved so a failure nobody awaited any more isn't logged by asyncio
+        if not task.cancelled():
+            task.exception()
+
+    async def _create(self, key: str, create: Callable[[], Awaitable[bytes]]) -> bytes:
+        data = await create()
+        if data:
+            await self.aput(key, data)
+        return data
+
+    def state(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "clips": len(self._disk),
+                "bytes": self._disk_bytes,
+                "max_bytes": self._max_bytes,
+                "memory_clips": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+
+# Process-wide cache
+audio_cache = AudioCache()
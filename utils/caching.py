@@ -1,6 +1,7 @@
 import asyncio
 from typing import TypeVar, Generic, Callable, Awaitable, Optional
 import logging
+from utils.scheduler import Priority, request_context
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -56,7 +57,9 @@ class AsyncCachedGenerator(Generic[T]):
         async with self._update_lock:
             logger.info(f"[{self._name}] Starting background cache update.")
             try:
-                new_data = await self._perform_generation()
+                # Refills run in the background lane so they never delay user requests
+                with request_context(Priority.BACKGROUND, "background"):
+                    new_data = await self._perform_generation()
                 self._cached_data = new_data
                 self._initial_generation_complete.set() # Mark initial generation as done
                 logger.info(f"[{self._name}] Cache updated successfully in background.")
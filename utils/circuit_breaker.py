@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from enum import Enum
+from typing import Dict
+
+from langchain_core.exceptions import OutputParserException
+from pydantic import ValidationError
+
+from utils.metrics import metrics
+
+__all__ = ["BreakerState", "CircuitBreaker", "CircuitOpenError", "get_breaker", "breaker_states", "is_provider_failure"]
+
+# Consecutive failures that open a breaker
+FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+# Seconds an open breaker waits before letting a trial call through
+RECOVERY_TIMEOUT = float(os.getenv("BREAKER_RECOVERY_TIMEOUT", "30"))
+# Trial calls allowed concurrently while half-open
+HALF_OPEN_MAX_CALLS = 1
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the provider's breaker is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit breaker for '{name}' is open.")
+        self.name = name
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """
+    Decides whether an exception says something about provider health.
+    Client errors (4xx other than 408/429) are our own fault and malformed
+    structured output is the model's, so neither counts.
+    """
+    if isinstance(exc, (OutputParserException, ValidationError)):
+        return False
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in (408, 429):
+        return False
+    return True
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker.
+
+    After FAILURE_THRESHOLD consecutive failures the breaker opens and refuses
+    calls immediately. Once RECOVERY_TIMEOUT has passed it lets a single trial
+    call through (half-open); success closes it, failure opens it again.
+    Thread-safe, so it also guards synchronous TTS calls made from worker threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        recovery_timeout: float = RECOVERY_TIMEOUT,
+        half_open_max_calls: int = HALF_OPEN_MAX_CALLS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> BreakerState:
+        if self._state == BreakerState.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._transition(BreakerState.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: BreakerState) -> None:
+        if state == self._state:
+            return
+        self._state = state
+        if state == BreakerState.OPEN:
+            self._opened_at = time.monotonic()
+        if state != BreakerState.HALF_OPEN:
+            self._half_open_calls = 0
+        metrics.increment("breaker.transitions", breaker=self.name, state=state.value)
+        print(f"[CircuitBreaker] '{self.name}' is now {state.value}")
+
+    def allow(self) -> bool:
+        """Returns True if a call may proceed. Reserves a trial slot when half-open."""
+        with self._lock:
+            state = self._current_state()
+            if state == BreakerState.CLOSED:
+                return True
+            if state == BreakerState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+        metrics.increment("breaker.rejected", breaker=self.name)
+        return False
+
+    def check(self) -> None:
+        """Like `allow`, but raises CircuitOpenError when the call is refused."""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._transition(BreakerState.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == BreakerState.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._transition(BreakerState.OPEN)
+
+    def release_trial(self) -> None:
+        """Gives back a half-open trial slot when the call was cancelled before finishing."""
+        with self._lock:
+            if self._state == BreakerState.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record(self, exc: BaseException) -> None:
+        """Records the outcome of a failed call, ignoring errors that aren't the provider's."""
+        if is_provider_failure(exc):
+            self.record_failure()
+        else:
+            # The provider answered, so it is reachable; release any trial slot.
+            self.record_success()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Returns the process-wide breaker for a provider (e.g. "openai", "elevenlabs")."""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_states() -> Dict[str, str]:
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state.value for breaker in breakers}
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from utils.metrics import metrics
+from utils.seeding import is_degraded, seeded_random
+
+__all__ = ["ExamCache", "exam_cache", "seeded_exam_response"]
+
+# Where seeded exams are kept; survives restarts so a seed keeps its content
+EXAM_CACHE_DIR = os.getenv("EXAM_CACHE_DIR", "cache/exams")
+# Seeded exams never change, so clients and CDNs may keep them indefinitely
+SEEDED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ExamCache:
+    """
+    Content-addressed store for seeded exams.
+
+    Each exam body is stored once under the SHA-256 of its bytes
+    (`blobs/<hash>.json`), and `seeds/<key>` maps a (kind, seed, parameters)
+    key to that hash. The hash doubles as the response ETag. The first request
+    for a key generates the exam; concurrent requests for it wait for the same
+    generation, and later ones read the stored bytes. An exam marked degraded
+    while it was generated (see `mark_degraded`) is returned but not stored,
+    so the next request for the key generates it again.
+    """
+
+    def __init__(self, root: str = EXAM_CACHE_DIR):
+        self._root = root
+        self._index: Dict[str, str] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def key(kind: str, seed: int, params: Optional[Dict[str, Any]] = None) -> str:
+        raw = json.dumps({"kind": kind, "seed": seed, "params": params or {}}, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self._root, "blobs", f"{content_hash}.json")
+
+    def _seed_path(self, key: str) -> str:
+        return os.path.join(self._root, "seeds", key)
+
+    def _lookup(self, key: str) -> Optional[Tuple[bytes, str]]:
+        content_hash = self._index.get(key)
+        if content_hash is None:
+            try:
+                with open(self._seed_path(key), encoding="utf-8") as f:
+                    content_hash = f.read().strip()
+            except FileNotFoundError:
+                return None
+        try:
+            with open(self._blob_path(content_hash), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        self._index[key] = content_hash
+        return body, content_hash
+
+    def _store(self, key: str, body: bytes) -> str:
+        content_hash = hashlib.sha256(body).hexdigest()
+        os.makedirs(os.path.dirname(self._blob_path(content_hash)), exist_ok=True)
+        os.makedirs(os.path.dirname(self._seed_path(key)), exist_ok=True)
+        blob_path = self._blob_path(content_hash)
+        if not os.path.exists(blob_path):
+            # Write then rename, so a reader never sees a partial file
+            with open(blob_path + ".tmp", "wb") as f:
+                f.write(body)
+            os.replace(blob_path + ".tmp", blob_path)
+        with open(self._seed_path(key) + ".tmp", "w", encoding="utf-8") as f:
+            f.write(content_hash)
+        os.replace(self._seed_path(key) + ".tmp", self._seed_path(key))
+        self._index[key] = content_hash
+        return content_hash
+
+    async def get_or_create(
+        self,
+        kind: str,
+        seed: int,
+        params: Optional[Dict[str, Any]],
+        create: Callable[[], Awaitable[BaseModel]],
+        on_hit: Optional[Callable[[bytes], None]] = None,
+    ) -> Tuple[bytes, Optional[str]]:
+        """
+        Returns the stored (body, content hash) for the key, generating it on
+        first use; the hash is None for a degraded exam, which isn't stored.
+        `on_hit` is called with bodies served from the cache, e.g. to restore
+        state that generating the exam would have set up.
+        """
+        key = self.key(kind, seed, params)
+        cached = self._lookup(key)
+        if cached is not None:
+            metrics.increment("exam_cache.requests", kind=kind, result="hit")
+            if on_hit is not None:
+                on_hit(cached[0])
+            return cached
+        metrics.increment("exam_cache.requests", kind=kind, result="miss")
+
+        task = self._inflight.get(key)
+        if task is None:
+            async def generate() -> Tuple[bytes, Optional[str]]:
+                with seeded_random(seed, namespace=kind):
+                    result = await create()
+                    degraded = is_degraded()
+                body = result.model_dump_json().encode()
+                if degraded:
+                    metrics.increment("exam_cache.degraded", kind=kind)
+                    return body, None
+                return body, await asyncio.to_thread(self._store, key, body)
+
+            task = asyncio.ensure_future(generate())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+
+async def seeded_exam_response(
+    request: Request,
+    response: Response,
+    kind: str,
+    seed: Optional[int],
+    create: Callable[[], Awaitable[BaseModel]],
+    on_hit: Optional[Callable[[bytes], None]] = None,
+    **params: Any,
+) -> Any:
+    """
+    Serves an exam endpoint. Without a seed the exam is generated as usual and
+    marked uncacheable. With a seed it comes from the content-addressed cache
+    with an ETag and an immutable Cache-Control, answering 304 on a matching
+    If-None-Match; a degraded exam, which the cache didn't keep, is marked
+    uncacheable instead. `on_hit` is passed on to `ExamCache.get_or_create`.
+    """
+    if seed is None:
+        response.headers["Cache-Control"] = "no-store"
+        return await create()
+
+    body, content_hash = await exam_cache.get_or_create(kind, seed, params, create, on_hit=on_hit)
+    if content_hash is None:
+        return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+    headers = {"ETag": f'"{content_hash}"', "Cache-Control": SEEDED_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Process-wide cache
+exam_cache = ExamCache()
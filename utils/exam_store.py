@@ -0,0 +1,57 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+__all__ = ["ExamStore", "exam_store", "exam_id_for"]
+
+T = TypeVar("T", bound=BaseModel)
+
+# Generated exams kept in memory, least recently used are evicted first
+MAX_EXAMS = int(os.getenv("EXAM_STORE_MAX_EXAMS", "1000"))
+
+
+def exam_id_for(kind: str, exam: BaseModel) -> str:
+    """Content-derived id, so the same exam always gets the same id."""
+    digest = hashlib.sha256(f"{kind}:{exam.model_dump_json()}".encode()).hexdigest()
+    return digest[:32]
+
+
+class ExamStore:
+    """
+    Keeps recently generated exams by id, so follow-up requests (e.g. an
+    on-demand translation) can refer to an exam without resending it.
+    """
+
+    def __init__(self, max_exams: int = MAX_EXAMS):
+        self._max_exams = max_exams
+        self._exams: "OrderedDict[Tuple[str, str], BaseModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, kind: str, exam: BaseModel) -> str:
+        """Stores `exam` and returns its id."""
+        exam_id = exam_id_for(kind, exam)
+        self.replace(kind, exam_id, exam)
+        return exam_id
+
+    def replace(self, kind: str, exam_id: str, exam: BaseModel) -> None:
+        """Stores `exam` under an existing id, e.g. after filling in fields."""
+        with self._lock:
+            self._exams[(kind, exam_id)] = exam
+            self._exams.move_to_end((kind, exam_id))
+            while len(self._exams) > self._max_exams:
+                self._exams.popitem(last=False)
+
+    def get(self, kind: str, exam_id: str) -> Optional[BaseModel]:
+        with self._lock:
+            exam = self._exams.get((kind, exam_id))
+            if exam is not None:
+                self._exams.move_to_end((kind, exam_id))
+            return exam
+
+
+# Process-wide store
+exam_store = ExamStore()
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import re
+import typing
+from typing import Any, Callable, Dict, Optional, Type
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
+
+__all__ = ["FakeChatModel", "register_fake_response", "build_fake_instance"]
+
+# Canned responses per schema, registered by tests or local development setups
+_fake_responses: Dict[Type[BaseModel], Callable[[str], BaseModel]] = {}
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+DEFAULT_LIST_LENGTH = 3
+
+
+def register_fake_response(schema: Type[BaseModel], factory: Callable[[str], BaseModel]) -> None:
+    """Registers a factory producing the fake response for `schema` from the prompt text."""
+    _fake_responses[schema] = factory
+
+
+def _list_length(description: Optional[str]) -> int:
+    if not description:
+        return DEFAULT_LIST_LENGTH
+    match = re.search(r"\b(\d+)\b", description)
+    if match:
+        return max(1, min(int(match.group(1)), 10))
+    for word, number in _NUMBER_WORDS.items():
+        if re.search(rf"\b{word}\b", description, re.IGNORECASE):
+            return number
+    return DEFAULT_LIST_LENGTH
+
+
+def _fake_value(annotation: Any, name: str, description: Optional[str], index: int, salt: str) -> Any:
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union:
+        non_none = [a for a in args if a is not type(None)]
+        return _fake_value(non_none[0], name, description, index, salt) if non_none else None
+    if origin in (list, typing.List):
+        item_type = args[0] if args else str
+        return [_fake_value(item_type, name, description, i, salt) for i in range(_list_length(description))]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return build_fake_instance(annotation, salt=hashlib.sha256(f"{salt}:{name}:{index}".encode()).hexdigest())
+    if annotation is bool:
+        return index % 2 == 0
+    if annotation is int:
+        return index
+    if annotation is float:
+        return 0.5
+    return f"{name} {index + 1} ({salt[:8]})"
+
+
+def build_fake_instance(schema: Type[BaseModel], salt: str = "") -> BaseModel:
+    """Builds a schema-valid instance with placeholder values, deterministic for a given salt."""
+    values = {}
+    for index, (name, field) in enumerate(schema.model_fields.items()):
+        values[name] = _fake_value(field.annotation, name, field.description, index, salt)
+    return schema(**values)
+
+
+def _prompt_text(prompt: Any) -> str:
+    if hasattr(prompt, "to_string"):
+        return prompt.to_string()
+    return str(prompt)
+
+
+class FakeChatModel(Runnable):
+    """
+    Local stand-in for a chat model. Produces schema-valid placeholder output
+    (or a registered canned response) without any network access, optionally
+    after a simulated latency. Used for tests and offline development.
+    """
+
+    def __init__(
+        self,
+        model: str = "fake",
+        temperature: float = 0.0,
+        schema: Optional[Type[BaseModel]] = None,
+        latency_ms: float = 0.0,
+        **kwargs,
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.schema = schema
+        self.latency_ms = latency_ms
+
+    def with_structured_output(self, schema: Type[BaseModel], **kwargs) -> "FakeChatModel":
+        return FakeChatModel(self.model, self.temperature, schema=schema, latency_ms=self.latency_ms)
+
+    def invoke(self, input: Any, config: Any = None, **kwargs) -> Any:
+        text = _prompt_text(input)
+        if self.schema is None:
+            return AIMessage(content=f"[{self.model}] {text.strip()[:200]}")
+        factory = _fake_responses.get(self.schema)
+        if factory is not None:
+            return factory(text)
+        salt = hashlib.sha256(text.encode()).hexdigest()
+        return build_fake_instance(self.schema, salt=salt)
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs) -> Any:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self.invoke(input, config, **kwargs)
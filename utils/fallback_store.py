@@ -0,0 +1,77 @@
+import random
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, TypeVar
+
+from utils.metrics import metrics
+from utils.seeding import mark_degraded
+
+__all__ = ["FallbackStore", "fallback_store"]
+
+T = TypeVar("T")
+
+# Recent successful results kept per kind
+MAX_ITEMS_PER_KIND = 20
+
+
+class FallbackStore:
+    """
+    Keeps the most recent successfully generated results per kind, so a
+    request can be answered with stored content when generation fails
+    (e.g. every provider's circuit breaker is open) instead of erroring.
+    """
+
+    def __init__(self, max_items: int = MAX_ITEMS_PER_KIND):
+        self._max_items = max_items
+        self._items: Dict[str, Deque[Any]] = {}
+        self._lock = threading.Lock()
+
+    def remember(self, kind: str, item: Any) -> None:
+        with self._lock:
+            items = self._items.get(kind)
+            if items is None:
+                items = self._items[kind] = deque(maxlen=self._max_items)
+            items.append(item)
+
+    def recall(self, kind: str) -> Optional[Any]:
+        """Returns a random stored result of `kind`, or None if there is none."""
+        with self._lock:
+            items = self._items.get(kind)
+            return random.choice(items) if items else None
+
+    def recall_many(self, kind: str, count: int, exclude: Sequence[Any] = ()) -> Optional[List[Any]]:
+        """
+        Returns `count` distinct stored results of `kind`, none of them equal
+        to one in `exclude`, or None if fewer are stored. For sections built
+        from several results, which must not contain the same one twice.
+        """
+        with self._lock:
+            items = list(self._items.get(kind, ()))
+        distinct: List[Any] = []
+        for item in items:
+            if item not in exclude and item not in distinct:
+                distinct.append(item)
+        return random.sample(distinct, count) if len(distinct) >= count else None
+
+    async def with_fallback(self, kind: str, generate: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `generate`, remembering its result. If it fails and stored content
+        of the same kind exists, that is returned instead (and marked degraded);
+        otherwise the error propagates.
+        """
+        try:
+            result = await generate()
+        except Exception as e:
+            stored = self.recall(kind)
+            if stored is None:
+                raise
+            print(f"[Fallback] Serving stored {kind} after generation error: {e}")
+            metrics.increment("fallback.served", kind=kind)
+            mark_degraded()
+            return stored
+        self.remember(kind, result)
+        return result
+
+
+# Process-wide store
+fallback_store = FallbackStore()
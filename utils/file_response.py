@@ -0,0 +1,112 @@
+import mmap
+import os
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.types import Receive, Scope, Send
+
+__all__ = ["ImmutableFileResponse", "IMMUTABLE_CACHE_CONTROL"]
+
+# Content-addressed files never change, so clients and CDNs may keep them indefinitely
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Bytes sent per body message
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    (first, last) byte of a single-range `Range` header, or None to send the
+    whole file. Malformed and multi-range headers are ignored, as RFC 9110
+    allows.
+
+    Raises:
+        RangeNotSatisfiable: If the range lies outside the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, separator, last = spec.strip().partition("-")
+    if not separator:
+        return None
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            return max(size - suffix, 0), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+class ImmutableFileResponse(Response):
+    """
+    Serves a content-addressed file, where `etag` identifies its content.
+
+    Answers GET and HEAD with `Accept-Ranges`, a strong ETag and an immutable
+    Cache-Control; a matching If-None-Match gets a 304, a single `Range` a
+    206 (honoring If-Range) and an unsatisfiable one a 416. The body is sent
+    from a read-only memory map of the file, so only the requested bytes are
+    touched and they come straight from the page cache. The file is opened
+    when the response is created, so it can be removed (e.g. evicted) while
+    the response is being sent.
+    """
+
+    def __init__(self, request: Request, path: str, etag: str, media_type: str, headers: Optional[Dict[str, str]] = None):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._range: Optional[Tuple[int, int]] = None
+        response_headers = {
+            **(headers or {}),
+            "ETag": f'"{etag}"',
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "Accept-Ranges": "bytes",
+        }
+
+        status_code = 200
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or response_headers["ETag"] in if_none_match):
+            status_code = 304
+        else:
+            if_range = request.headers.get("if-range")
+            try:
+                requested = byte_range(request.headers.get("range"), size)
+                if requested is not None and (if_range is None or if_range == response_headers["ETag"]):
+                    self._range = requested
+                    status_code = 206
+                    response_headers["Content-Range"] = f"bytes {requested[0]}-{requested[1]}/{size}"
+            except RangeNotSatisfiable:
+                status_code = 416
+                response_headers["Content-Range"] = f"bytes */{size}"
+
+        if status_code == 200:
+            self._range = (0, size - 1) if size else None
+        length = self._range[1] - self._range[0] + 1 if self._range else 0
+        if status_code != 304:
+            response_headers["Content-Length"] = str(length)
+        super().__init__(status_code=status_code, headers=response_headers, media_type=media_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if self._range is not None and scope.get("method") != "HEAD":
+                start, end = self._range
+                with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for offset in range(start, end + 1, CHUNK_SIZE):
+                        # ASGI bodies are bytes, so each chunk is copied out of the mapping
+                        chunk = mapped[offset:min(offset + CHUNK_SIZE, end + 1)]
+                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            self._file.close()
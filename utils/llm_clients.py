@@ -0,0 +1,132 @@
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple, Type
+
+import httpx
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+# Load environment variables
+load_dotenv()
+
+__all__ = ["get_chat_model", "get_http_client", "get_async_http_client", "aclose_http_clients"]
+
+# Connection pool tuning shared by every client of a provider.
+# Keep-alive connections avoid a TCP + TLS handshake per request and
+# HTTP/2 multiplexes concurrent calls over the same connection.
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+    keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120")),
+)
+POOL_TIMEOUT = httpx.Timeout(timeout=float(os.getenv("LLM_TIMEOUT", "120")), connect=10.0)
+
+SUPPORTED_PROVIDERS = ("openai", "groq", "cerebras", "fake")
+
+_lock = threading.Lock()
+_http_clients: Dict[str, httpx.Client] = {}
+_async_http_clients: Dict[str, httpx.AsyncClient] = {}
+_chat_models: Dict[Tuple, Any] = {}
+
+
+def _check_provider(provider: str) -> None:
+    if provider not in SUPPORTED_PROVIDERS:
+        raise ValueError(f"Unsupported LLM provider '{provider}'. Expected one of {SUPPORTED_PROVIDERS}.")
+
+
+def get_http_client(provider: str) -> httpx.Client:
+    """Returns the process-wide synchronous HTTP pool for a provider."""
+    _check_provider(provider)
+    with _lock:
+        client = _http_clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.Client(http2=True, limits=POOL_LIMITS, timeout=POOL_TIMEOUT)
+            _http_clients[provider] = client
+        return client
+
+
+def get_async_http_client(provider: str) -> httpx.AsyncClient:
+    """Returns the process-wide asynchronous HTTP pool for a provider."""
+    _check_provider(provider)
+    with _lock:
+        client = _async_http_clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(http2=True, limits=POOL_LIMITS, timeout=POOL_TIMEOUT)
+            _async_http_clients[provider] = client
+        return client
+
+
+def _build_chat_model(provider: str, model: str, temperature: float, **kwargs) -> Any:
+    if provider == "fake":
+        from utils.fake_llm import FakeChatModel
+
+        return FakeChatModel(model=model, temperature=temperature, **kwargs)
+    http_kwargs = {
+        "http_client": get_http_client(provider),
+        "http_async_client": get_async_http_client(provider),
+    }
+    if provider == "openai":
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(model=model, temperature=temperature, **http_kwargs, **kwargs)
+    if provider == "groq":
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(model=model, temperature=temperature, **http_kwargs, **kwargs)
+    from langchain_cerebras import ChatCerebras
+
+    return ChatCerebras(model=model, temperature=temperature, **http_kwargs, **kwargs)
+
+
+def get_chat_model(
+    provider: str,
+    model: str,
+    schema: Optional[Type[BaseModel]] = None,
+    temperature: float = 0.0,
+    **kwargs,
+) -> Any:
+    """
+    Returns a shared chat model, optionally bound to a structured output schema.
+
+    Clients are cached per (provider, model, schema, temperature, options) so
+    repeated calls reuse the same client and its pooled HTTP connections.
+
+    Args:
+        provider: One of "openai", "groq", "cerebras" or "fake" (local, for tests).
+        model: The provider's model name.
+        schema: Optional Pydantic model used with `with_structured_output`.
+        temperature: Sampling temperature. Rounded to two decimals for the cache key.
+        **kwargs: Extra client options such as `max_retries`.
+
+    Returns:
+        A LangChain runnable ready for `invoke` / `ainvoke`.
+    """
+    _check_provider(provider)
+    temperature = round(temperature, 2)
+    key = (provider, model, schema, temperature, tuple(sorted(kwargs.items())))
+    with _lock:
+        cached = _chat_models.get(key)
+    if cached is not None:
+        return cached
+
+    llm = _build_chat_model(provider, model, temperature, **kwargs)
+    if schema is not None:
+        llm = llm.with_structured_output(schema)
+
+    with _lock:
+        # Another thread may have built the same client in the meantime; keep the first one.
+        return _chat_models.setdefault(key, llm)
+
+
+async def aclose_http_clients() -> None:
+    """Closes every pooled HTTP connection. Call on application shutdown."""
+    with _lock:
+        sync_clients = list(_http_clients.values())
+        async_clients = list(_async_http_clients.values())
+        _http_clients.clear()
+        _async_http_clients.clear()
+        _chat_models.clear()
+    for client in sync_clients:
+        client.close()
+    for client in async_clients:
+        await client.aclose()
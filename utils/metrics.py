@@ -0,0 +1,97 @@
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, Tuple
+
+__all__ = ["Metrics", "metrics"]
+
+# Number of recent observations kept per timing series for percentile summaries
+WINDOW_SIZE = 1000
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _format_key(key: LabelKey) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Metrics:
+    """
+    A small in-process metrics registry.
+
+    Counters accumulate totals, observations keep a rolling window of values
+    so p50/p95 summaries can be exported without an external dependency.
+    """
+
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self._lock = threading.Lock()
+        self._window_size = window_size
+        self._counters: Dict[LabelKey, float] = defaultdict(float)
+        self._observations: Dict[LabelKey, Deque[float]] = {}
+        self._observation_counts: Dict[LabelKey, int] = defaultdict(int)
+        self._observation_sums: Dict[LabelKey, float] = defaultdict(float)
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        """Adds `value` to the counter `name` with the given labels."""
+        with self._lock:
+            self._counters[_key(name, labels)] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Records a single observation (e.g. a latency in milliseconds)."""
+        key = _key(name, labels)
+        with self._lock:
+            window = self._observations.get(key)
+            if window is None:
+                window = self._observations[key] = deque(maxlen=self._window_size)
+            window.append(value)
+            self._observation_counts[key] += 1
+            self._observation_sums[key] += value
+
+    def counter(self, name: str, **labels) -> float:
+        """Returns the current value of a counter."""
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0.0)
+
+    def summary(self, name: str, **labels) -> Dict[str, float]:
+        """Returns count/avg/p50/p95/max for an observation series."""
+        key = _key(name, labels)
+        with self._lock:
+            values = sorted(self._observations.get(key, ()))
+            count = self._observation_counts.get(key, 0)
+            total = self._observation_sums.get(key, 0.0)
+        return {
+            "count": count,
+            "avg": total / count if count else 0.0,
+            "p50": _percentile(values, 0.50),
+            "p95": _percentile(values, 0.95),
+            "max": values[-1] if values else 0.0,
+        }
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Returns every counter and observation summary, keyed by `name{labels}`."""
+        with self._lock:
+            counter_keys = list(self._counters.keys())
+            observation_keys = list(self._observations.keys())
+            counters = {_format_key(k): self._counters[k] for k in counter_keys}
+        summaries = {}
+        for key in observation_keys:
+            name, labels = key
+            summaries[_format_key(key)] = self.summary(name, **dict(labels))
+        return {"counters": counters, "observations": summaries}
+
+
+# Process-wide registry
+metrics = Metrics()
@@ -0,0 +1,265 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from utils.circuit_breaker import CircuitOpenError, get_breaker
+from utils.llm_clients import get_chat_model
+from utils.metrics import metrics
+from utils.scheduler import DEFAULT_OUTPUT_TOKENS, scheduler
+from utils.token_budget import token_budgets
+from utils.tokens import count_tokens
+
+__all__ = ["ModelCandidate", "ModelRouter", "model_router", "WORKFLOW_ROUTES"]
+
+
+@dataclass(frozen=True)
+class ModelCandidate:
+    provider: str
+    model: str
+
+    @classmethod
+    def parse(cls, spec: str) -> "ModelCandidate":
+        """Parses `provider:model`, e.g. `groq:llama-3.1-8b-instant`."""
+        provider, _, model = spec.strip().partition(":")
+        return cls(provider=provider, model=model or provider)
+
+    def __str__(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+def _candidates(*specs: str) -> List[ModelCandidate]:
+    return [ModelCandidate.parse(spec) for spec in specs]
+
+
+# Per-workflow allow-lists. The first candidate is the historical default and is
+# used until latency data exists for the others. Override a list with
+# MODEL_ROUTE_<WORKFLOW>="provider:model,provider:model", or every list at once
+# with MODEL_ROUTE_OVERRIDE (e.g. "fake:fake" for tests).
+WORKFLOW_ROUTES: Dict[str, List[ModelCandidate]] = {
+    "translation": _candidates("groq:llama-3.1-8b-instant", "cerebras:llama3.1-8b", "openai:gpt-4.1-nano-2025-04-14"),
+    "sentence_translation": _candidates("openai:gpt-4.1-nano-2025-04-14", "groq:llama-3.3-70b-versatile"),
+    "html_formatter": _candidates("groq:llama-3.1-8b-instant", "cerebras:llama3.1-8b"),
+    "listening_transcript": _candidates("openai:gpt-4.1-nano-2025-04-14", "openai:gpt-4o-mini"),
+    "listening_announcement": _candidates("openai:gpt-4.1-nano-2025-04-14", "openai:gpt-4o-mini"),
+    "listening_transcript_batch": _candidates("openai:gpt-4.1-nano-2025-04-14", "openai:gpt-4o-mini"),
+    "listening_announcement_batch": _candidates("openai:gpt-4.1-nano-2025-04-14", "openai:gpt-4o-mini"),
+    "listening_interview": _candidates("openai:gpt-4.1-nano-2025-04-14", "openai:gpt-4o-mini"),
+    "reading_advert": _candidates("openai:gpt-4o-mini", "openai:gpt-4.1-nano-2025-04-14"),
+    "reading_comprehension": _candidates("openai:gpt-4.1-nano-2025-04-14", "openai:gpt-4o-mini"),
+    "reading_match_titles": _candidates("openai:gpt-4.1-nano-2025-04-14", "groq:llama-3.3-70b-versatile"),
+    "writing_exam": _candidates("openai:gpt-4.1-nano-2025-04-14", "groq:llama-3.3-70b-versatile"),
+    "writing_review": _candidates("openai:gpt-4.1-nano-2025-04-14", "openai:gpt-4o-mini"),
+    "text_translation": _candidates("openai:gpt-4.1-nano-2025-04-14", "groq:llama-3.3-70b-versatile"),
+}
+
+# Rolling window of calls kept per (workflow, candidate)
+WINDOW_SIZE = 50
+# Calls needed before a candidate's latency is trusted for ranking
+MIN_SAMPLES = 5
+# Candidates above this error rate are considered unhealthy
+MAX_ERROR_RATE = 0.5
+# Share of calls sent to a candidate without enough samples, to learn its latency
+EXPLORE_RATE = 0.05
+
+
+def _routes_from_env(routes: Dict[str, List[ModelCandidate]]) -> Dict[str, List[ModelCandidate]]:
+    override = os.getenv("MODEL_ROUTE_OVERRIDE")
+    resolved = {}
+    for workflow, candidates in routes.items():
+        spec = os.getenv(f"MODEL_ROUTE_{workflow.upper()}") or override
+        resolved[workflow] = _candidates(*spec.split(",")) if spec else list(candidates)
+    return resolved
+
+
+class LatencyTracker:
+    """Rolling latency and error samples for one (workflow, candidate) pair."""
+
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window_size)
+
+    def record(self, latency_ms: float, ok: bool) -> None:
+        self._samples.append((latency_ms, ok))
+
+    def stats(self) -> Dict[str, float]:
+        samples = list(self._samples)
+        latencies = sorted(latency for latency, ok in samples if ok)
+        errors = sum(1 for _, ok in samples if not ok)
+
+        def pct(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(round(fraction * (len(latencies) - 1))))]
+
+        return {
+            "samples": len(samples),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "error_rate": errors / len(samples) if samples else 0.0,
+        }
+
+
+class ModelRouter:
+    """
+    Routes each workflow call to the fastest healthy model on its allow-list.
+
+    Candidates are ranked by rolling p95 latency among those with an error rate
+    below MAX_ERROR_RATE, followed by unmeasured and then unhealthy ones. A small
+    share of traffic probes the other candidates so their stats stay current.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, List[ModelCandidate]]] = None):
+        self.routes = _routes_from_env(routes if routes is not None else WORKFLOW_ROUTES)
+        self._trackers: Dict[Tuple[str, ModelCandidate], LatencyTracker] = {}
+        self._lock = threading.Lock()
+
+    def _tracker(self, workflow: str, candidate: ModelCandidate) -> LatencyTracker:
+        key = (workflow, candidate)
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                tracker = self._trackers[key] = LatencyTracker()
+            return tracker
+
+    def candidates(self, workflow: str) -> List[ModelCandidate]:
+        """Returns the allow-listed candidates for `workflow`; every one of them must support structured output."""
+        if workflow not in self.routes:
+            raise KeyError(f"No model route configured for workflow '{workflow}'.")
+        return list(self.routes[workflow])
+
+    def rank(self, workflow: str) -> List[ModelCandidate]:
+        """Orders candidates from most to least preferred."""
+        candidates = self.candidates(workflow)
+        measured, unmeasured, unhealthy = [], [], []
+        for position, candidate in enumerate(candidates):
+            stats = self._tracker(workflow, candidate).stats()
+            if stats["samples"] >= MIN_SAMPLES and stats["error_rate"] > MAX_ERROR_RATE:
+                unhealthy.append((stats["error_rate"], position, candidate))
+            elif stats["samples"] < MIN_SAMPLES or stats["p95_ms"] is None:
+                unmeasured.append(candidate)
+            else:
+                measured.append((stats["p95_ms"], position, candidate))
+
+        ranked = [c for *_, c in sorted(measured)]
+        ranked = unmeasured + ranked if not ranked else ranked + unmeasured
+        ranked += [c for *_, c in sorted(unhealthy)]
+
+        # Occasionally probe a candidate that isn't first, so unmeasured models get
+        # measured and unhealthy ones can show they have recovered.
+        if len(ranked) > 1 and random.random() < EXPLORE_RATE:
+            probe = random.choice(ranked[1:])
+            ranked.remove(probe)
+            ranked.insert(0, probe)
+        return ranked
+
+    def record(self, workflow: str, candidate: ModelCandidate, latency_ms: float, ok: bool) -> None:
+        self._tracker(workflow, candidate).record(latency_ms, ok)
+        labels = {"workflow": workflow, "provider": candidate.provider, "model": candidate.model}
+        if ok:
+            metrics.observe("llm.latency_ms", latency_ms, **labels)
+        else:
+            metrics.increment("llm.errors", **labels)
+
+    async def ainvoke(
+        self,
+        workflow: str,
+        prompt: Any,
+        schema: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.0,
+        **model_kwargs,
+    ) -> Any:
+        """
+        Invokes the preferred model for `workflow` through the scheduler.
+
+        Candidates whose provider circuit breaker is open are skipped without
+        waiting, and a failed call fails over to the next candidate right away.
+        Every candidate except the last runs without SDK retries so a degraded
+        provider costs one attempt instead of a full retry cycle. Output is
+        capped at the workflow's token budget unless `max_tokens` is passed.
+
+        Args:
+            workflow: Key into the route table, e.g. "reading_advert".
+            prompt: A prompt value, string or input dict accepted by the model.
+            schema: Optional structured output schema.
+            temperature: Sampling temperature.
+            **model_kwargs: Extra client options such as `max_retries`.
+        """
+        candidates = self.rank(workflow)
+        prompt_tokens = count_tokens(prompt)
+        budget = model_kwargs.get("max_tokens") or token_budgets.budget(workflow)
+        if budget and "max_tokens" not in model_kwargs:
+            model_kwargs["max_tokens"] = budget
+        last_error: Optional[BaseException] = None
+        for position, candidate in enumerate(candidates):
+            breaker = get_breaker(candidate.provider)
+            if not breaker.allow():
+                continue
+            kwargs = dict(model_kwargs)
+            if position < len(candidates) - 1:
+                kwargs["max_retries"] = 0
+            try:
+                result = await self._invoke_candidate(
+                    workflow, candidate, prompt, schema, temperature, kwargs,
+                    tokens=prompt_tokens + (budget or DEFAULT_OUTPUT_TOKENS),
+                )
+            except asyncio.CancelledError:
+                breaker.release_trial()
+                raise
+            except Exception as e:
+                breaker.record(e)
+                last_error = e
+                if position < len(candidates) - 1:
+                    metrics.increment("llm.failovers", workflow=workflow, provider=candidate.provider)
+                    print(f"[ModelRouter] {workflow}: {candidate} failed ({e}), failing over.")
+                continue
+            breaker.record_success()
+            token_budgets.record(workflow, prompt_tokens, result, budget)
+            return result
+
+        if last_error is not None:
+            raise last_error
+        raise CircuitOpenError(",".join(sorted({c.provider for c in candidates})))
+
+    async def _invoke_candidate(
+        self,
+        workflow: str,
+        candidate: ModelCandidate,
+        prompt: Any,
+        schema: Optional[Type[BaseModel]],
+        temperature: float,
+        model_kwargs: Dict[str, Any],
+        tokens: int,
+    ) -> Any:
+        llm = get_chat_model(candidate.provider, candidate.model, schema, temperature=temperature, **model_kwargs)
+
+        async def call():
+            # Timed inside the scheduler slot so queue wait doesn't count as model latency
+            started = time.perf_counter()
+            try:
+                result = await llm.ainvoke(prompt)
+            except Exception:
+                self.record(workflow, candidate, (time.perf_counter() - started) * 1000, ok=False)
+                raise
+            self.record(workflow, candidate, (time.perf_counter() - started) * 1000, ok=True)
+            return result
+
+        return await scheduler.run(candidate.provider, call, tokens=tokens)
+
+    def state(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Returns rolling stats per workflow and candidate."""
+        with self._lock:
+            keys = list(self._trackers.keys())
+        state: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for workflow, candidate in keys:
+            state.setdefault(workflow, {})[str(candidate)] = self._tracker(workflow, candidate).stats()
+        return state
+
+
+# Process-wide router
+model_router = ModelRouter()
@@ -0,0 +1,159 @@
+import functools
+from dataclasses import dataclass
+from typing import List, Optional
+
+__all__ = ["FrameFormat", "Mp3Clip", "parse_mp3", "silence"]
+
+# Bitrates in kbps by [MPEG-1][layer] / [MPEG-2 and 2.5][layer], index 0 (free format) and 15 are invalid
+_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Sample rates by version bits (0: MPEG-2.5, 2: MPEG-2, 3: MPEG-1)
+_SAMPLE_RATES = {0: [11025, 12000, 8000], 2: [22050, 24000, 16000], 3: [44100, 48000, 32000]}
+# Layer bits to layer number
+_LAYERS = {1: 3, 2: 2, 3: 1}
+
+
+@dataclass(frozen=True)
+class FrameFormat:
+    """The parts of an MPEG audio frame header that must match for frames to be spliced."""
+
+    version_bits: int
+    layer: int
+    bitrate_index: int
+    sample_rate_index: int
+    channel_mode: int
+
+    @property
+    def mpeg1(self) -> bool:
+        return self.version_bits == 3
+
+    @property
+    def sample_rate(self) -> int:
+        return _SAMPLE_RATES[self.version_bits][self.sample_rate_index]
+
+    @property
+    def bitrate(self) -> int:
+        return _BITRATES[(self.mpeg1, self.layer)][self.bitrate_index] * 1000
+
+    @property
+    def samples_per_frame(self) -> int:
+        if self.layer == 1:
+            return 384
+        if self.layer == 3 and not self.mpeg1:
+            return 576
+        return 1152
+
+    def frame_length(self, padding: bool = False) -> int:
+        if self.layer == 1:
+            return (12 * self.bitrate // self.sample_rate + padding) * 4
+        return self.samples_per_frame // 8 * self.bitrate // self.sample_rate + padding
+
+    def splices_with(self, other: "FrameFormat") -> bool:
+        """
+        Whether frames of `other` can follow frames of this format in one
+        stream. The bitrate may change from frame to frame (as in VBR files);
+        the MPEG version, layer, sample rate and channel mode may not.
+        """
+        return (
+            self.version_bits == other.version_bits
+            and self.layer == other.layer
+            and self.sample_rate_index == other.sample_rate_index
+            and self.channel_mode == other.channel_mode
+        )
+
+    def header(self) -> bytes:
+        """A frame header in this format without CRC or padding."""
+        return bytes([
+            0xFF,
+            0xE0 | self.version_bits << 3 | (4 - self.layer) << 1 | 1,
+            self.bitrate_index << 4 | self.sample_rate_index << 2,
+            self.channel_mode << 6,
+        ])
+
+
+def _read_header(data: bytes, offset: int) -> Optional[tuple]:
+    """(format, frame length) of a valid frame header at `offset`, or None."""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    version_bits = data[offset + 1] >> 3 & 0x3
+    layer = _LAYERS.get(data[offset + 1] >> 1 & 0x3)
+    bitrate_index = data[offset + 2] >> 4
+    sample_rate_index = data[offset + 2] >> 2 & 0x3
+    if version_bits == 1 or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    frame_format = FrameFormat(version_bits, layer, bitrate_index, sample_rate_index, data[offset + 3] >> 6)
+    return frame_format, frame_format.frame_length(bool(data[offset + 2] >> 1 & 0x1))
+
+
+def _is_info_frame(data: bytes, offset: int, frame_format: FrameFormat) -> bool:
+    # Xing/Info/VBRI frames describe the whole file; they are wrong once files are spliced
+    if frame_format.layer != 3:
+        return False
+    mono = frame_format.channel_mode == 3
+    side_info = (17 if mono else 32) if frame_format.mpeg1 else (9 if mono else 17)
+    tag = data[offset + 4 + side_info:offset + 8 + side_info]
+    return tag in (b"Xing", b"Info") or data[offset + 36:offset + 40] == b"VBRI"
+
+
+@dataclass
+class Mp3Clip:
+    """The audio frames of an MP3 file, without tags or Xing/Info header."""
+
+    frames: bytes
+    format: FrameFormat
+    frame_count: int
+
+    @property
+    def duration_ms(self) -> float:
+        return self.frame_count * self.format.samples_per_frame * 1000 / self.format.sample_rate
+
+
+def parse_mp3(data: bytes) -> Mp3Clip:
+    """
+    Splits an MP3 file into its audio frames. Junk between frames is skipped.
+
+    Raises:
+        ValueError: If `data` contains no MPEG audio frames.
+    """
+    offset = 0
+    # ID3v2 tag: 10 byte header with a syncsafe size
+    if data[:3] == b"ID3" and len(data) >= 10:
+        offset = 10 + (data[6] << 21 | data[7] << 14 | data[8] << 7 | data[9])
+    end = len(data) - 128 if data[-128:-125] == b"TAG" else len(data)
+
+    frames: List[bytes] = []
+    first_format: Optional[FrameFormat] = None
+    while offset < end:
+        header = _read_header(data, offset)
+        if header is None or offset + header[1] > end:
+            offset += 1
+            continue
+        frame_format, length = header
+        if not frames and first_format is None and _is_info_frame(data, offset, frame_format):
+            first_format = frame_format
+        else:
+            frames.append(data[offset:offset + length])
+            first_format = first_format or frame_format
+        offset += length
+    if not frames:
+        raise ValueError("No MPEG audio frames found.")
+    return Mp3Clip(frames=b"".join(frames), format=first_format, frame_count=len(frames))
+
+
+@functools.lru_cache(maxsize=256)
+def _silent_frames(frame_format: FrameFormat, count: int) -> bytes:
+    # Zeroed side info means no main data and a global gain of zero: the frame decodes to silence
+    frame = frame_format.header() + bytes(frame_format.frame_length() - 4)
+    return frame * count
+
+
+def silence(frame_format: FrameFormat, duration_ms: int) -> bytes:
+    """Pre-encoded silent frames of `frame_format`, as close to `duration_ms` as whole frames allow."""
+    count = round(duration_ms * frame_format.sample_rate / 1000 / frame_format.samples_per_frame)
+    return _silent_frames(frame_format, count)
@@ -0,0 +1,359 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from utils.metrics import metrics
+
+__all__ = [
+    "Priority",
+    "ProviderLimits",
+    "LLMScheduler",
+    "scheduler",
+    "request_context",
+    "estimate_tokens",
+    "rate_limit_retry_after",
+    "SchedulingContextMiddleware",
+]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Priority lanes for outbound calls. Lower values are served first."""
+
+    INTERACTIVE = 0  # A user is waiting on a short answer (translations, reviews)
+    GENERATION = 1  # User-facing exam and audio generation
+    BACKGROUND = 2  # Cache refills, prefetching and bulk jobs
+
+
+@dataclass
+class ProviderLimits:
+    max_concurrency: int
+    tokens_per_minute: Optional[int] = None
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+def default_provider_limits() -> Dict[str, ProviderLimits]:
+    """Provider limits, overridable with <PROVIDER>_MAX_CONCURRENCY / <PROVIDER>_TOKENS_PER_MINUTE."""
+    defaults = {
+        "openai": ProviderLimits(16, 200_000),
+        "groq": ProviderLimits(8, 30_000),
+        "cerebras": ProviderLimits(8, 60_000),
+        "openai-tts": ProviderLimits(8),
+        "elevenlabs": ProviderLimits(4),
+    }
+    limits = {}
+    for provider, default in defaults.items():
+        prefix = provider.upper().replace("-", "_")
+        limits[provider] = ProviderLimits(
+            max_concurrency=_env_int(f"{prefix}_MAX_CONCURRENCY", default.max_concurrency),
+            tokens_per_minute=_env_int(f"{prefix}_TOKENS_PER_MINUTE", default.tokens_per_minute),
+        )
+    return limits
+
+
+# Maximum concurrent in-flight provider calls per endpoint, so one endpoint
+# cannot take every provider slot. Endpoints not listed are unbounded.
+DEFAULT_BULKHEADS = {
+    # Counted per segment, not per interview
+    "interview-audio": 6,
+    "listening-audio": 8,
+    "listening-exam": 8,
+    "reading-exam": 12,
+    "writing-exam": 8,
+    "background": 4,
+    "prefetch": 8,
+    "audio-prerender": 4,
+    # Outbound calls of background jobs, across all JOB_WORKERS
+    "jobs": 8,
+}
+
+# Default output allowance added to input estimates when budgeting tokens
+DEFAULT_OUTPUT_TOKENS = 1500
+
+_priority_var: contextvars.ContextVar[Priority] = contextvars.ContextVar("llm_priority", default=Priority.GENERATION)
+_endpoint_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_endpoint", default=None)
+
+
+@contextmanager
+def request_context(priority: Priority, endpoint: Optional[str] = None):
+    """Sets the priority lane and bulkhead used by outbound calls made in this context."""
+    priority_token = _priority_var.set(priority)
+    endpoint_token = _endpoint_var.set(endpoint)
+    try:
+        yield
+    finally:
+        _priority_var.reset(priority_token)
+        _endpoint_var.reset(endpoint_token)
+
+
+def estimate_tokens(prompt: Any, expected_output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> int:
+    """Rough token estimate (~4 characters per token) for budgeting a call."""
+    text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+    return len(text) // 4 + expected_output_tokens
+
+
+def rate_limit_retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Returns the number of seconds to back off if `exc` is a rate limit (HTTP 429) error,
+    otherwise None. Honours `retry-after-ms` and `retry-after` headers when present.
+    """
+    status = getattr(exc, "status_code", None)
+    response = getattr(exc, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    if status != 429:
+        return None
+
+    headers = getattr(response, "headers", None) or getattr(exc, "headers", None) or {}
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return 1.0
+
+
+class ProviderGate:
+    """
+    Admission control for one provider: a priority queue in front of a
+    concurrency limit and a token-per-minute bucket.
+
+    On a 429 the gate pauses admissions until Retry-After has elapsed and
+    halves its concurrency; successful calls grow it back one slot at a time.
+    """
+
+    def __init__(self, name: str, limits: ProviderLimits):
+        self.name = name
+        self.limits = limits
+        self.concurrency = limits.max_concurrency
+        self.active = 0
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._tokens = float(limits.tokens_per_minute or 0)
+        self._tokens_updated = time.monotonic()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self, now: float) -> None:
+        capacity = self.limits.tokens_per_minute
+        if not capacity:
+            return
+        self._tokens = min(capacity, self._tokens + (now - self._tokens_updated) * capacity / 60)
+        self._tokens_updated = now
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(max(delay, 0.01), self._dispatch)
+
+    def _dispatch(self) -> None:
+        self._wakeup = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters and self.active < self.concurrency:
+            if now < self._paused_until:
+                self._schedule_wakeup(self._paused_until - now)
+                return
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            capacity = self.limits.tokens_per_minute
+            if capacity:
+                needed = min(tokens, capacity)
+                if self._tokens < needed:
+                    self._schedule_wakeup((needed - self._tokens) * 60 / capacity)
+                    return
+                self._tokens -= needed
+            heapq.heappop(self._waiters)
+            self.active += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: Priority, tokens: int) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), tokens, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the caller was cancelled; hand the slot back.
+                self.release()
+            else:
+                future.cancel()
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        self._dispatch()
+
+    def on_success(self) -> None:
+        if self.concurrency < self.limits.max_concurrency:
+            self.concurrency += 1
+
+    def on_rate_limited(self, retry_after: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self.concurrency = max(1, self.concurrency // 2)
+        metrics.increment("scheduler.rate_limited", provider=self.name)
+        logger.warning(f"[{self.name}] Rate limited, pausing {retry_after:.1f}s (concurrency now {self.concurrency}).")
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": sum(1 for *_, f in self._waiters if not f.done()),
+            "concurrency": self.concurrency,
+            "max_concurrency": self.limits.max_concurrency,
+            "tokens_available": int(self._tokens) if self.limits.tokens_per_minute else None,
+            "paused_for_s": max(0.0, round(self._paused_until - time.monotonic(), 2)),
+        }
+
+
+class LLMScheduler:
+    """
+    Central scheduler for outbound LLM and TTS calls.
+
+    Every call goes through an endpoint bulkhead and then its provider gate.
+    The priority lane and endpoint come from `request_context`, so workflows
+    don't need to thread them through their signatures.
+    """
+
+    def __init__(
+        self,
+        provider_limits: Optional[Dict[str, ProviderLimits]] = None,
+        bulkheads: Optional[Dict[str, int]] = None,
+    ):
+        self._provider_limits = provider_limits if provider_limits is not None else default_provider_limits()
+        self._bulkhead_limits = bulkheads if bulkheads is not None else dict(DEFAULT_BULKHEADS)
+        self._gates: Dict[str, ProviderGate] = {}
+        self._bulkheads: Dict[str, asyncio.Semaphore] = {}
+
+    def gate(self, provider: str) -> ProviderGate:
+        gate = self._gates.get(provider)
+        if gate is None:
+            limits = self._provider_limits.get(provider, ProviderLimits(max_concurrency=8))
+            gate = self._gates[provider] = ProviderGate(provider, limits)
+        return gate
+
+    def _bulkhead(self, endpoint: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if endpoint is None or endpoint not in self._bulkhead_limits:
+            return None
+        semaphore = self._bulkheads.get(endpoint)
+        if semaphore is None:
+            semaphore = self._bulkheads[endpoint] = asyncio.Semaphore(self._bulkhead_limits[endpoint])
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, provider: str, tokens: int = 0, priority: Optional[Priority] = None, endpoint: Optional[str] = None):
+        """Waits for a bulkhead and provider slot, recording the time spent queued."""
+        priority = _priority_var.get() if priority is None else priority
+        endpoint = _endpoint_var.get() if endpoint is None else endpoint
+        gate = self.gate(provider)
+        bulkhead = self._bulkhead(endpoint)
+
+        started = time.perf_counter()
+        if bulkhead is not None:
+            await bulkhead.acquire()
+        try:
+            await gate.acquire(priority, tokens)
+            waited_ms = (time.perf_counter() - started) * 1000
+            metrics.observe("scheduler.queue_wait_ms", waited_ms, provider=provider, priority=priority.name.lower())
+            if endpoint is not None:
+                metrics.observe("scheduler.endpoint_wait_ms", waited_ms, endpoint=endpoint)
+            try:
+                yield gate
+            finally:
+                gate.release()
+        finally:
+            if bulkhead is not None:
+                bulkhead.release()
+
+    async def run(
+        self,
+        provider: str,
+        call: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+        priority: Optional[Priority] = None,
+        endpoint: Optional[str] = None,
+        max_attempts: int = 3,
+    ) -> T:
+        """
+        Runs `call` inside a provider slot. Rate limit errors pause the provider
+        for the advertised Retry-After and the call is queued again.
+        """
+        for attempt in range(1, max_attempts + 1):
+            async with self.slot(provider, tokens, priority, endpoint) as gate:
+                try:
+                    result = await call()
+                    gate.on_success()
+                    return result
+                except Exception as e:
+                    retry_after = rate_limit_retry_after(e)
+                    if retry_after is None:
+                        raise
+                    gate.on_rate_limited(retry_after)
+                    if attempt == max_attempts:
+                        raise
+        raise RuntimeError("unreachable")
+
+    async def ainvoke(self, provider: str, runnable: Any, prompt: Any, **kwargs) -> Any:
+        """Convenience wrapper: `runnable.ainvoke(prompt)` through the scheduler."""
+        return await self.run(provider, lambda: runnable.ainvoke(prompt), tokens=estimate_tokens(prompt), **kwargs)
+
+    def state(self) -> Dict[str, Any]:
+        return {name: gate.state() for name, gate in self._gates.items()}
+
+
+class SchedulingContextMiddleware:
+    """
+    ASGI middleware that assigns each request a priority lane and bulkhead
+    based on its path. `routes` maps path prefixes to (priority, endpoint);
+    the longest matching prefix wins.
+    """
+
+    def __init__(self, app, routes: Dict[str, Tuple[Priority, str]]):
+        self.app = app
+        self.routes = sorted(routes.items(), key=lambda item: len(item[0]), reverse=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope.get("path", "")
+        for prefix, (priority, endpoint) in self.routes:
+            if path.startswith(prefix):
+                with request_context(priority, endpoint):
+                    await self.app(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+# Process-wide scheduler
+scheduler = LLMScheduler()
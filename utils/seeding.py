@@ -0,0 +1,58 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+__all__ = ["exam_random", "seeded_random", "current_seed", "mark_degraded", "is_degraded"]
+
+_rng_var: ContextVar[Optional[random.Random]] = ContextVar("exam_rng", default=None)
+_seed_var: ContextVar[Optional[int]] = ContextVar("exam_seed", default=None)
+# Shared by the tasks a seeded generation starts, so a mark in any of them counts
+_degraded_var: ContextVar[Optional[List[bool]]] = ContextVar("exam_degraded", default=None)
+
+
+def exam_random() -> Any:
+    """
+    The random source for topic choice, sampling and shuffling: a generator
+    seeded by the current request's `seed`, or the global `random` module.
+    """
+    return _rng_var.get() or random
+
+
+def current_seed() -> Optional[int]:
+    return _seed_var.get()
+
+
+def mark_degraded() -> None:
+    """
+    Marks the exam being generated for a seed as a stand-in (stored content
+    served after a generation error, or a placeholder), which must not be
+    kept as that seed's exam. Does nothing outside a seeded generation.
+    """
+    marks = _degraded_var.get()
+    if marks is not None:
+        marks.append(True)
+
+
+def is_degraded() -> bool:
+    """Whether `mark_degraded` was called during the current seeded generation."""
+    return bool(_degraded_var.get())
+
+
+@contextmanager
+def seeded_random(seed: Optional[int], namespace: str = "") -> Iterator[None]:
+    """
+    Makes `exam_random()` return a generator seeded from `namespace` and `seed`
+    for the duration of the block (and tasks started in it). A None seed
+    restores the unseeded behaviour.
+    """
+    rng = random.Random(f"{namespace}:{seed}") if seed is not None else None
+    rng_token = _rng_var.set(rng)
+    seed_token = _seed_var.set(seed)
+    degraded_token = _degraded_var.set([] if seed is not None else None)
+    try:
+        yield
+    finally:
+        _rng_var.reset(rng_token)
+        _seed_var.reset(seed_token)
+        _degraded_var.reset(degraded_token)
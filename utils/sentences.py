@@ -0,0 +1,40 @@
+import re
+from typing import List
+
+__all__ = ["split_sentences"]
+
+# German abbreviations whose period does not end a sentence
+_ABBREVIATIONS = {
+    "b", "bzw", "ca", "d", "dr", "etc", "evtl", "ggf", "h", "inkl", "nr", "prof", "s", "str", "u", "usw", "vgl", "z", "zb", "a",
+}
+
+# A sentence ends at . ! ? or … (optionally followed by closing quotes/brackets) before whitespace
+_BOUNDARY = re.compile(r"[.!?…]+[\"'»«“”)\]]*\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits German text into sentences for synthesis. Periods after common
+    abbreviations ("z. B.", "Dr.") and after numbers ("1. Mai") don't end a
+    sentence, and a sentence must be followed by one that starts with a
+    capital letter, digit or quote. Joining the result with spaces gives
+    back the text up to whitespace.
+    """
+    sentences = []
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        end = match.end()
+        following = text[end:end + 1]
+        if not following or not (following.isupper() or following.isdigit() or following in "\"'»«„“"):
+            continue
+        if text[match.start()] == ".":
+            words = text[start:match.start()].split()
+            last_word = words[-1].lower() if words else ""
+            if last_word.rstrip(".") in _ABBREVIATIONS or last_word.isdigit():
+                continue
+        sentences.append(text[start:end].strip())
+        start = end
+    rest = text[start:].strip()
+    if rest:
+        sentences.append(rest)
+    return sentences
@@ -0,0 +1,138 @@
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from pydantic import BaseModel
+
+from utils.metrics import metrics
+from utils.tokens import count_tokens
+
+__all__ = ["InputTooLargeError", "TokenBudgets", "token_budgets", "check_input_tokens", "OUTPUT_TOKEN_CEILINGS"]
+
+# Upper bound on output tokens per workflow, sized from the output of each schema
+# with headroom (e.g. a full interview runs to ~4k tokens, a word translation to ~100).
+# Override with MAX_TOKENS_<WORKFLOW>.
+OUTPUT_TOKEN_CEILINGS: Dict[str, int] = {
+    "translation": 256,
+    "sentence_translation": 512,
+    "html_formatter": 2048,
+    "listening_transcript": 3072,
+    "listening_announcement": 2048,
+    # Batches of up to four exams
+    "listening_transcript_batch": 12288,
+    "listening_announcement_batch": 8192,
+    "listening_interview": 6144,
+    "reading_advert": 3072,
+    "reading_comprehension": 3072,
+    "reading_match_titles": 4096,
+    "writing_exam": 1024,
+    "writing_review": 2048,
+    "text_translation": 4096,
+}
+
+# Output sizes kept per workflow to derive its budget
+HISTORY_SIZE = 200
+# Outputs observed before the budget follows the history instead of the ceiling
+MIN_HISTORY = 20
+# Budget = this percentile of observed output tokens times HEADROOM
+BUDGET_PERCENTILE = 0.99
+HEADROOM = 1.25
+# Budgets are rounded up to a multiple of this, so the client registry sees few distinct values
+BUDGET_STEP = 256
+# Outputs using at least this share of their budget are counted as hitting it
+AT_BUDGET_RATIO = 0.95
+
+
+class InputTooLargeError(ValueError):
+    """Raised when user supplied text exceeds the token limit for its field."""
+
+    def __init__(self, field: str, tokens: int, limit: int):
+        super().__init__(f"'{field}' is too long: {tokens} tokens, the limit is {limit}.")
+        self.field = field
+        self.tokens = tokens
+        self.limit = limit
+
+
+def check_input_tokens(text: str, limit: int, field: str) -> int:
+    """Returns the token count of `text`, raising InputTooLargeError if it exceeds `limit`."""
+    tokens = count_tokens(text)
+    if tokens > limit:
+        metrics.increment("tokens.input_rejected", field=field)
+        raise InputTooLargeError(field, tokens, limit)
+    return tokens
+
+
+def _output_text(result: Any) -> str:
+    if isinstance(result, BaseModel):
+        return result.model_dump_json()
+    content = getattr(result, "content", None)
+    return content if isinstance(content, str) else str(result)
+
+
+def _output_tokens(result: Any) -> int:
+    # Prefer the provider's reported usage, fall back to counting the output ourselves
+    usage = getattr(result, "usage_metadata", None)
+    if usage and usage.get("output_tokens"):
+        return int(usage["output_tokens"])
+    return count_tokens(_output_text(result))
+
+
+class TokenBudgets:
+    """
+    Per-workflow `max_tokens` caps derived from observed output sizes.
+
+    Until a workflow has MIN_HISTORY outputs its budget is the static ceiling;
+    after that it is the BUDGET_PERCENTILE output size plus HEADROOM, rounded up
+    to BUDGET_STEP and never above the ceiling. Every call records its prompt
+    size, output size and how much of the budget it used.
+    """
+
+    def __init__(self, ceilings: Optional[Dict[str, int]] = None):
+        ceilings = ceilings if ceilings is not None else OUTPUT_TOKEN_CEILINGS
+        self.ceilings = {
+            workflow: int(os.getenv(f"MAX_TOKENS_{workflow.upper()}", ceiling))
+            for workflow, ceiling in ceilings.items()
+        }
+        self._history: Dict[str, Deque[int]] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, workflow: str) -> Optional[int]:
+        """The `max_tokens` cap for the next call of `workflow`, or None if it has no ceiling."""
+        ceiling = self.ceilings.get(workflow)
+        if ceiling is None:
+            return None
+        with self._lock:
+            history = sorted(self._history.get(workflow, ()))
+        if len(history) < MIN_HISTORY:
+            return ceiling
+        observed = history[min(len(history) - 1, int(BUDGET_PERCENTILE * len(history)))]
+        budget = math.ceil(observed * HEADROOM / BUDGET_STEP) * BUDGET_STEP
+        return min(ceiling, max(BUDGET_STEP, budget))
+
+    def record(self, workflow: str, prompt_tokens: int, result: Any, budget: Optional[int]) -> int:
+        """Records the actual output size of a call against its budget and returns it."""
+        output_tokens = _output_tokens(result)
+        with self._lock:
+            history = self._history.get(workflow)
+            if history is None:
+                history = self._history[workflow] = deque(maxlen=HISTORY_SIZE)
+            history.append(output_tokens)
+        metrics.observe("tokens.input", prompt_tokens, workflow=workflow)
+        metrics.observe("tokens.output", output_tokens, workflow=workflow)
+        if budget:
+            metrics.observe("tokens.budget_used", output_tokens / budget, workflow=workflow)
+            if output_tokens >= budget * AT_BUDGET_RATIO:
+                metrics.increment("tokens.at_budget", workflow=workflow)
+        return output_tokens
+
+    def state(self) -> Dict[str, Dict[str, Optional[int]]]:
+        return {
+            workflow: {"ceiling": ceiling, "budget": self.budget(workflow), "samples": len(self._history.get(workflow, ()))}
+            for workflow, ceiling in self.ceilings.items()
+        }
+
+
+# Process-wide budgets
+token_budgets = TokenBudgets()
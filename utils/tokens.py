@@ -0,0 +1,47 @@
+import threading
+from typing import Any, Dict, Optional
+
+__all__ = ["count_tokens", "prompt_text"]
+
+# Encoding used when the model isn't known to tiktoken (e.g. Groq/Cerebras Llama models)
+DEFAULT_ENCODING = "o200k_base"
+
+_encodings: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def _encoding(model: Optional[str]) -> Any:
+    key = model or DEFAULT_ENCODING
+    with _lock:
+        if key in _encodings:
+            return _encodings[key]
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+        except KeyError:
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use; fall back to a heuristic if that fails
+        print(f"Warning: tiktoken unavailable ({e}), estimating tokens from character count.")
+        encoding = None
+    with _lock:
+        _encodings[key] = encoding
+    return encoding
+
+
+def prompt_text(prompt: Any) -> str:
+    """Returns the text of a prompt value, message list, dict or string."""
+    if hasattr(prompt, "to_string"):
+        return prompt.to_string()
+    return str(prompt)
+
+
+def count_tokens(text: Any, model: Optional[str] = None) -> int:
+    """Counts tokens in `text` (or a prompt value) with tiktoken, ~4 chars/token if unavailable."""
+    text = prompt_text(text)
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
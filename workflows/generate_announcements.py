@@ -1,12 +1,23 @@
-from langchain_openai import ChatOpenAI
+import asyncio
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from langsmith import traceable
 import os # Import os to access environment variables
-
-__all__ = ["Announcer", "Announcement", "generate_listening_exam_announcement"]
+from utils.model_router import model_router
+from .prompt_assets import prompt_assets
+
+__all__ = [
+    "Announcer",
+    "Announcement",
+    "LeanAnnouncer",
+    "LeanAnnouncement",
+    "TranslatedAnnouncer",
+    "TranslatedAnnouncement",
+    "generate_listening_exam_announcement",
+    "generate_listening_exam_announcements",
+]
 
 # Load environment variables
 load_dotenv()
@@ -17,8 +28,8 @@ load_dotenv()
 #     print("Warning: GROQ_API_KEY not found in environment variables.")
 
 
-class Announcer(BaseModel):
-    """Structured output for a speaker."""
+class LeanAnnouncer(BaseModel):
+    """Structured output for a speaker, without the English translation."""
 
     name: str = Field(description="The name or role of the announcer (e.g., Bahnhofsansager, Flughafenpersonal)")
     gender: str = Field(description="The gender of the announcer (male/female)")
@@ -32,35 +43,63 @@ class Announcer(BaseModel):
     explanation: str = Field(
         description="A concise explanation in English of why the answer is correct, referencing the announcement."
     )
-    english_translation: str = Field(
-        description="An accurate English translation of the German announcement."
+
+
+class TranslatedAnnouncer(LeanAnnouncer):
+    """Structured output for a speaker."""
+
+    english_translation: str = Field(description="An accurate English translation of the German announcement.")
+
+
+class Announcer(LeanAnnouncer):
+    """An announcer as returned to clients; the translation is empty for lean exams until it is requested."""
+
+    english_translation: Optional[str] = Field(
+        default=None, description="An accurate English translation of the German announcement."
     )
 
 
-class Announcement(BaseModel):
+class LeanAnnouncement(BaseModel):
+    """Structured output for a list of public announcements generated without English translations."""
+
+    speakers: List[LeanAnnouncer] = Field(description="A list of 5 distinct announcement scenarios.")
+
+
+class TranslatedAnnouncement(BaseModel):
     """Structured output for a list of public announcements for a listening exam."""
 
+    speakers: List[TranslatedAnnouncer] = Field(description="A list of 5 distinct announcement scenarios.")
+
+
+class Announcement(BaseModel):
+    """Public announcements for a listening exam as returned to clients, generated in either mode."""
+
     speakers: List[Announcer] = Field(description="A list of 5 distinct announcement scenarios.")
 
 
-# Initialize the model - Consider llama-3.1-70b-versatile if 8b struggles with consistency
+class LeanAnnouncementBatch(BaseModel):
+    """Structured output for several announcement sets generated without English translations."""
+
+    announcement_sets: List[LeanAnnouncement] = Field(description="The requested number of announcement sets.")
+
+
+class AnnouncementBatch(BaseModel):
+    """Structured output for several announcement sets."""
+
+    announcement_sets: List[TranslatedAnnouncement] = Field(description="The requested number of announcement sets.")
+
+
+# Model settings - candidate models are listed under "listening_announcement" in the router.
 # Using a slightly lower temperature might help consistency if needed, but 1 is fine for variety.
-model = ChatOpenAI(
-    model="gpt-4.1-nano-2025-04-14",
-    temperature=0.8, # Slightly reduced temperature for better focus
-).with_structured_output(Announcement)
+TEMPERATURE = 0.8 # Slightly reduced temperature for better focus
 
 
-@traceable(run_type="llm")
-def generate_listening_exam_announcement() -> Announcement:
-    """Generates 5 diverse announcement scenarios for a German B1 listening exam."""
-    
-    # --- Prompt Definition ---
-    # Note: Removed the large JSON example block.
-    # Instructions clearly state the required fields.
-    
-    prompt_template = PromptTemplate.from_template(
-        """
+# --- Prompt Definition ---
+# Note: Removed the large JSON example block.
+# Instructions clearly state the required fields.
+# Static prompt, registered once at import time. The lean variant leaves out the
+# English translation, which is produced on demand instead.
+_INSTRUCTIONS = """
 Generate content for a German B1 level listening exam. Create exactly 5 distinct public announcement scenarios.
 
 **Overall Goal:** Produce realistic audio simulation material for language learners.
@@ -78,8 +117,7 @@ For each of the 5 scenarios, provide the following information adhering strictly
     3.  `opinion`: The announcement text in German (approx. 3-7 sentences).
     4.  `question`: A True/False question *in German* testing comprehension of the announcement.
     5.  `correct_answer`: `true` or `false`.
-    6.  `explanation`: A concise explanation *in English* justifying the correct answer by referencing the announcement content.
-    7.  `english_translation`: An accurate English translation of the German announcement text (`opinion`).
+    6.  `explanation`: A concise explanation *in English* justifying the correct answer by referencing the announcement content.{translation_item}
 
 **Example Contexts (Inspiration - do not copy directly):**
 -   Train delay announcement with reason and new platform.
@@ -92,22 +130,53 @@ For each of the 5 scenarios, provide the following information adhering strictly
 **Constraint Checklist:**
 - [ ] 5 distinct announcement scenarios generated.
 - [ ] All German text (`opinion`, `question`) is grammatically correct and natural-sounding for B1.
-- [ ] All English text (`explanation`, `english_translation`) is accurate.
+- [ ] All English text ({english_fields}) is accurate.
 - [ ] Questions effectively test comprehension beyond simple keyword spotting.
 - [ ] Output strictly follows the required structure for structured generation.
-
+"""
+prompt_template = PromptTemplate.from_template(_INSTRUCTIONS + """
 Generate the 5 announcements now.
-        """
-    )
+        """)
+# Several exams per call: the same instructions (and cached prefix), with the set count last
+batch_prompt_template = PromptTemplate.from_template(_INSTRUCTIONS + """
+Generate {count} separate sets of exactly 5 announcements each. Every set follows all of the instructions above on its own,
+and no scenario may repeat across the sets.
+        """)
+prompt_assets.register(
+    "listening_announcement",
+    prompt_template,
+    translation_item="\n    7.  `english_translation`: An accurate English translation of the German announcement text (`opinion`).",
+    english_fields="`explanation`, `english_translation`",
+)
+prompt_assets.register("listening_announcement_lean", prompt_template, translation_item="", english_fields="`explanation`")
+prompt_assets.register(
+    "listening_announcement_batch",
+    batch_prompt_template,
+    translation_item="\n    7.  `english_translation`: An accurate English translation of the German announcement text (`opinion`).",
+    english_fields="`explanation`, `english_translation`",
+)
+prompt_assets.register("listening_announcement_batch_lean", batch_prompt_template, translation_item="", english_fields="`explanation`")
 
-    prompt_value = prompt_template.invoke({}) # No variables needed for this template
+
+@traceable(run_type="llm")
+async def generate_listening_exam_announcement(lean: bool = False) -> Announcement:
+    """
+    Generates 5 diverse announcement scenarios for a German B1 listening exam.
+    In lean mode the English translations are left empty and produced on demand.
+    """
+
+    # No variables needed for this template
+    prompt_value = prompt_assets.render("listening_announcement_lean" if lean else "listening_announcement")
 
     print("--- Sending Prompt to Groq ---")
     # print(prompt_value.to_string()) # Uncomment to see the exact prompt being sent
     print("-----------------------------")
 
     try:
-        conversation = model.invoke(prompt_value)
+        conversation = await model_router.ainvoke(
+            "listening_announcement", prompt_value, LeanAnnouncement if lean else TranslatedAnnouncement, temperature=TEMPERATURE
+        )
+        conversation = Announcement.model_validate(conversation.model_dump())
         # Add basic validation
         if not conversation.speakers or len(conversation.speakers) != 5:
              print(f"Warning: Expected 5 speakers, but got {len(conversation.speakers) if conversation.speakers else 0}")
@@ -117,3 +186,31 @@ Generate the 5 announcements now.
         print(f"Error during model invocation: {e}")
         # You might want to re-raise or handle more gracefully
         raise e
+
+
+@traceable(run_type="llm")
+async def generate_listening_exam_announcements(count: int, lean: bool = False) -> List[Announcement]:
+    """
+    Generates `count` announcement sets in a single call, so the instructions
+    are sent once for all of them. Sets that don't come back with 5
+    scenarios are generated on their own instead, as are missing sets.
+    """
+    if count == 1:
+        return [await generate_listening_exam_announcement(lean=lean)]
+    prompt_value = prompt_assets.render(
+        "listening_announcement_batch_lean" if lean else "listening_announcement_batch", count=count
+    )
+    batch = await model_router.ainvoke(
+        "listening_announcement_batch", prompt_value, LeanAnnouncementBatch if lean else AnnouncementBatch, temperature=TEMPERATURE
+    )
+    announcements = [
+        Announcement.model_validate(announcement.model_dump())
+        for announcement in batch.announcement_sets[:count]
+        if len(announcement.speakers) == 5
+    ]
+    if len(announcements) < count:
+        print(f"Warning: Expected {count} announcement sets, got {len(announcements)} usable; generating the rest individually.")
+        announcements += await asyncio.gather(
+            *(generate_listening_exam_announcement(lean=lean) for _ in range(count - len(announcements)))
+        )
+    return announcements
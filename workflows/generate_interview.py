@@ -1,12 +1,13 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from langsmith import traceable
 import os
+from utils.model_router import model_router
+from .prompt_assets import prompt_assets
 
-__all__ = ["Interview", "generate_interview_transcript"]
+__all__ = ["Interview", "LeanInterview", "TranslatedInterview", "generate_interview_transcript"]
 
 # Load environment variables
 load_dotenv()
@@ -40,36 +41,39 @@ class ExamQuestion(BaseModel):
     explanation: str = Field(description="A concise explanation in English justifying the correct answer, referencing the interview.")
 
 
-class Interview(BaseModel):
-    """Structured output for a complete interview including exam questions."""
+class LeanInterview(BaseModel):
+    """Structured output for a complete interview including exam questions, without the English translation."""
     interviewer: Interviewer = Field(description="Details of the interviewer.")
     interviewee: Interviewee = Field(description="Details of the person being interviewed.")
     conversation_segments: List[ConversationSegment] = Field(description="List of conversation segments, alternating between interviewer and interviewee.")
     exam_questions: List[ExamQuestion] = Field(description="List of 10 True/False questions based on the interview.")
+
+
+class TranslatedInterview(LeanInterview):
+    """Structured output for a complete interview including exam questions."""
     english_translation_conversation: str = Field(description="An accurate English translation of the full conversation .")
 
 
-# Initialize the model with structured output
-model = ChatOpenAI(
-    model="gpt-4.1-nano-2025-04-14",
-    temperature=0.7
-).with_structured_output(Interview)
+class Interview(LeanInterview):
+    """An interview as returned to clients; the translation is empty for lean exams until it is requested."""
+    english_translation_conversation: Optional[str] = Field(default=None, description="An accurate English translation of the full conversation .")
 
 
-@traceable(run_type="llm")
-def generate_interview_transcript() -> Interview:
-    """Generates an extensive interview transcript (~100 sentences), with detailed questions and answers for a German B1 listening exam."""
+# Model settings for structured output; the model comes from the "listening_interview" route
+TEMPERATURE = 0.7
 
-    prompt_template = PromptTemplate.from_template(
-        """
+
+# Static prompt, registered once at import time. The lean variant leaves out the
+# English translation, which is produced on demand instead.
+prompt_template = PromptTemplate.from_template(
+    """
 IMPORTANT: Your output must be valid JSON with no markdown formatting, code fences, or additional commentary. 
 
 Generate a German B1 level listening exam interview with the following components:
 1. An interviewer (with a realistic German name and gender)
 2. An interviewee (with a realistic German name, profession, and gender)
 3. A LENGTHY conversation in segments (approximately 25-30 turns for each speaker, totaling around 100 sentences)
-4. 10 True/False questions based on the interview content
-5. English translation of the conversation
+4. 10 True/False questions based on the interview content{translation_item}
 
 IMPORTANT NOTES:
 - Both the interviewer and interviewee must have authentic German names, not just "Interviewer" as a placeholder
@@ -81,14 +85,30 @@ IMPORTANT NOTES:
 - Use appropriate German B1 level vocabulary and grammar
 - Ensure all field names match exactly as shown above
         """
-    )
+)
+prompt_assets.register("listening_interview", prompt_template, translation_item="\n5. English translation of the conversation")
+prompt_assets.register("listening_interview_lean", prompt_template, translation_item="")
+
+
+@traceable(run_type="llm")
+async def generate_interview_transcript(lean: bool = False) -> Interview:
+    """Generates an extensive interview transcript (~100 sentences), with detailed questions and answers for a German B1 listening exam.
+
+    In lean mode the English translation of the conversation is left empty and produced on demand.
+    """
 
-    prompt_value = prompt_template.invoke({})
-    return model.invoke(prompt_value)
+    if lean:
+        prompt_value = prompt_assets.render("listening_interview_lean")
+        interview = await model_router.ainvoke("listening_interview", prompt_value, LeanInterview, temperature=TEMPERATURE)
+    else:
+        prompt_value = prompt_assets.render("listening_interview")
+        interview = await model_router.ainvoke("listening_interview", prompt_value, TranslatedInterview, temperature=TEMPERATURE)
+    return Interview.model_validate(interview.model_dump())
 
 # Example usage (optional, for testing)
 # if __name__ == "__main__":
-#     generated_interview = generate_interview_transcript()
+#     import asyncio
+#     generated_interview = asyncio.run(generate_interview_transcript())
 #     print("--- Generated Interview ---")
 #     print(generated_interview.model_dump_json(indent=2))
 #     print("------------------------") 
\ No newline at end of file
@@ -1,18 +1,29 @@
-from langchain_openai import ChatOpenAI
+import asyncio
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from langsmith import traceable
-
-__all__ = ["Speaker", "Conversation", "generate_listening_exam_transcript"]
+from utils.model_router import model_router
+from .prompt_assets import prompt_assets
+
+__all__ = [
+    "Speaker",
+    "Conversation",
+    "LeanSpeaker",
+    "LeanConversation",
+    "TranslatedSpeaker",
+    "TranslatedConversation",
+    "generate_listening_exam_transcript",
+    "generate_listening_exam_transcripts",
+]
 
 # Load environment variables
 load_dotenv()
 
 
-class Speaker(BaseModel):
-    """Structured output for a speaker."""
+class LeanSpeaker(BaseModel):
+    """Structured output for a speaker, without the English translation."""
 
     name: str = Field(description="The name of the speaker")
     gender: str = Field(description="The gender of the speaker")
@@ -26,35 +37,74 @@ class Speaker(BaseModel):
     explanation: str = Field(
         description="An explanation of the correct answer to the question in English"
     )
-    english_translation: str = Field(
-        description="English translation of the speaker's opinion"
+
+
+class TranslatedSpeaker(LeanSpeaker):
+    """Structured output for a speaker."""
+
+    english_translation: str = Field(description="English translation of the speaker's opinion")
+
+
+class Speaker(LeanSpeaker):
+    """A speaker as returned to clients; the translation is empty for lean exams until it is requested."""
+
+    english_translation: Optional[str] = Field(
+        default=None, description="English translation of the speaker's opinion"
     )
 
 
-class Conversation(BaseModel):
+class LeanConversation(BaseModel):
+    """Structured output for a conversation generated without English translations."""
+
+    speakers: List[LeanSpeaker] = Field(
+        description="A list containing exactly 5 speakers, no more and no less."
+    )
+
+
+class TranslatedConversation(BaseModel):
     """Structured output for a conversation."""
 
+    speakers: List[TranslatedSpeaker] = Field(
+        description="A list containing exactly 5 speakers, no more and no less."
+    )
+
+
+class Conversation(BaseModel):
+    """A conversation as returned to clients, generated in either mode."""
+
     speakers: List[Speaker] = Field(
         description="A list containing exactly 5 speakers, no more and no less."
     )
 
 
-model = ChatOpenAI(
-    model="gpt-4.1-nano-2025-04-14",
-    temperature=0.3,  # Higher temperature for more creative conversations
-).with_structured_output(Conversation)
+class LeanConversationBatch(BaseModel):
+    """Structured output for several conversations generated without English translations."""
 
+    conversations: List[LeanConversation] = Field(
+        description="A conversation for each requested topic, in the order the topics are listed."
+    )
 
-@traceable(run_type="llm")
-def generate_listening_exam_transcript(topic: str) -> Conversation:
-    background_context = """
+
+class ConversationBatch(BaseModel):
+    """Structured output for several conversations."""
+
+    conversations: List[TranslatedConversation] = Field(
+        description="A conversation for each requested topic, in the order the topics are listed."
+    )
+
+
+# The model is chosen by the router from the "listening_transcript" allow-list
+TEMPERATURE = 0.3  # Higher temperature for more creative conversations
+
+
+# Static instructions first and the topic last, so the prompt prefix is identical across calls.
+# The lean variant leaves out the English translation, which is produced on demand instead.
+_INSTRUCTIONS = """
     Background Context:
     We are generating a listening exam for the telc B1 German exam.
-    """
 
-    exam_context = f"""
     Exam Context:
-    The topic of the exam is "{topic}".
+    The topic of the exam is given at the end of these instructions.
     Generate a conversation with exactly 5 (IMPORTANT: 5) speakers giving their opinions on this topic.
     The exam/conversation should contain exactly 5 speakers/questions not more not less.
     The TELC B1 exam contains 5 speakers/questions expressing their opinions on the topic.
@@ -66,8 +116,7 @@ def generate_listening_exam_transcript(topic: str) -> Conversation:
     3. Their opinion in German (5-10 sentences)
     4. A True/False question in German about their opinion
     5. The correct answer to that question (true/false)
-    6. An explanation of the correct answer to the question in English
-    7. English translation of the speaker's opinion
+    6. An explanation of the correct answer to the question in English{translation_item}
 
     IMPORTANT:
     - Ensure that some answers are true and some are false.
@@ -80,11 +129,10 @@ def generate_listening_exam_transcript(topic: str) -> Conversation:
             {{
                 "name": "Anna Schmidt",
                 "gender": "female",
-                "opinion": "Ich finde das sehr wichtig...", # Opinion in German about the {topic}
+                "opinion": "Ich finde das sehr wichtig...", # Opinion in German about the topic
                 "question": "Anna findet, dass man ...? ",
                 "correct_answer": false # true or false
-                "explanation": "The correct answer is false because ... # Explanation in English",
-                "english_translation": "Anna thinks that ... # English translation of the opinion"
+                "explanation": "The correct answer is false because ... # Explanation in English"{translation_example}
             }},
             // ... more speakers - remember: exactly 5 speakers must be generated in this list ...
         ]
@@ -92,20 +140,76 @@ def generate_listening_exam_transcript(topic: str) -> Conversation:
 
     All opinions and questions must be in German.
     Each speaker should have a different perspective on the topic.
+
+    Generate a structured conversation following the exact format shown in the example.
+"""
+prompt_template = PromptTemplate(template=_INSTRUCTIONS + """
+    The topic of the exam is "{topic}".
+    """)
+# Several exams per call: the same instructions (and cached prefix), with the topics last
+batch_prompt_template = PromptTemplate(template=_INSTRUCTIONS + """
+    Generate {count} separate conversations, one for each of the topics below and in the same order.
+    Each conversation follows all of the instructions above on its own and has exactly 5 speakers.
+
+    The topics of the exams are:
+    {topics}
+    """)
+prompt_assets.register(
+    "listening_transcript",
+    prompt_template,
+    translation_item="\n    7. English translation of the speaker's opinion",
+    translation_example=',\n                "english_translation": "Anna thinks that ... # English translation of the opinion"',
+)
+prompt_assets.register("listening_transcript_lean", prompt_template, translation_item="", translation_example="")
+prompt_assets.register(
+    "listening_transcript_batch",
+    batch_prompt_template,
+    translation_item="\n    7. English translation of the speaker's opinion",
+    translation_example=',\n                "english_translation": "Anna thinks that ... # English translation of the opinion"',
+)
+prompt_assets.register("listening_transcript_batch_lean", batch_prompt_template, translation_item="", translation_example="")
+
+
+@traceable(run_type="llm")
+async def generate_listening_exam_transcript(topic: str, lean: bool = False) -> Conversation:
     """
+    Generates a conversation on `topic`. In lean mode the English translations
+    are not generated and are left empty, which roughly halves the output.
+    """
+    if lean:
+        prompt = prompt_assets.render("listening_transcript_lean", topic=topic)
+        conversation = await model_router.ainvoke("listening_transcript", prompt, LeanConversation, temperature=TEMPERATURE)
+    else:
+        prompt = prompt_assets.render("listening_transcript", topic=topic)
+        conversation = await model_router.ainvoke("listening_transcript", prompt, TranslatedConversation, temperature=TEMPERATURE)
+    return Conversation.model_validate(conversation.model_dump())
 
-    prompt = PromptTemplate(
-        template="""
-        {background_context}
-        {exam_context}
-
-        Generate a structured conversation following the exact format shown in the example.
-        """
-    ).format(
-        background_context=background_context,
-        exam_context=exam_context,
-        topic=topic,
-    )
 
-    conversation = model.invoke(prompt)
-    return conversation
+@traceable(run_type="llm")
+async def generate_listening_exam_transcripts(topics: List[str], lean: bool = False) -> List[Conversation]:
+    """
+    Generates one conversation per topic in a single call, so the instructions
+    are sent once for all of them. Conversations that don't come back with 5
+    speakers, or all of them if the count doesn't match, are generated on
+    their own instead.
+    """
+    if len(topics) == 1:
+        return [await generate_listening_exam_transcript(topics[0], lean=lean)]
+    topic_list = "\n    ".join(f"{index}. {topic}" for index, topic in enumerate(topics, start=1))
+    if lean:
+        prompt = prompt_assets.render("listening_transcript_batch_lean", count=len(topics), topics=topic_list)
+        batch = await model_router.ainvoke("listening_transcript_batch", prompt, LeanConversationBatch, temperature=TEMPERATURE)
+    else:
+        prompt = prompt_assets.render("listening_transcript_batch", count=len(topics), topics=topic_list)
+        batch = await model_router.ainvoke("listening_transcript_batch", prompt, ConversationBatch, temperature=TEMPERATURE)
+    conversations = [Conversation.model_validate(conversation.model_dump()) for conversation in batch.conversations]
+
+    if len(conversations) != len(topics):
+        print(f"Warning: Expected {len(topics)} conversations, got {len(conversations)}; generating individually.")
+        conversations = [None] * len(topics)
+    missing = [index for index, conversation in enumerate(conversations) if conversation is None or len(conversation.speakers) != 5]
+    if missing:
+        regenerated = await asyncio.gather(*(generate_listening_exam_transcript(topics[index], lean=lean) for index in missing))
+        for index, conversation in zip(missing, regenerated):
+            conversations[index] = conversation
+    return conversations
@@ -1,23 +1,120 @@
-from langchain_groq import ChatGroq
+import os
+import re
+from functools import lru_cache
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
+from markdown_it import MarkdownIt
 from pydantic import BaseModel, Field
 from langsmith import traceable
+from utils.model_router import model_router
 
 load_dotenv()
 
-__all__ = ["HtmlFormatterWorkflow", "HtmlFormattedResult"]
+__all__ = ["HtmlFormatterWorkflow", "HtmlFormattedResult", "format_advert_html", "format_text_html"]
+
+# "local" formats with markdown-it and the advert rules below, "llm" asks a model
+HTML_FORMATTER_MODE = os.getenv("HTML_FORMATTER_MODE", "local")
 
 class HtmlFormattedResult(BaseModel):
     formatted_text: str = Field(description="The formatted text with HTML tags")
 
 
+## Local formatting
+# Raw HTML in generated text is escaped, single newlines become <br>
+_markdown = MarkdownIt("commonmark", {"breaks": True, "html": False})
+
+# Line starts that markdown would otherwise read as headings, quotes or numbered lists
+_MARKDOWN_LINE_START = re.compile(r"^(\s*)(?:(#|>)|(\d+)([.)])(?=\s))")
+_BULLET = re.compile(r"^\s*[•·▪◦*]\s+")
+# Short first line without closing punctuation, e.g. a shop or product name
+_MAX_HEADING_LENGTH = 40
+_PHONE = r"(?:Tel\.?(?:\s?/\s?Fax)?|Telefon|Fax|Handy|Mobil)\s*:?\s*\+?\d[\d /\-()]{4,}\d"
+_PRICE = (
+    r"(?:€|EUR)\s?\d[\d.]*(?:,(?:\d{2}|[–-]))?"
+    r"|\d[\d.]*(?:,(?:\d{2}|[–-]))?\s?(?:€|Euro|EUR)(?![A-Za-zÄÖÜäöü])"
+    r"|\d[\d.]*,[–-]"
+)
+_HIGHLIGHTS = re.compile(rf"(?P<phone>{_PHONE})|(?P<price>{_PRICE})")
+_TAG = re.compile(r"(<[^>]+>)")
+
+
+def _escape_line(line: str) -> str:
+    def escape(match: re.Match) -> str:
+        if match.group(2):
+            return match.group(1) + "\\" + match.group(2)
+        return match.group(1) + match.group(3) + "\\" + match.group(4)
+
+    return _MARKDOWN_LINE_START.sub(escape, line)
+
+
+def _is_caps_heading(line: str) -> bool:
+    letters = [c for c in line if c.isalpha()]
+    return len(letters) >= 3 and all(c.isupper() for c in letters)
+
+
+def _highlight(html: str) -> str:
+    """Wraps phone numbers and prices in the text (not the tags) of rendered HTML."""
+    def wrap(match: re.Match) -> str:
+        kind = "phone" if match.group("phone") else "price"
+        return f'<span class="{kind}">{match.group(0)}</span>'
+
+    parts = _TAG.split(html)
+    return "".join(part if part.startswith("<") else _HIGHLIGHTS.sub(wrap, part) for part in parts)
+
+
+@lru_cache(maxsize=4096)
+def format_advert_html(text: str) -> str:
+    """
+    Formats a generated advert as HTML: the name line and all-caps lines become
+    headings, bullet lines a list, line breaks are kept, and phone numbers and
+    prices are marked with `phone` / `price` spans.
+    """
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    markdown_lines = []
+    first = True
+    in_list = False
+    for line in lines:
+        if not line.strip():
+            markdown_lines.append("")
+            in_list = False
+            continue
+        stripped = line.strip()
+        is_bullet = bool(_BULLET.match(line))
+        if in_list and not is_bullet:
+            # End the list, otherwise markdown continues the last item
+            markdown_lines.append("")
+        in_list = is_bullet
+        if first and len(stripped) <= _MAX_HEADING_LENGTH and stripped[-1] not in ".!?:,;":
+            markdown_lines.extend([f"### {_escape_line(stripped)}", ""])
+        elif _is_caps_heading(stripped):
+            markdown_lines.extend(["", f"#### {_escape_line(stripped)}", ""])
+        elif is_bullet:
+            markdown_lines.append("- " + _escape_line(_BULLET.sub("", line)))
+        else:
+            markdown_lines.append(_escape_line(stripped))
+        first = False
+    html = _markdown.render("\n".join(markdown_lines))
+    return f'<div class="advert">{_highlight(html)}</div>'
+
+
+@lru_cache(maxsize=4096)
+def format_text_html(text: str) -> str:
+    """Formats a generated text as HTML paragraphs with line breaks kept."""
+    lines = [_escape_line(line.strip()) for line in text.strip().splitlines()]
+    html = _markdown.render("\n".join(lines))
+    return f'<div class="text">{_highlight(html)}</div>'
+
+
 class HtmlFormatterWorkflow:
-    def __init__(self, additional_instructions: str = ""):
-        self.llm = ChatGroq(model="llama-3.1-8b-instant", temperature=0.1).with_structured_output(HtmlFormattedResult)
+    def __init__(self, additional_instructions: str = "", mode: str = HTML_FORMATTER_MODE):
+        # Models are selected per call by the router from the "html_formatter" allow-list
+        self.route = "html_formatter"
         self.additional_instructions = additional_instructions
+        self.mode = mode
+        self.prepare_chain()
 
     def prepare_chain(self):
+        # Built once per workflow; additional instructions are fixed for its lifetime
         prompt = PromptTemplate(
             template="""
             You are an expert HTML formatter. Take the following text and format it using only <span>, <br>, and <div> and <pre> tags.
@@ -35,10 +132,11 @@ class HtmlFormatterWorkflow:
             """
         )
 
-        self.chain = prompt | self.llm
-    
+        self.prompt = prompt.partial(additional_instructions=self.additional_instructions)
+
     @traceable(run_type="llm", name="format_html")
     async def format_html(self, text: str) -> HtmlFormattedResult:
-        self.prepare_chain()
-        return await self.chain.ainvoke({"text": text, "additional_instructions": self.additional_instructions}) 
-   
\ No newline at end of file
+        if self.mode == "local":
+            return HtmlFormattedResult(formatted_text=format_advert_html(text))
+        prompt_value = self.prompt.invoke({"text": text})
+        return await model_router.ainvoke(self.route, prompt_value, HtmlFormattedResult, temperature=0.1)
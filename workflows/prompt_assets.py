@@ -0,0 +1,92 @@
+import threading
+from pathlib import Path
+from typing import Dict
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.prompt_values import PromptValue
+
+from utils.metrics import metrics
+from utils.tokens import count_tokens
+
+__all__ = ["PromptAssets", "prompt_assets"]
+
+## Repository root, so assets resolve independently of the working directory
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Marker substituted for variables when measuring a template's static prefix
+_MARKER = "\x00"
+
+
+class PromptAssets:
+    """
+    Registry of prompt templates and the static files they embed.
+
+    Files are read once and templates are registered once at import time, so
+    no workflow touches the disk or rebuilds a template per call. Templates
+    should keep their static text first and their per-call variables last, so
+    providers can reuse the cached prompt prefix; `render` records how much of
+    each rendered prompt is that static prefix.
+    """
+
+    def __init__(self, root: Path = ROOT_DIR):
+        self._root = root
+        self._texts: Dict[str, str] = {}
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._prefix_tokens: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def text(self, relative_path: str) -> str:
+        """Returns the contents of a file under the repository root, read only once."""
+        with self._lock:
+            cached = self._texts.get(relative_path)
+        if cached is not None:
+            return cached
+        content = (self._root / relative_path).read_text(encoding="utf-8")
+        with self._lock:
+            return self._texts.setdefault(relative_path, content)
+
+    def register(self, name: str, template: PromptTemplate, **partials: str) -> PromptTemplate:
+        """Registers `template` under `name` with any static `partials` already filled in."""
+        if partials:
+            template = template.partial(**partials)
+        with self._lock:
+            self._templates[name] = template
+            self._prefix_tokens.pop(name, None)
+        return template
+
+    def template(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def static_prefix(self, name: str) -> str:
+        """The rendered text that precedes the first per-call variable of a template."""
+        template = self.template(name)
+        rendered = template.format(**{var: _MARKER for var in template.input_variables})
+        return rendered.split(_MARKER, 1)[0]
+
+    def static_prefix_tokens(self, name: str) -> int:
+        with self._lock:
+            cached = self._prefix_tokens.get(name)
+        if cached is None:
+            cached = count_tokens(self.static_prefix(name))
+            with self._lock:
+                self._prefix_tokens[name] = cached
+        return cached
+
+    def render(self, name: str, **variables) -> PromptValue:
+        """Renders a registered template and records its token count and static prefix share."""
+        prompt_value = self.template(name).invoke(variables)
+        prompt_tokens = count_tokens(prompt_value)
+        prefix_tokens = min(self.static_prefix_tokens(name), prompt_tokens)
+        metrics.observe("prompt.tokens", prompt_tokens, workflow=name)
+        metrics.observe("prompt.static_prefix_ratio", prefix_tokens / prompt_tokens if prompt_tokens else 0.0, workflow=name)
+        return prompt_value
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        """Static prefix size per registered template."""
+        with self._lock:
+            names = list(self._templates.keys())
+        return {name: {"static_prefix_tokens": self.static_prefix_tokens(name)} for name in names}
+
+
+# Process-wide registry
+prompt_assets = PromptAssets()
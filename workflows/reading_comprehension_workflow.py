@@ -1,10 +1,11 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List
 from langsmith import traceable
-import random
+from utils.model_router import model_router
+from utils.seeding import exam_random
+from .prompt_assets import prompt_assets
 
 ## Export the workflow
 __all__ = ["ReadingComprehensionWorkflow", "ReadingComprehensionQuestion", "ReadingComprehensionExam"]
@@ -27,13 +28,120 @@ class ReadingComprehensionExam(BaseModel):
     questions: List[ReadingComprehensionQuestion] = Field(description="A list of 5 multiple-choice questions, one for each paragraph of the text (indices 0-4).")
 
 
-## Define the prompt template
-prompt_template = PromptTemplate(
+## Topics for the text; one is chosen per call
+TOPIC_LIST = [
+    "Umweltschutz im Alltag",
+    "Moderne Arbeitswelt",
+    "Gesunde Ernährung",
+    "Reisen und Tourismus",
+    "Technologie und Gesellschaft",
+    "Kulturelle Veranstaltungen",
+    "Freizeitaktivitäten",
+    "Bildungssysteme",
+    "Soziale Medien",
+    "Stadtleben vs. Landleben",
+    "Ehrenamtliche Tätigkeiten",
+    "Migration und Integration",
+    "Klimawandel",
+    "Nachhaltigkeit",
+    "Familienleben",
+    "Freundschaft",
+    "Hobbys",
+    "Sportarten",
+    "Musikrichtungen",
+    "Filmgeschichte",
+    "Kunstmuseen",
+    "Literatur und Bücher",
+    "Fotografie",
+    "Mode und Stil",
+    "Architektur",
+    "Stadtplanung",
+    "Verkehr und Mobilität",
+    "Öffentlicher Nahverkehr",
+    "Automobilindustrie",
+    "Elektrische Fahrzeuge",
+    "Raumfahrt und Weltraumforschung",
+    "Quantentechnologie",
+    "Cybersicherheit",
+    "Datenschutz im Internet",
+    "Künstliche Intelligenz",
+    "Robotik",
+    "Drohnen-Technologie",
+    "3D-Druck",
+    "Blockchain und Kryptowährungen",
+    "E-Commerce-Trends",
+    "Fintech-Innovationen",
+    "Soziale Unternehmensverantwortung",
+    "Startup-Kultur",
+    "Jobmarkt und Karriere",
+    "Arbeitsflexibilität",
+    "Homeoffice",
+    "Bildungsreformen",
+    "Online-Lernen",
+    "Sprachlernmethoden",
+    "Mental Health",
+    "Psychologie des Alltags",
+    "Achtsamkeit und Meditation",
+    "Sportmedizin",
+    "Präventivmedizin",
+    "Telemedizin",
+    "Gesundheitssysteme",
+    "Alternativmedizin",
+    "Ernährungswissenschaft",
+    "Superfoods",
+    "Kaffee-Kultur",
+    "Weinverkostung",
+    "Teezeremonien",
+    "Kochen und Gastronomie",
+    "Nachhaltige Mode",
+    "Fast Fashion",
+    "Fair Trade",
+    "Upcycling",
+    "Müllvermeidung",
+    "Kreislaufwirtschaft",
+    "Recycling",
+    "Wasserknappheit",
+    "Erneuerbare Energiequellen",
+    "Solarenergie",
+    "Windkraft",
+    "Wasserkraft",
+    "Batterietechnologien",
+    "Smart Home Systeme",
+    "IoT im Alltag",
+    "Digitale Transformation",
+    "Big Data Analyse",
+    "Cloud Computing",
+    "Social Media Marketing",
+    "Influencer-Kultur",
+    "Gaming und E-Sports",
+    "Virtual Reality",
+    "Augmented Reality",
+    "Filmproduktion",
+    "Theater und Performance",
+    "Musikfestivals",
+    "Graffiti und Street Art",
+    "Archäologische Entdeckungen",
+    "Museumsführung",
+    "Kulturelles Erbe",
+    "Volksbräuche",
+    "Feste und Traditionen",
+    "Tourismusentwicklung",
+    "Naturschutzgebiete",
+    "Wildtierschutz",
+    "Meeresbiologie",
+    "Geologie und Vulkanologie",
+    "Klima- und Wetterphänomene",
+    "Permakultur",
+    "Gärtnern im urbanen Raum",
+]
+
+## Define the prompt template (static instructions first, topic last)
+prompt_template = prompt_assets.register("reading_comprehension", PromptTemplate(
     template="""
     Generate a Telc B1 Leseverstehen Teil 1 exam component. This involves creating a single continuous text divided into 5 distinct paragraphs, followed by 5 multiple-choice questions, one for each paragraph.
 
     Text Requirements:
-    - The text should be in German and discuss the topic: {topic}.
+    - The text should be in German and discuss the topic given at the end of these instructions.
     - The text must consist of exactly 5 paragraphs.
     - The total length of the text must be between 1500 and 2000 words in total. 
     - Each paragraph should be substantial, with at least 300 words, to ensure a detailed, in-depth article akin to a long newspaper feature or blog post.
@@ -58,131 +166,28 @@ prompt_template = PromptTemplate(
 
     Topic for this exam: {topic}
     """
-)
+))
 
 
 class ReadingComprehensionWorkflow:
     def __init__(self):
         # Using gpt-4o-mini for cost-effectiveness and speed, adjust if needed.
-        self.llm = ChatOpenAI(model="gpt-4.1-nano-2025-04-14", temperature=random.uniform(0.5, 0.7), max_retries=2).with_structured_output(ReadingComprehensionExam)
+        # Models are selected per call by the router from the "reading_comprehension" allow-list
+        self.route = "reading_comprehension"
 
     def get_topic(self) -> str:
-        # Reusing a simplified topic list mechanism, adaptable as needed.
-        topic_list = [
-            "Umweltschutz im Alltag",
-            "Moderne Arbeitswelt",
-            "Gesunde Ernährung",
-            "Reisen und Tourismus",
-            "Technologie und Gesellschaft",
-            "Kulturelle Veranstaltungen",
-            "Freizeitaktivitäten",
-            "Bildungssysteme",
-            "Soziale Medien",
-            "Stadtleben vs. Landleben",
-            "Ehrenamtliche Tätigkeiten",
-            "Migration und Integration",
-            "Klimawandel",
-            "Nachhaltigkeit",
-            "Familienleben",
-            "Freundschaft",
-            "Hobbys",
-            "Sportarten",
-            "Musikrichtungen",
-            "Filmgeschichte",
-            "Kunstmuseen",
-            "Literatur und Bücher",
-            "Fotografie",
-            "Mode und Stil",
-            "Architektur",
-            "Stadtplanung",
-            "Verkehr und Mobilität",
-            "Öffentlicher Nahverkehr",
-            "Automobilindustrie",
-            "Elektrische Fahrzeuge",
-            "Raumfahrt und Weltraumforschung",
-            "Quantentechnologie",
-            "Cybersicherheit",
-            "Datenschutz im Internet",
-            "Künstliche Intelligenz",
-            "Robotik",
-            "Drohnen-Technologie",
-            "3D-Druck",
-            "Blockchain und Kryptowährungen",
-            "E-Commerce-Trends",
-            "Fintech-Innovationen",
-            "Soziale Unternehmensverantwortung",
-            "Startup-Kultur",
-            "Jobmarkt und Karriere",
-            "Arbeitsflexibilität",
-            "Homeoffice",
-            "Bildungsreformen",
-            "Online-Lernen",
-            "Sprachlernmethoden",
-            "Mental Health",
-            "Psychologie des Alltags",
-            "Achtsamkeit und Meditation",
-            "Sportmedizin",
-            "Präventivmedizin",
-            "Telemedizin",
-            "Gesundheitssysteme",
-            "Alternativmedizin",
-            "Ernährungswissenschaft",
-            "Superfoods",
-            "Kaffee-Kultur",
-            "Weinverkostung",
-            "Teezeremonien",
-            "Kochen und Gastronomie",
-            "Nachhaltige Mode",
-            "Fast Fashion",
-            "Fair Trade",
-            "Upcycling",
-            "Müllvermeidung",
-            "Kreislaufwirtschaft",
-            "Recycling",
-            "Wasserknappheit",
-            "Erneuerbare Energiequellen",
-            "Solarenergie",
-            "Windkraft",
-            "Wasserkraft",
-            "Batterietechnologien",
-            "Smart Home Systeme",
-            "IoT im Alltag",
-            "Digitale Transformation",
-            "Big Data Analyse",
-            "Cloud Computing",
-            "Social Media Marketing",
-            "Influencer-Kultur",
-            "Gaming und E-Sports",
-            "Virtual Reality",
-            "Augmented Reality",
-            "Filmproduktion",
-            "Theater und Performance",
-            "Musikfestivals",
-            "Graffiti und Street Art",
-            "Archäologische Entdeckungen",
-            "Museumsführung",
-            "Kulturelles Erbe",
-            "Volksbräuche",
-            "Feste und Traditionen",
-            "Tourismusentwicklung",
-            "Naturschutzgebiete",
-            "Wildtierschutz",
-            "Meeresbiologie",
-            "Geologie und Vulkanologie",
-            "Klima- und Wetterphänomene",
-            "Permakultur",
-            "Gärtnern im urbanen Raum",
-        ]
-        return random.choice(topic_list)
+        return exam_random().choice(TOPIC_LIST)
 
     @traceable(run_type="llm")
     async def generate_exam(self) -> ReadingComprehensionExam:
         """Generates a new Reading Comprehension Exam section based on a random topic."""
         selected_topic = self.get_topic()
 
-        prompt_data = prompt_template.invoke({"topic": selected_topic})
+        prompt_data = prompt_assets.render(self.route, topic=selected_topic)
 
-        exam_data = await self.llm.ainvoke(prompt_data)
+        exam_data = await model_router.ainvoke(
+            self.route, prompt_data, ReadingComprehensionExam, temperature=exam_random().uniform(0.5, 0.7), max_retries=2
+        )
 
         # Basic validation (can be expanded)
         if len(exam_data.questions) != 5:
@@ -0,0 +1,63 @@
+import asyncio
+from typing import List
+
+from dotenv import load_dotenv
+from langchain_core.prompts import PromptTemplate
+from langsmith import traceable
+from pydantic import BaseModel, Field
+
+from utils.model_router import model_router
+from .prompt_assets import prompt_assets
+
+__all__ = ["TextTranslations", "translate_texts"]
+
+# Load environment variables
+load_dotenv()
+
+
+class TextTranslations(BaseModel):
+    """Structured output for a batch of translations."""
+
+    translations: List[str] = Field(
+        description="The English translation of each numbered German text, in the same order, with exactly as many entries as there are texts."
+    )
+
+
+TEMPERATURE = 0.1
+
+# Static instructions first and the texts last, so the prompt prefix is identical across calls
+prompt_template = prompt_assets.register("text_translation", PromptTemplate.from_template(
+    """
+You are a professional German to English translator for a German B1 language learning app.
+
+Translate each numbered German text below into natural, accurate English.
+- Return exactly one translation per text, in the same order as the texts.
+- Do not number the translations or add any commentary.
+- Keep speaker names unchanged.
+
+Texts:
+{texts}
+"""
+))
+
+
+def _numbered(texts: List[str]) -> str:
+    return "\n\n".join(f"{index}. {text}" for index, text in enumerate(texts, start=1))
+
+
+@traceable(run_type="llm")
+async def translate_texts(texts: List[str]) -> List[str]:
+    """
+    Translates German texts to English in a single call. If the model returns
+    the wrong number of translations, each text is translated on its own.
+    """
+    if not texts:
+        return []
+    prompt = prompt_assets.render("text_translation", texts=_numbered(texts))
+    result = await model_router.ainvoke("text_translation", prompt, TextTranslations, temperature=TEMPERATURE)
+    if len(result.translations) == len(texts):
+        return result.translations
+    if len(texts) == 1:
+        return [" ".join(result.translations)]
+    print(f"Warning: Expected {len(texts)} translations, got {len(result.translations)}; translating individually.")
+    return [translation for single in await asyncio.gather(*(translate_texts([text]) for text in texts)) for translation in single]
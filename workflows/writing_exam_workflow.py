@@ -1,10 +1,11 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List
 from langsmith import traceable
-import random
+from utils.model_router import model_router
+from utils.seeding import exam_random
+from .prompt_assets import prompt_assets
 
 __all__ = ["WritingExamWorkflow", "WritingExam", "Letter", "Task"]
 
@@ -21,8 +22,8 @@ class WritingExam(BaseModel):
     letter: Letter = Field(description="The letter/email stimulus.")
     tasks: List[Task] = Field(description="A list of four points in German that must be addressed in the response.")
 
-# Define the prompt template for the letter writing exam
-prompt_template = PromptTemplate(
+# Define the prompt template for the letter writing exam (static instructions first, letter details last)
+prompt_template = prompt_assets.register("writing_exam", PromptTemplate(
     template="""
 Generate a Telc B1 letter writing exam in German. The output must be valid JSON matching the schema:
 {{
@@ -46,8 +47,7 @@ Generate a Telc B1 letter writing exam in German. The output must be valid JSON
 }}
 
 Important:
-- It should be a {letter_type} letter/email.
-- The letter/email should be about {letter_topic}.
+- The letter/email type and topic are given at the end of these instructions.
 - The tasks must be exactly four points in German.
 - The tasks are points that the examinee must address in their response to the letter/email. They are not questions.
 - The tasks represent the questions that the sender of the letter/email would like to know from the examinee.
@@ -56,23 +56,22 @@ Important:
 
 ### Sample Prompt:
 In Telc B1 exam the examinee receive a fictional letter/email (in german) that could be formal or informal that they need to respond to, the exam also contains four points (also in German) that the examinees need to address in their response to the letter/email.
+
+It should be a {letter_type} letter/email.
+The letter/email should be about {letter_topic}.
 """
-)
+))
 
 class WritingExamWorkflow:
     def __init__(self):
-        # Initialize the LLM with structured output based on the Pydantic model
-        self.llm = ChatOpenAI(
-            model="gpt-4.1-nano-2025-04-14",
-            temperature=random.uniform(0.5, 0.7),
-            max_retries=2
-        ).with_structured_output(WritingExam)
+        # Models are selected per call by the router from the "writing_exam" allow-list
+        self.route = "writing_exam"
 
     def letter_type(self) -> str:
         """
         Randomly selects a letter type from a list of predefined types.
         """
-        return random.choice(["formal", "informal"])
+        return exam_random().choice(["formal", "informal"])
     
     def letter_topic(self, letter_type: str) -> str:
         formal_topics = [
@@ -130,9 +129,9 @@ class WritingExamWorkflow:
         ]
 
         if letter_type == "formal":
-            return random.choice(formal_topics)
+            return exam_random().choice(formal_topics)
         else:
-            return random.choice(informal_topics)
+            return exam_random().choice(informal_topics)
 
     @traceable(run_type="llm")
     async def generate_writing_exam(self) -> WritingExam:
@@ -141,6 +140,8 @@ class WritingExamWorkflow:
         """
         type = self.letter_type()   
         topic = self.letter_topic(type)
-        prompt = prompt_template.invoke({"letter_type": type, "letter_topic": topic})
-        exam = await self.llm.ainvoke(prompt)
+        prompt = prompt_assets.render(self.route, letter_type=type, letter_topic=topic)
+        exam = await model_router.ainvoke(
+            self.route, prompt, WritingExam, temperature=exam_random().uniform(0.5, 0.7), max_retries=2
+        )
         return exam 
\ No newline at end of file
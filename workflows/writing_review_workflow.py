@@ -1,10 +1,12 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List
 from langsmith import traceable
+from utils.model_router import model_router
 import random
+from utils.token_budget import check_input_tokens
+from .prompt_assets import prompt_assets
 
 __all__ = ["WritingExamWorkflow", "WritingExam", "Letter", "Task"]
 
@@ -24,25 +26,20 @@ class Correction(BaseModel):
 class WrittenExamEvaluation(BaseModel):
     corrections: List[Correction] = Field(description="A list of corrections that user has made to the letter/email. For sentences that are correct, do not include any corrections.")
 
-# Define the prompt template for the letter writing exam
-prompt_template = PromptTemplate(
+# Input limits in tokens. A B1 letter is around 100-150 words (~250 tokens), so
+# these leave ample room while keeping pasted essays out of the prompt.
+QUESTION_TOKEN_LIMIT = 1500
+KEY_POINTS_TOKEN_LIMIT = 500
+RESPONSE_TOKEN_LIMIT = 1500
+
+# Define the prompt template for the letter writing exam (static instructions first, the user's letter last)
+prompt_template = prompt_assets.register("writing_review", PromptTemplate(
     input_variables=["question", "key_points", "response"],
     template="""
 You are a German language teacher for Telc B1 exam. You are given a letter/email that user has written and a list of key points that user needs to address in their response.
 
 Your task is to evaluate the user's response and provide corrections for the user.
 
-This was the letter/email that was given to the user as the question to which they need to respond:
-{question}
-
-These are the key points that user needs to address in their response:
-{key_points}
-
-This is the letter/email that user has written:
-{response}
-
-
-
 The output must be valid JSON matching the schema:  
 {{
   "corrections": [
@@ -61,28 +58,41 @@ Important:
 
 ### Context:
 In Telc B1 exam the examinee receive a fictional letter/email (in german) that could be formal or informal that they need to respond to, the exam also contains four points (also in German) that the examinees need to address in their response to the letter/email.
+
+This was the letter/email that was given to the user as the question to which they need to respond:
+{question}
+
+These are the key points that user needs to address in their response:
+{key_points}
+
+This is the letter/email that user has written:
+{response}
 """
-)
+))
 
 class WritingReviewWorkflow:
     def __init__(self):
-        # Initialize the LLM with structured output based on the Pydantic model
-        self.llm = ChatOpenAI(
-            model="gpt-4.1-nano-2025-04-14",
-            temperature=0.2,
-            max_retries=2
-        ).with_structured_output(WrittenExamEvaluation)
+        # Models are selected per call by the router from the "writing_review" allow-list
+        self.route = "writing_review"
 
     @traceable(run_type="llm")
     async def evaluate_written_exam(self, user_letter_request: UserLetterRequest) -> WrittenExamEvaluation:
         """
         Generates a letter writing exam by invoking the LLM with the prompt template.
         """
+        # Reject oversized user input before spending any tokens on it
+        check_input_tokens(user_letter_request.question, QUESTION_TOKEN_LIMIT, "question")
+        check_input_tokens("\n".join(user_letter_request.key_points), KEY_POINTS_TOKEN_LIMIT, "key_points")
+        check_input_tokens(user_letter_request.response, RESPONSE_TOKEN_LIMIT, "response")
+
         # Pass individual fields using simple keys matching the input_variables
-        prompt = prompt_template.invoke({
-            "question": user_letter_request.question,
-            "key_points": user_letter_request.key_points,
-            "response": user_letter_request.response,
-        })
-        evaluation = await self.llm.ainvoke(prompt)
+        prompt = prompt_assets.render(
+            self.route,
+            question=user_letter_request.question,
+            key_points=user_letter_request.key_points,
+            response=user_letter_request.response,
+        )
+        evaluation = await model_router.ainvoke(
+            self.route, prompt, WrittenExamEvaluation, temperature=0.2, max_retries=2
+        )
         return evaluation 
\ No newline at end of file